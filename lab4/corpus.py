@@ -0,0 +1,239 @@
+"""
+Источник текстов для lab4: локальные файлы и кэш загрузок, адресуемый по содержимому.
+Текст отдаётся потоком кусков, поэтому корпус не обязан помещаться в память.
+
+Пример: заранее положить в кэш локальную копию текста вместо загрузки по URL
+    python corpus.py --add pg33870.txt
+"""
+import argparse
+import codecs
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import tempfile
+from itertools import chain
+
+GUTENBERG_URL = "https://www.gutenberg.org/cache/epub/33870/pg33870.txt"  # Chess Fundamentals from Project Gutenberg
+CHUNK_SIZE = 1 << 20  # Размер куска при чтении файла, байт
+DOWNLOAD_TIMEOUT = 60  # Секунд на соединение и на ожидание очередного блока ответа
+CACHE_DIR = os.environ.get("LAB4_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "lab4"))
+
+
+# Кэш: файлы называются по SHA-256 содержимого, index.json связывает URL с хэшем
+def _load_index(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, "index.json"), encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def _save_index(cache_dir, index):
+    path = os.path.join(cache_dir, "index.json")
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump(index, file, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def cache_path(url, cache_dir=CACHE_DIR):
+    """
+    :return: Путь к локальной копии url в кэше или None, если копии нет.
+    """
+    digest = _load_index(cache_dir).get(url)
+    if digest is None:
+        return None
+    path = os.path.join(cache_dir, digest + ".txt")
+    return path if os.path.exists(path) else None
+
+
+def add_to_cache(url, path, cache_dir=CACHE_DIR):
+    """
+    Кладёт локальный файл в кэш как копию url (например, для работы без сети).
+    :return: Путь к файлу в кэше.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    cached = os.path.join(cache_dir, digest.hexdigest() + ".txt")
+    if not os.path.exists(cached):
+        shutil.copyfile(path, cached + ".tmp")
+        os.replace(cached + ".tmp", cached)
+    return _index_url(url, digest.hexdigest(), cache_dir)
+
+
+def _index_url(url, hexdigest, cache_dir):
+    index = _load_index(cache_dir)
+    index[url] = hexdigest
+    _save_index(cache_dir, index)
+    return os.path.join(cache_dir, hexdigest + ".txt")
+
+
+def fetch(url, cache_dir=CACHE_DIR, offline=False):
+    """
+    Возвращает путь к локальной копии url; загружает её только при первом обращении.
+    """
+    path = cache_path(url, cache_dir)
+    if path is not None:
+        return path
+    if offline:
+        raise FileNotFoundError(f"{url} нет в кэше {cache_dir}, а загрузка из сети отключена")
+    import requests  # Нужен только для первой загрузки
+
+    os.makedirs(cache_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    # Ответ пишется блоками во временный файл с уникальным именем (параллельные загрузки
+    # не мешают друг другу), хэш считается по ходу, готовый файл переименовывается в кэш
+    with requests.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+        response.raise_for_status()
+        with tempfile.NamedTemporaryFile(dir=cache_dir, suffix=".tmp", delete=False) as file:
+            try:
+                for block in response.iter_content(CHUNK_SIZE):
+                    digest.update(block)
+                    file.write(block)
+            except BaseException:
+                file.close()
+                os.remove(file.name)
+                raise
+    os.replace(file.name, os.path.join(cache_dir, digest.hexdigest() + ".txt"))
+    return _index_url(url, digest.hexdigest(), cache_dir)
+
+
+def iter_file_chunks(path, chunk_size=CHUNK_SIZE, encoding="utf-8"):
+    """
+    Читает файл через mmap кусками по chunk_size байт. Многобайтовые символы на стыке
+    кусков собирает инкрементальный декодер.
+    :return: Генератор кусков текста.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for start in range(0, len(data), chunk_size):
+                    text = decoder.decode(data[start:start + chunk_size])
+                    if text:
+                        yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def take_prefix(chunks, prefix):
+    """
+    Оставляет только первые prefix символов потока (None — весь поток).
+    """
+    if prefix is None:
+        yield from chunks
+        return
+    left = prefix
+    for chunk in chunks:
+        if left <= 0:
+            break
+        yield chunk[:left]
+        left -= len(chunk)
+
+
+def open_corpus(source=GUTENBERG_URL, prefix=None, chunk_size=CHUNK_SIZE, cache_dir=CACHE_DIR, offline=False):
+    """
+    Открывает корпус потоком кусков текста.
+    :param source: Путь к локальному файлу или URL (берётся из кэша, загружается один раз).
+    :param prefix: Сколько первых символов оставить (None — весь текст).
+    :return: Генератор кусков текста.
+    """
+    if source.startswith(("http://", "https://")):
+        source = fetch(source, cache_dir, offline)
+    return take_prefix(iter_file_chunks(source, chunk_size), prefix)
+
+
+def iter_chunks(data):
+    """
+    Позволяет этапам обработки принимать и строку (или байты), и поток кусков.
+    """
+    if isinstance(data, (str, bytes, bytearray)):
+        yield data
+    else:
+        yield from data
+
+
+def reopenable(data):
+    """
+    Для этапов, которым нужно несколько проходов по тексту.
+    :param data: Функция, каждый раз заново открывающая поток кусков, строка или список кусков.
+    :return: Функция, открывающая поток кусков.
+    """
+    if callable(data):
+        return data
+    if iter(data) is data:
+        raise TypeError("Поток кусков читается только один раз: передайте функцию, открывающую его заново")
+    return lambda: iter_chunks(data)
+
+
+def chunks_equal(first, second):
+    """
+    Сравнивает два потока кусков (строк или байт), не склеивая их: границы кусков могут не совпадать.
+    """
+    first, second = iter_chunks(first), iter_chunks(second)
+    a = b = ""  # Текущие куски (None — поток закончился) и позиции в них
+    i = j = 0
+    while True:
+        while a is not None and i == len(a):
+            a, i = next(first, None), 0
+        while b is not None and j == len(b):
+            b, j = next(second, None), 0
+        if a is None or b is None:
+            return a is None and b is None
+        n = min(len(a) - i, len(b) - j)
+        if a[i:i + n] != b[j:j + n]:
+            return False
+        i += n
+        j += n
+
+
+def peek(chunks, length=200):
+    """
+    Возвращает первые length символов потока и поток, из которого они не пропали.
+    """
+    chunks = iter_chunks(chunks)
+    head = []
+    size = 0
+    for chunk in chunks:
+        head.append(chunk)
+        size += len(chunk)
+        if size >= length:
+            break
+    return ''.join(head)[:length], chain(head, chunks)
+
+
+def text_slice(chunks, start, stop):
+    """
+    Символы потока с start по stop (start <= stop, оба неотрицательные) без склейки всего текста.
+    """
+    parts = []
+    offset = 0
+    for chunk in iter_chunks(chunks):
+        if offset >= stop:
+            break
+        if offset + len(chunk) > start:
+            parts.append(chunk[max(start - offset, 0):stop - offset])
+        offset += len(chunk)
+    return ''.join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Кэш текстов для lab4")
+    parser.add_argument("--add", metavar="PATH", help="положить локальный файл в кэш как копию --url")
+    parser.add_argument("--url", default=GUTENBERG_URL)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    args = parser.parse_args()
+
+    if args.add:
+        print(add_to_cache(args.url, args.add, args.cache_dir))
+    else:
+        print(fetch(args.url, args.cache_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+"""
+Кодек Хаффмана для lab4: коды упаковываются в байты (NumPy, np.packbits), декодирование
+идёт по таблице переходов на целый байт: состояние — уже прочитанная часть кода, за шаг
+выдаются все символы, чьи коды закончились в этом байте. Дерево бит за битом не обходится.
+Коды — словарь {символ: '0101'}, как у generate_huffman_codes / build_huffman_codes.
+
+Для больших алфавитов (слова, пары байт — 10^5..10^6 символов) коды строятся без дерева
+объектов: длины — двумя очередями или package-merge с ограничением длины, сами коды —
+канонические, поэтому таблицу можно передать просто списком длин. Таблица переходов
+HuffmanCodec растёт как 256 * число символов, поэтому он рассчитан на алфавиты до
+TABLE_SYMBOLS символов; большие алфавиты кодирует CanonicalHuffmanCodec с памятью O(n).
+"""
+import time
+from bisect import bisect_right
+from itertools import chain, islice, repeat
+
+import numpy as np
+
+from corpus import iter_chunks
+
+ENCODE_BLOCK = 1 << 18  # Сколько символов кодируется за один шаг
+TABLE_SYMBOLS = 1 << 12  # Больше символов — таблица HuffmanCodec слишком велика (~256 * n записей)
+DECODE_TABLE_BITS = 12  # Коды не длиннее этого CanonicalHuffmanCodec декодирует одним обращением к таблице
+DECODE_BLOCK = 1 << 12  # Сколько байт CanonicalHuffmanCodec.decode переводит в слова за один шаг
+
+
+def huffman_code_lengths(frequencies):
+    """
+    Длины кодов Хаффмана за O(n) после сортировки: две очереди — листья по возрастанию
+    частоты и внутренние узлы в порядке создания (их веса тоже не убывают).
+    :return: Словарь {символ: длина кода}.
+    """
+    symbols = sorted(frequencies, key=frequencies.get)
+    n = len(symbols)
+    if n <= 1:
+        return {symbol: 1 for symbol in symbols}
+    weights = [frequencies[symbol] for symbol in symbols]
+    internal = []  # Веса внутренних узлов; узел k имеет номер n + k
+    parent = [0] * (2 * n - 1)
+    leaf = 0
+    node = 0
+    for k in range(n - 1):
+        total = 0
+        for _ in range(2):
+            # При равных весах берём лист — так коды получаются короче
+            if leaf < n and (node == k or weights[leaf] <= internal[node]):
+                parent[leaf] = n + k
+                total += weights[leaf]
+                leaf += 1
+            else:
+                parent[n + node] = n + k
+                total += internal[node]
+                node += 1
+        internal.append(total)
+    # Родитель всегда создан позже потомка: глубины считаем от корня назад
+    depth = [0] * (2 * n - 1)
+    for i in range(2 * n - 3, -1, -1):
+        depth[i] = depth[parent[i]] + 1
+    return {symbol: depth[i] for i, symbol in enumerate(symbols)}
+
+
+def length_limited_code_lengths(frequencies, max_length):
+    """
+    Оптимальные длины кодов не длиннее max_length (алгоритм package-merge), O(n * max_length).
+    Уровни строятся векторно: пакеты — суммы соседних пар предыдущего уровня, слитые с листьями.
+    На каждом уровне выбирается префикс списка, поэтому хватает числа выбранных листьев.
+    :return: Словарь {символ: длина кода}.
+    """
+    symbols = sorted(frequencies, key=frequencies.get)
+    n = len(symbols)
+    if n <= 1:
+        return {symbol: 1 for symbol in symbols}
+    if n > 1 << max_length:
+        raise ValueError(f"{n} символов нельзя закодировать кодами длиной не больше {max_length}")
+    leaves = np.asarray([frequencies[symbol] for symbol in symbols])
+    is_leaf = []  # Для уровней max_length-1 ... 1: какие элементы слитого списка — листья
+    current = leaves
+    for _ in range(max_length - 1):
+        pairs = len(current) // 2
+        packages = current[0:2 * pairs:2] + current[1:2 * pairs:2]
+        merged = np.concatenate([leaves, packages])
+        order = np.argsort(merged, kind="stable")  # При равенстве лист раньше пакета
+        is_leaf.append(order < n)
+        current = merged[order]
+    lengths = np.zeros(n, dtype=np.int64)
+    selected = 2 * n - 2  # На верхнем уровне выбираются 2n - 2 самых лёгких элемента
+    for flags in reversed(is_leaf):
+        taken = int(np.count_nonzero(flags[:selected]))
+        lengths[:taken] += 1
+        selected = 2 * (selected - taken)  # Каждый выбранный пакет — два элемента уровня ниже
+    lengths[:selected] += 1  # Нижний уровень состоит из одних листьев
+    return {symbol: int(length) for symbol, length in zip(symbols, lengths)}
+
+
+def canonical_codes(lengths):
+    """
+    Канонические коды по длинам: символы упорядочены по (длина, символ), код следующего —
+    код предыдущего плюс один, сдвинутый на разницу длин.
+    :return: Словарь {символ: '0101'}.
+    """
+    codes = {}
+    code = 0
+    previous = 0
+    for symbol in sorted(lengths, key=lambda s: (lengths[s], s)):
+        length = lengths[symbol]
+        code <<= length - previous
+        codes[symbol] = format(code, f"0{length}b")
+        code += 1
+        previous = length
+    return codes
+
+
+def pack_code_lengths(lengths, alphabet):
+    """
+    Таблица канонического кода — по байту длины на символ алфавита (0 — символа нет).
+    Алфавит (упорядоченный) должен быть известен и кодеру, и декодеру.
+    """
+    return bytes(lengths.get(symbol, 0) for symbol in alphabet)
+
+
+def unpack_code_lengths(data, alphabet):
+    return {symbol: length for symbol, length in zip(alphabet, data) if length}
+
+
+def _pack_bits(bits, pending, out):
+    # Дописывает в out целые байты из pending + bits, возвращает остаток (меньше 8 бит)
+    bits = np.concatenate([pending, bits])
+    whole = bits.size - bits.size % 8
+    out += np.packbits(bits[:whole]).tobytes()
+    return bits[whole:]
+
+
+class HuffmanCodec:
+    """
+    Кодек для текста с алфавитом до TABLE_SYMBOLS символов (таблица переходов — (n - 1) * 256 записей).
+    """
+
+    def __init__(self, codes):
+        if len(codes) > TABLE_SYMBOLS:
+            raise ValueError(f"Алфавит больше {TABLE_SYMBOLS} символов: используйте CanonicalHuffmanCodec")
+        if len(codes) == 1:
+            codes = {char: "0" for char in codes}  # Единственный символ всё равно занимает 1 бит
+        self.codes = codes
+        # Кодер: код символа i — биты pattern[start[i]:start[i] + length[i]]
+        chars = list(codes)
+        # Кодовая точка -> номер символа; таблица до самой большой кодовой точки алфавита
+        self._lookup = np.full(max(map(ord, chars), default=0) + 1, -1, dtype=np.int32)
+        self._lookup[[ord(char) for char in chars]] = np.arange(len(chars), dtype=np.int32)
+        self._length = np.array([len(codes[char]) for char in chars], dtype=np.int64)
+        self._start = np.concatenate([[0], np.cumsum(self._length)[:-1]]).astype(np.int64)
+        self._pattern = np.array([int(bit) for char in chars for bit in codes[char]], dtype=np.uint8)
+        self._build_table()
+
+    def _build_table(self):
+        # Состояние — собственный префикс какого-либо кода ("" — начало кода).
+        # table[state * 256 + byte] = (символы, закончившиеся в этом байте, следующее состояние * 256)
+        by_code = {code: char for char, code in self.codes.items()}
+        prefixes = sorted({code[:i] for code in self.codes.values() for i in range(len(code))}, key=lambda p: (len(p), p))
+        state_of = {prefix: i for i, prefix in enumerate(prefixes)}
+        self._table = []
+        for prefix in prefixes:
+            for byte in range(256):
+                current = prefix
+                chars = []
+                for shift in range(7, -1, -1):
+                    current += "1" if byte >> shift & 1 else "0"
+                    if current in by_code:
+                        chars.append(by_code[current])
+                        current = ""
+                    elif current not in state_of:
+                        chars = None  # Такого кода нет (неполный набор кодов)
+                        break
+                self._table.append(None if chars is None else (''.join(chars), state_of[current] * 256))
+
+    def encode(self, chunks):
+        """
+        :return: Упакованные байты (старший бит первым, хвост дополнен нулями) и число бит.
+        """
+        out = bytearray()
+        pending = np.empty(0, dtype=np.uint8)  # Меньше 8 бит, не вошедших в последний байт
+        total_bits = 0
+        for chunk in iter_chunks(chunks):
+            for begin in range(0, len(chunk), ENCODE_BLOCK):
+                block = chunk[begin:begin + ENCODE_BLOCK]
+                cps = np.frombuffer(block.encode("utf-32-le"), dtype=np.uint32)
+                symbols = self._lookup[np.minimum(cps, self._lookup.size - 1)]
+                symbols[cps >= self._lookup.size] = -1
+                if (symbols < 0).any():
+                    unknown = {block[i] for i in np.flatnonzero(symbols < 0)}
+                    raise KeyError(f"Нет кода для символов: {sorted(unknown)}")
+                lengths = self._length[symbols]
+                count = int(lengths.sum())
+                # Номер бита в pattern для каждого бита выхода: начало кода + смещение внутри кода
+                ends = np.cumsum(lengths)
+                index = np.repeat(self._start[symbols] - ends + lengths, lengths) + np.arange(count)
+                pending = _pack_bits(self._pattern[index], pending, out)
+                total_bits += count
+        if pending.size:
+            out += np.packbits(pending).tobytes()
+        return bytes(out), total_bits
+
+    def decode(self, data, count):
+        """
+        :param data: Байты от encode.
+        :param count: Сколько символов декодировать.
+        :return: Декодированный текст.
+        """
+        table = self._table
+        out = []
+        state = 0
+        for byte in data:
+            entry = table[state | byte]
+            if entry is None:
+                raise ValueError("Повреждённые данные Хаффмана: неизвестный код")
+            chars, state = entry
+            out.append(chars)
+        text = ''.join(out)
+        if len(text) < count:
+            raise ValueError("Данные Хаффмана обрываются раньше, чем закончились символы")
+        return text[:count]  # Лишнее — нули, которыми дополнен последний байт
+
+
+class CanonicalHuffmanCodec:
+    """
+    Канонический код для больших алфавитов: символы — любые сравнимые значения (слова,
+    пары байт), кодируется последовательность символов. Память O(n): номер символа — из
+    словаря, код — из массивов. Декодер смотрит на следующие DECODE_TABLE_BITS бит:
+    короткие коды находит по таблице из 2^DECODE_TABLE_BITS записей, а длину длинного кода —
+    двоичным поиском по границам кодов каждой длины: символы одной длины идут подряд.
+    Биты совпадают с HuffmanCodec(canonical_codes(lengths)).
+    """
+
+    def __init__(self, lengths):
+        if len(lengths) == 1:
+            lengths = {symbol: 1 for symbol in lengths}
+        self.symbols = sorted(lengths, key=lambda s: (lengths[s], s))  # Порядок canonical_codes
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._length = np.array([lengths[symbol] for symbol in self.symbols], dtype=np.int64)
+        self.max_length = int(self._length.max()) if self.symbols else 0
+        if self.max_length > 62:
+            raise ValueError("Коды длиннее 62 бит не поддерживаются: ограничьте длину (length_limited_code_lengths)")
+        counts = np.bincount(self._length, minlength=self.max_length + 1)
+        self._count = counts.tolist()
+        self._first_index = [0, *np.cumsum(counts).tolist()][:-1]  # Сколько символов короче L
+        self._first_code = [0] * (self.max_length + 1)
+        code = 0
+        for length in range(1, self.max_length + 1):
+            code = (code + counts[length - 1]) << 1
+            self._first_code[length] = int(code)
+        first_code = np.array(self._first_code, dtype=np.int64)
+        first_index = np.array(self._first_index, dtype=np.int64)
+        self._code = first_code[self._length] + np.arange(len(self.symbols)) - first_index[self._length]
+
+        # Таблица по первым table_bits битам: код длины L <= table_bits занимает 2^(table_bits - L)
+        # записей подряд. Канонические коды, выровненные влево, идут по возрастанию без пропусков,
+        # поэтому короткие коды заполняют начало таблицы; в остальных записях длина 0 — код длиннее
+        self._table_bits = min(self.max_length, DECODE_TABLE_BITS)
+        short = int(np.count_nonzero(self._length <= self._table_bits))
+        spans = 1 << (self._table_bits - self._length[:short])
+        table_length = np.zeros(1 << self._table_bits, dtype=np.int64)
+        table_length[:spans.sum()] = np.repeat(self._length[:short], spans)
+        self._table_length = table_length.tolist()
+        self._table_symbol = [self.symbols[i] for i in np.repeat(np.arange(short), spans).tolist()]
+        # Граница кодов длины L, выровненная влево до max_length бит: код длины L — первые L бит
+        # окна, если окно меньше границы L и не меньше границы L - 1. Границы не убывают
+        self._limit = [(self._first_code[length] + self._count[length]) << (self.max_length - length)
+                       for length in range(self._table_bits + 1, self.max_length + 1)]
+
+    def encode(self, symbols):
+        """
+        :return: Упакованные байты (старший бит первым, хвост дополнен нулями) и число бит.
+        """
+        out = bytearray()
+        pending = np.empty(0, dtype=np.uint8)
+        total_bits = 0
+        index = self.index
+        symbols = iter(symbols)
+        while True:
+            block = np.fromiter((index[symbol] for symbol in islice(symbols, ENCODE_BLOCK)), dtype=np.int64)
+            if not block.size:
+                break
+            lengths = self._length[block]
+            count = int(lengths.sum())
+            ends = np.cumsum(lengths)
+            # Для каждого бита выхода: код символа и номер бита от старшего
+            shift = np.repeat(ends, lengths) - 1 - np.arange(count)
+            bits = (np.repeat(self._code[block], lengths) >> shift) & 1
+            pending = _pack_bits(bits.astype(np.uint8), pending, out)
+            total_bits += count
+        if pending.size:
+            out += np.packbits(pending).tobytes()
+        return bytes(out), total_bits
+
+    @staticmethod
+    def _words(data):
+        # 64-битные слова данных (старший бит первым) блоками по DECODE_BLOCK байт;
+        # хвост дополняется нулями до целого слова
+        for begin in range(0, len(data), DECODE_BLOCK):
+            block = bytes(data[begin:begin + DECODE_BLOCK])
+            block += bytes(-len(block) % 8)
+            yield from np.frombuffer(block, dtype=">u8").tolist()
+
+    def decode(self, data, count):
+        """
+        :return: Список из count декодированных символов.
+        """
+        out = []
+        if not count:
+            return out
+        if not self.symbols:
+            raise ValueError("Повреждённые данные Хаффмана: неизвестный код")
+        symbols = self.symbols
+        first_code = self._first_code
+        first_index = self._first_index
+        max_length = self.max_length
+        table_bits = self._table_bits
+        table_mask = (1 << table_bits) - 1
+        table_length = self._table_length
+        table_symbol = self._table_symbol
+        limit = self._limit
+        max_mask = (1 << max_length) - 1
+        total = len(data) * 8
+        # После данных — нули: окно всегда можно дочитать до max_length бит, а выход за конец
+        # данных проверяется по числу прочитанных бит
+        next_word = chain(self._words(data), repeat(0)).__next__
+        window = 0  # Непрочитанные биты — младшие bits бит окна
+        bits = 0
+        used = 0
+        append = out.append
+        for _ in range(count):
+            if bits < max_length:  # max_length <= 62, одного слова хватает
+                if used > total:
+                    break
+                window = (window & ((1 << bits) - 1)) << 64 | next_word()
+                bits += 64
+            peek = window >> (bits - table_bits) & table_mask
+            length = table_length[peek]
+            if length:
+                append(table_symbol[peek])
+            else:
+                code = window >> (bits - max_length) & max_mask
+                i = bisect_right(limit, code)
+                if i == len(limit):
+                    if used + max_length > total:
+                        break
+                    raise ValueError("Повреждённые данные Хаффмана: неизвестный код")
+                length = table_bits + 1 + i
+                append(symbols[first_index[length] + (code >> (max_length - length)) - first_code[length]])
+            bits -= length
+            used += length
+        if used > total or len(out) < count:
+            raise ValueError("Данные Хаффмана обрываются раньше, чем закончились символы")
+        return out
+
+
+def measure_throughput(codec, chunks):
+    """
+    Кодирует и декодирует поток кусков текста по одному куску, проверяет совпадение.
+    :return: Словарь: скорость кодирования и декодирования (МБ/с текста), число бит, совпадение.
+    """
+    encode_seconds = 0.0
+    decode_seconds = 0.0
+    input_bytes = 0
+    total_bits = 0
+    roundtrip = True
+    for chunk in iter_chunks(chunks):
+        started = time.perf_counter()
+        data, bits = codec.encode(chunk)
+        encoded = time.perf_counter()
+        decoded_text = codec.decode(data, len(chunk))
+        decoded = time.perf_counter()
+        encode_seconds += encoded - started
+        decode_seconds += decoded - encoded
+        input_bytes += len(chunk.encode("utf-8"))
+        total_bits += bits
+        roundtrip = roundtrip and decoded_text == chunk
+    megabytes = input_bytes / 1e6
+    return {
+        "encode_mb_s": megabytes / max(encode_seconds, 1e-9),
+        "decode_mb_s": megabytes / max(decode_seconds, 1e-9),
+        "bits": total_bits,
+        "roundtrip": roundtrip,
+    }
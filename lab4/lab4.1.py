@@ -1,42 +1,36 @@
-import re
-from collections import Counter
-import requests
+import argparse
 
+from corpus import GUTENBERG_URL, open_corpus, peek
+from ngrams import NgramModel, parallel_ngram_counts
+from normalize import TextNormalizer, limit_alphabet
 
 
-# 1. Получение англоязычного текста (~4 страницы)
-def get_english_text():
-    url = "https://www.gutenberg.org/cache/epub/33870/pg33870.txt"  # Chess Fundamentals from Project Gutenberg
-    response = requests.get(url)
-    text = response.text[:16000]  # Берем первые 16000 символов
-    return text
 
+# 1. Получение англоязычного текста (~4 страницы) потоком кусков: URL загружается один раз
+# и дальше читается из кэша, можно указать и локальный файл
+def get_english_text(source=GUTENBERG_URL, prefix=16000, offline=False):
+    return open_corpus(source, prefix=prefix, offline=offline)  # Берем первые prefix символов
 
-# 2. Предварительная обработка текста
-def preprocess_text(text):
-    # Приводим к нижнему регистру
-    text = text.lower()
-    # Оставляем только буквы и пробел (можно добавить другие символы по необходимости)
-    allowed_chars = set("abcdefghijklmnopqrstuvwxyz ")
-    text = ''.join(c for c in text if c in allowed_chars)
-    # Удаляем множественные пробелы
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
 
+# 2. Предварительная обработка текста: один проход по таблице перевода, куски не склеиваются
+def preprocess_text(chunks):
+    return TextNormalizer().normalize(chunks)
 
-# 3. Ограничение до 64 различных символов
-def limit_characters(text, max_chars=64):
-    # Находим самые частые символы
-    char_counter = Counter(text)
-    most_common_chars = [char for char, count in char_counter.most_common(max_chars)]
-    # Оставляем только эти символы в тексте
-    filtered_text = ''.join(c for c in text if c in most_common_chars)
-    return filtered_text, most_common_chars
+
+# 3. Ограничение до 64 различных символов: первый проход считает символы, следующие фильтруют
+def limit_characters(open_chunks, max_chars=64):
+    # open_chunks — функция, каждый раз заново открывающая поток обработанного текста (или строка).
+    # Возвращается такая же функция для текста с ограниченным набором символов: текст целиком не хранится
+    most_common_chars, open_filtered = limit_alphabet(open_chunks, max_chars)
+    return open_filtered, most_common_chars
 
 
 # 4. Анализ частоты символов
-def analyze_char_frequency(text):
-    char_counter = Counter(text)
+def analyze_char_frequency(chunks, workers=1):
+    if workers == 1:
+        char_counter = NgramModel(1, max_symbols=256).fit(chunks).distribution(1)
+    else:  # Куски считаются в пуле процессов, результат тот же
+        char_counter = parallel_ngram_counts(chunks, (1,), workers or None)[1]
     total_chars = sum(char_counter.values())
 
     print("\nЧастота символов:")
@@ -47,9 +41,11 @@ def analyze_char_frequency(text):
 
 
 # 5. Анализ частоты пар символов (биграмм)
-def analyze_bigram_frequency(text):
-    bigrams = [text[i:i + 2] for i in range(len(text) - 1)]
-    bigram_counter = Counter(bigrams)
+def analyze_bigram_frequency(chunks, workers=1):
+    if workers == 1:
+        bigram_counter = NgramModel(2, max_symbols=256).fit(chunks).distribution(2)  # Биграммы на стыках кусков учтены
+    else:
+        bigram_counter = parallel_ngram_counts(chunks, (2,), workers or None)[2]
     total_bigrams = sum(bigram_counter.values())
 
     print("\nЧастота биграмм (топ-20):")
@@ -60,26 +56,40 @@ def analyze_bigram_frequency(text):
 
 
 def main():
-    # 1. Получаем текст
-    text = get_english_text()
-    print(f"Исходный текст (первые 200 символов):\n{text[:200]}...")
+    parser = argparse.ArgumentParser(description="Анализ и кодирование англоязычного текста")
+    parser.add_argument("--source", default=GUTENBERG_URL, help="локальный файл или URL (загружается один раз и кэшируется)")
+    parser.add_argument("--prefix", type=int, default=16000, help="сколько первых символов текста брать (0 — весь текст)")
+    parser.add_argument("--offline", action="store_true", help="не обращаться к сети, брать URL только из кэша")
+    parser.add_argument("--workers", type=int, default=1, help="процессов для подсчёта частот (0 — по числу ядер)")
+    args = parser.parse_args()
+
+    # 1. Получаем текст (каждый вызов открывает поток заново, текст целиком не хранится)
+    def open_text():
+        return get_english_text(args.source, args.prefix or None, args.offline)
+
+    head, _ = peek(open_text())
+    print(f"Исходный текст (первые 200 символов):\n{head}...")
 
     # 2. Обрабатываем текст
-    processed_text = preprocess_text(text)
-    print(f"\nОбработанный текст (первые 200 символов):\n{processed_text[:200]}...")
+    def open_processed_text():
+        return preprocess_text(open_text())
+
+    head, _ = peek(open_processed_text())
+    print(f"\nОбработанный текст (первые 200 символов):\n{head}...")
 
     # 3. Ограничиваем набор символов
-    limited_text, used_chars = limit_characters(processed_text)
-    print(f"\nТекст с ограниченным набором символов (64 символа):\n{limited_text[:200]}...")
+    open_limited_text, used_chars = limit_characters(open_processed_text)
+    head, _ = peek(open_limited_text())
+    print(f"\nТекст с ограниченным набором символов (64 символа):\n{head}...")
     print(f"\nИспользуемые символы ({len(used_chars)}): {sorted(used_chars)}")
 
     # 4. Анализ частоты символов
-    analyze_char_frequency(limited_text)
+    analyze_char_frequency(open_limited_text(), args.workers)
 
     # 5. Анализ частоты биграмм
-    analyze_bigram_frequency(limited_text)
+    analyze_bigram_frequency(open_limited_text(), args.workers)
 
-    print(len(limited_text) * 5)
+    print(sum(len(chunk) for chunk in open_limited_text()) * 5)
 
 
 if __name__ == "__main__":
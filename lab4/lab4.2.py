@@ -1,43 +1,40 @@
-import re
-from collections import Counter, defaultdict
-import requests
+import argparse
+from collections import defaultdict
 import heapq
 import math
 
+from corpus import GUTENBERG_URL, iter_chunks, open_corpus, peek
+from huffman import (HuffmanCodec, canonical_codes, huffman_code_lengths, length_limited_code_lengths,
+                     measure_throughput, pack_code_lengths)
+from ngrams import NgramModel, parallel_ngram_counts, conditional_entropies
+from normalize import TextNormalizer, limit_alphabet
 
-# 1. Получение англоязычного текста (~4 страницы)
-def get_english_text():
-    url = "https://www.gutenberg.org/cache/epub/33870/pg33870.txt"  # Chess Fundamentals from Project Gutenberg
-    response = requests.get(url)
-    text = response.text[:16000]  # Берем первые 16000 символов
-    return text
 
+# 1. Получение англоязычного текста (~4 страницы) потоком кусков: URL загружается один раз
+# и дальше читается из кэша, можно указать и локальный файл
+def get_english_text(source=GUTENBERG_URL, prefix=16000, offline=False):
+    return open_corpus(source, prefix=prefix, offline=offline)  # Берем первые prefix символов
 
-# 2. Предварительная обработка текста
-def preprocess_text(text):
-    # Приводим к нижнему регистру
-    text = text.lower()
-    # Оставляем только буквы и пробел (можно добавить другие символы по необходимости)
-    allowed_chars = set("abcdefghijklmnopqrstuvwxyz ")
-    text = ''.join(c for c in text if c in allowed_chars)
-    # Удаляем множественные пробелы
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
 
+# 2. Предварительная обработка текста: один проход по таблице перевода, куски не склеиваются
+def preprocess_text(chunks):
+    return TextNormalizer().normalize(chunks)
 
-# 3. Ограничение до 64 различных символов
-def limit_characters(text, max_chars=64):
-    # Находим самые частые символы
-    char_counter = Counter(text)
-    most_common_chars = [char for char, count in char_counter.most_common(max_chars)]
-    # Оставляем только эти символы в тексте
-    filtered_text = ''.join(c for c in text if c in most_common_chars)
-    return filtered_text, most_common_chars
+
+# 3. Ограничение до 64 различных символов: первый проход считает символы, следующие фильтруют
+def limit_characters(open_chunks, max_chars=64):
+    # open_chunks — функция, каждый раз заново открывающая поток обработанного текста (или строка).
+    # Возвращается такая же функция для текста с ограниченным набором символов: текст целиком не хранится
+    most_common_chars, open_filtered = limit_alphabet(open_chunks, max_chars)
+    return open_filtered, most_common_chars
 
 
 # 4. Анализ частоты символов
-def analyze_char_frequency(text):
-    char_counter = Counter(text)
+def analyze_char_frequency(chunks, workers=1):
+    if workers == 1:
+        char_counter = NgramModel(1, max_symbols=256).fit(chunks).distribution(1)
+    else:  # Куски считаются в пуле процессов, результат тот же
+        char_counter = parallel_ngram_counts(chunks, (1,), workers or None)[1]
     total_chars = sum(char_counter.values())
 
     frequencies = {}
@@ -51,9 +48,11 @@ def analyze_char_frequency(text):
 
 
 # 5. Анализ частоты пар символов (биграмм)
-def analyze_bigram_frequency(text):
-    bigrams = [text[i:i + 2] for i in range(len(text) - 1)]
-    bigram_counter = Counter(bigrams)
+def analyze_bigram_frequency(chunks, workers=1):
+    if workers == 1:
+        bigram_counter = NgramModel(2, max_symbols=256).fit(chunks).distribution(2)  # Биграммы на стыках кусков учтены
+    else:
+        bigram_counter = parallel_ngram_counts(chunks, (2,), workers or None)[2]
     total_bigrams = sum(bigram_counter.values())
 
     print("\nЧастота биграмм (топ-20):")
@@ -64,6 +63,8 @@ def analyze_bigram_frequency(text):
 
 # Класс для узла дерева Хаффмана
 class HuffmanNode:
+    __slots__ = ("char", "freq", "left", "right")
+
     def __init__(self, char=None, freq=0, left=None, right=None):
         self.char = char
         self.freq = freq
@@ -103,9 +104,19 @@ def generate_huffman_codes(node, code="", codes=None):
     return codes
 
 
-# Кодирование текста с использованием кодов Хаффмана
+# Кодирование текста (строки или потока кусков) с использованием кодов Хаффмана: биты упакованы в байты
 def huffman_encode(text, codes):
-    return ''.join([codes[char] for char in text])
+    return HuffmanCodec(codes).encode(text)  # (байты, число бит)
+
+
+# Декодирование по таблице переходов на целый байт
+def huffman_decode(data, codes, length):
+    return HuffmanCodec(codes).decode(data, length)
+
+
+# Число бит кода для потока кусков: куски кодируются по одному, упакованные байты не хранятся
+def count_bits(codec, chunks):
+    return sum(codec.encode(chunk)[1] for chunk in iter_chunks(chunks))
 
 
 # Расчет энтропии Шеннона
@@ -118,24 +129,39 @@ def calculate_shannon_entropy(frequencies):
 
 
 def main():
-    # 1. Получаем текст
-    text = get_english_text()
-    print(f"Исходный текст (первые 200 символов):\n{text[:200]}...")
+    parser = argparse.ArgumentParser(description="Анализ и кодирование англоязычного текста")
+    parser.add_argument("--source", default=GUTENBERG_URL, help="локальный файл или URL (загружается один раз и кэшируется)")
+    parser.add_argument("--prefix", type=int, default=16000, help="сколько первых символов текста брать (0 — весь текст)")
+    parser.add_argument("--offline", action="store_true", help="не обращаться к сети, брать URL только из кэша")
+    parser.add_argument("--workers", type=int, default=1, help="процессов для подсчёта частот (0 — по числу ядер)")
+    args = parser.parse_args()
+
+    # 1. Получаем текст (каждый вызов открывает поток заново, текст целиком не хранится)
+    def open_text():
+        return get_english_text(args.source, args.prefix or None, args.offline)
+
+    head, _ = peek(open_text())
+    print(f"Исходный текст (первые 200 символов):\n{head}...")
 
     # 2. Обрабатываем текст
-    processed_text = preprocess_text(text)
-    print(f"\nОбработанный текст (первые 200 символов):\n{processed_text[:200]}...")
+    def open_processed_text():
+        return preprocess_text(open_text())
+
+    head, _ = peek(open_processed_text())
+    print(f"\nОбработанный текст (первые 200 символов):\n{head}...")
 
     # 3. Ограничиваем набор символов
-    limited_text, used_chars = limit_characters(processed_text)
-    print(f"\nТекст с ограниченным набором символов (64 символа):\n{limited_text[:200]}...")
+    open_limited_text, used_chars = limit_characters(open_processed_text)
+    head, _ = peek(open_limited_text())
+    print(f"\nТекст с ограниченным набором символов (64 символа):\n{head}...")
     print(f"\nИспользуемые символы ({len(used_chars)}): {sorted(used_chars)}")
 
     # 4. Анализ частоты символов
-    frequencies = analyze_char_frequency(limited_text)
+    frequencies = analyze_char_frequency(open_limited_text(), args.workers)
+    text_length = sum(len(chunk) for chunk in open_limited_text())
 
     # 5. Анализ частоты биграмм
-    analyze_bigram_frequency(limited_text)
+    analyze_bigram_frequency(open_limited_text(), args.workers)
 
     # 6. Построение кодов Хаффмана
     huffman_tree = build_huffman_tree(frequencies)
@@ -145,24 +171,50 @@ def main():
     for char, code in sorted(huffman_codes.items(), key=lambda x: len(x[1])):
         print(f"'{char}': {code} (длина: {len(code)})")
 
-    # 7. Кодирование текста
-    encoded_huffman = huffman_encode(limited_text, huffman_codes)
-    print(f"\nЗакодированный текст Хаффмана (первые 200 бит):\n{encoded_huffman[:200]}...")
-    print(f"Общее количество бит (Хаффман): {len(encoded_huffman)}")
+    # 7. Кодирование текста: по кускам, упакованные байты целиком не хранятся.
+    # Первые 200 бит кода — это код первых (не больше) 200 символов
+    preview_bytes, _ = huffman_encode(head, huffman_codes)
+    throughput = measure_throughput(HuffmanCodec(huffman_codes), open_limited_text())
+    huffman_bits = throughput["bits"]
+    preview = ''.join(f"{byte:08b}" for byte in preview_bytes[:25])[:min(200, huffman_bits)]
+    print(f"\nЗакодированный текст Хаффмана (первые 200 бит):\n{preview}...")
+    print(f"Общее количество бит (Хаффман): {huffman_bits}")
+    print(f"Размер упакованных данных: {(huffman_bits + 7) // 8} байт")
+
+    # Декодирование (каждый кусок восстанавливается и сверяется с исходным) и скорость кодека
+    print(f"Декодированный текст совпадает с исходным: {throughput['roundtrip']}")
+    print(f"Скорость: кодирование {throughput['encode_mb_s']:.1f} МБ/с, "
+          f"декодирование {throughput['decode_mb_s']:.1f} МБ/с")
+
+    # Канонические коды: длины те же, но таблицу можно передать одним списком длин
+    alphabet = sorted(huffman_codes)
+    code_lengths = huffman_code_lengths(frequencies)
+    canonical_bits = count_bits(HuffmanCodec(canonical_codes(code_lengths)), open_limited_text())
+    print(f"\nКанонический код Хаффмана: {canonical_bits} бит, "
+          f"таблица — {len(pack_code_lengths(code_lengths, alphabet))} байт длин")
+    # На 2 бита короче самого длинного кода, но не меньше, чем нужно для всего алфавита
+    max_length = max(max(code_lengths.values()) - 2, (len(code_lengths) - 1).bit_length(), 1)
+    limited_lengths = length_limited_code_lengths(frequencies, max_length)
+    limited_bits = count_bits(HuffmanCodec(canonical_codes(limited_lengths)), open_limited_text())
+    print(f"Код с длиной не больше {max_length} (package-merge): {limited_bits} бит")
 
     # 8. Сравнение с равномерными кодами (6 бит на символ)
-    uniform_code_length = len(limited_text) * 6
+    uniform_code_length = text_length * 6
     print(f"Общее количество бит (равномерные коды): {uniform_code_length}")
 
     # 9. Расчет энтропии Шеннона
     entropy = calculate_shannon_entropy(frequencies)
     print(f"\nЭнтропия Шеннона: {entropy:.4f} бит/символ")
-    print(f"Минимальное теоретическое количество бит: {entropy * len(limited_text):.2f}")
+    print(f"Минимальное теоретическое количество бит: {entropy * text_length:.2f}")
+    # Условные энтропии: сколько бит на символ остаётся, если учитывать предыдущие символы
+    for n, conditional in enumerate(conditional_entropies(open_limited_text(), order=3), start=1):
+        condition = " | " + ",".join(f"X{i}" for i in range(1, n)) if n > 1 else ""
+        print(f"H(X{n}{condition}): {conditional:.4f} бит/символ")
 
     # 10. Сравнение эффективности
-    compression_ratio = (uniform_code_length - len(encoded_huffman)) / uniform_code_length * 100
+    compression_ratio = (uniform_code_length - huffman_bits) / uniform_code_length * 100
     print(f"\nКоэффициент сжатия по сравнению с равномерными кодами: {compression_ratio:.2f}%")
-    efficiency = (entropy * len(limited_text)) / len(encoded_huffman) * 100
+    efficiency = (entropy * text_length) / huffman_bits * 100
     print(f"Эффективность кодирования Хаффмана: {efficiency:.2f}% от теоретического минимума")
 
 
@@ -1,44 +1,44 @@
-import re
-from collections import Counter, defaultdict
-import requests
+import argparse
+from collections import defaultdict
 import math
 import heapq
+import tempfile
 from functools import total_ordering
 
+from corpus import GUTENBERG_URL, iter_chunks, open_corpus, peek, text_slice
+from huffman import HuffmanCodec, huffman_code_lengths
+from lzw import POLICIES, lzw_compress_bytes, lzw_decompress_bytes, measure_throughput
+from ngrams import NgramModel, parallel_ngram_counts
+from normalize import TextNormalizer, limit_alphabet
+from rangecoder import ContextCoder, bits_per_char
+from stream import FrameReader, HuffmanFrames, encode_stream
 
-# 1. Получение англоязычного текста (~4 страницы)
-def get_english_text():
-    url = "https://www.gutenberg.org/cache/epub/33870/pg33870.txt"  # Chess Fundamentals from Project Gutenberg
-    response = requests.get(url)
-    text = response.text[:16000]  # Берем первые 16000 символов
-    return text
 
+# 1. Получение англоязычного текста (~4 страницы) потоком кусков: URL загружается один раз
+# и дальше читается из кэша, можно указать и локальный файл
+def get_english_text(source=GUTENBERG_URL, prefix=16000, offline=False):
+    return open_corpus(source, prefix=prefix, offline=offline)  # Берем первые prefix символов
 
-# 2. Предварительная обработка текста
-def preprocess_text(text):
-    # Приводим к нижнему регистру
-    text = text.lower()
-    # Оставляем только буквы и пробел (можно добавить другие символы по необходимости)
-    allowed_chars = set("abcdefghijklmnopqrstuvwxyz ")
-    text = ''.join(c for c in text if c in allowed_chars)
-    # Удаляем множественные пробелы
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
 
+# 2. Предварительная обработка текста: один проход по таблице перевода, куски не склеиваются
+def preprocess_text(chunks):
+    return TextNormalizer().normalize(chunks)
 
-# 3. Ограничение до 64 различных символов
-def limit_characters(text, max_chars=64):
-    # Находим самые частые символы
-    char_counter = Counter(text)
-    most_common_chars = [char for char, count in char_counter.most_common(max_chars)]
-    # Оставляем только эти символы в тексте
-    filtered_text = ''.join(c for c in text if c in most_common_chars)
-    return filtered_text, most_common_chars
+
+# 3. Ограничение до 64 различных символов: первый проход считает символы, следующие фильтруют
+def limit_characters(open_chunks, max_chars=64):
+    # open_chunks — функция, каждый раз заново открывающая поток обработанного текста (или строка).
+    # Возвращается такая же функция для текста с ограниченным набором символов: текст целиком не хранится
+    most_common_chars, open_filtered = limit_alphabet(open_chunks, max_chars)
+    return open_filtered, most_common_chars
 
 
 # 4. Анализ частоты символов
-def analyze_char_frequency(text):
-    char_counter = Counter(text)
+def analyze_char_frequency(chunks, workers=1):
+    if workers == 1:
+        char_counter = NgramModel(1, max_symbols=256).fit(chunks).distribution(1)
+    else:  # Куски считаются в пуле процессов, результат тот же
+        char_counter = parallel_ngram_counts(chunks, (1,), workers or None)[1]
     total_chars = sum(char_counter.values())
 
     print("\nЧастота символов:")
@@ -50,9 +50,11 @@ def analyze_char_frequency(text):
 
 
 # 5. Анализ частоты пар символов (биграмм)
-def analyze_bigram_frequency(text):
-    bigrams = [text[i:i + 2] for i in range(len(text) - 1)]
-    bigram_counter = Counter(bigrams)
+def analyze_bigram_frequency(chunks, workers=1):
+    if workers == 1:
+        bigram_counter = NgramModel(2, max_symbols=256).fit(chunks).distribution(2)  # Биграммы на стыках кусков учтены
+    else:
+        bigram_counter = parallel_ngram_counts(chunks, (2,), workers or None)[2]
     total_bigrams = sum(bigram_counter.values())
 
     print("\nЧастота биграмм (топ-20):")
@@ -63,51 +65,35 @@ def analyze_bigram_frequency(text):
     return bigram_counter
 
 
-# Реализация LZW кодирования
-def lzw_compress(text):
+# Реализация LZW кодирования: коды переменной ширины упакованы в байты, размер словаря ограничен
+def lzw_compress(text, max_size=1 << 16, policy="reset"):
     """Сжатие текста с использованием алгоритма LZW"""
-    # Инициализация словаря всеми возможными символами
-    dictionary = {chr(i): i for i in range(256)}
-    next_code = 256
-    compressed = []
-
-    w = ""
-    for c in text:
-        wc = w + c
-        if wc in dictionary:
-            w = wc
-        else:
-            compressed.append(dictionary[w])
-            dictionary[wc] = next_code
-            next_code += 1
-            w = c
-
-    if w:
-        compressed.append(dictionary[w])
-
-    return compressed
-
-
-def calculate_bits(compressed_codes):
-    """Вычисление общего количества бит для LZW кодов"""
-    if not compressed_codes:
-        return 0
+    # Словарь изначально содержит все байты; текст после обработки — ASCII, то есть chr(0..255)
+    return lzw_compress_bytes(text.encode("utf-8"), max_size, policy)
+
+
+def lzw_decompress(data, max_size=1 << 16, policy="reset"):
+    """Восстановление текста из байт lzw_compress"""
+    return lzw_decompress_bytes(data, max_size, policy).decode("utf-8")
 
-    max_code = max(compressed_codes)
-    bits_per_code = max(1, math.ceil(math.log2(max_code + 1)))
-    return len(compressed_codes) * bits_per_code
+
+def calculate_bits(compressed):
+    """Вычисление общего количества бит для LZW: ширина кода растёт вместе со словарём"""
+    return len(compressed) * 8
 
 
 # Реализация равномерного кодирования
 def uniform_encoding(text, char_set):
-    """Равномерное кодирование текста"""
+    """Равномерное кодирование текста (строки или потока кусков)"""
     bits_per_char = math.ceil(math.log2(len(char_set)))
-    return len(text) * bits_per_char
+    return sum(len(chunk) for chunk in iter_chunks(text)) * bits_per_char
 
 
 # Реализация кодирования Хаффмана
 @total_ordering
 class HuffmanNode:
+    __slots__ = ("char", "freq", "left", "right")
+
     def __init__(self, char, freq, left=None, right=None):
         self.char = char
         self.freq = freq
@@ -152,12 +138,12 @@ def build_huffman_codes(node, prefix="", code_dict=None):
 
 
 def huffman_encoding(text, freq_dict):
-    """Вычисление общего количества бит для кодирования Хаффмана"""
+    """Вычисление общего количества бит для кодирования Хаффмана (текст — строка или поток кусков)"""
     if len(freq_dict) == 0:
         return 0
 
     if len(freq_dict) == 1:
-        return len(text)  # Каждый символ кодируется 1 битом
+        return sum(len(chunk) for chunk in iter_chunks(text))  # Каждый символ кодируется 1 битом
 
     tree = build_huffman_tree(freq_dict)
     if tree is None:
@@ -165,57 +151,108 @@ def huffman_encoding(text, freq_dict):
 
     codes = build_huffman_codes(tree)
 
-    total_bits = 0
-    for char in text:
-        total_bits += len(codes[char])
-
-    return total_bits
+    # Настоящее кодирование с упаковкой бит, по кускам; возвращаем, как и раньше, число бит
+    codec = HuffmanCodec(codes)
+    return sum(codec.encode(chunk)[1] for chunk in iter_chunks(text))
 
 
 def main():
-    # 1. Получаем текст
-    text = get_english_text()
-    print(f"Исходный текст (первые 200 символов):\n{text[:200]}...")
+    parser = argparse.ArgumentParser(description="Анализ и кодирование англоязычного текста")
+    parser.add_argument("--source", default=GUTENBERG_URL, help="локальный файл или URL (загружается один раз и кэшируется)")
+    parser.add_argument("--prefix", type=int, default=16000, help="сколько первых символов текста брать (0 — весь текст)")
+    parser.add_argument("--offline", action="store_true", help="не обращаться к сети, брать URL только из кэша")
+    parser.add_argument("--workers", type=int, default=1, help="процессов для подсчёта частот (0 — по числу ядер)")
+    parser.add_argument("--lzw-max-size", type=int, default=1 << 16, help="размер словаря LZW в кодах (0 — без ограничения)")
+    parser.add_argument("--lzw-policy", choices=POLICIES, default="reset", help="что делать с заполненным словарём LZW")
+    args = parser.parse_args()
+
+    # 1. Получаем текст (каждый вызов открывает поток заново, текст целиком не хранится)
+    def open_text():
+        return get_english_text(args.source, args.prefix or None, args.offline)
+
+    head, _ = peek(open_text())
+    print(f"Исходный текст (первые 200 символов):\n{head}...")
 
     # 2. Обрабатываем текст
-    processed_text = preprocess_text(text)
-    print(f"\nОбработанный текст (первые 200 символов):\n{processed_text[:200]}...")
+    def open_processed_text():
+        return preprocess_text(open_text())
+
+    head, _ = peek(open_processed_text())
+    print(f"\nОбработанный текст (первые 200 символов):\n{head}...")
 
     # 3. Ограничиваем набор символов
-    limited_text, used_chars = limit_characters(processed_text)
-    print(f"\nТекст с ограниченным набором символов (64 символа):\n{limited_text[:200]}...")
+    open_limited_text, used_chars = limit_characters(open_processed_text)
+    head, _ = peek(open_limited_text())
+    print(f"\nТекст с ограниченным набором символов (64 символа):\n{head}...")
     print(f"\nИспользуемые символы ({len(used_chars)}): {sorted(used_chars)}")
 
     # 4. Анализ частоты символов
-    char_counter = analyze_char_frequency(limited_text)
+    char_counter = analyze_char_frequency(open_limited_text(), args.workers)
+    text_length = sum(char_counter.values())
 
     # 5. Анализ частоты биграмм
-    bigram_counter = analyze_bigram_frequency(limited_text)
+    bigram_counter = analyze_bigram_frequency(open_limited_text(), args.workers)
 
-    # 6. Кодирование LZW
-    lzw_compressed = lzw_compress(limited_text)
-    lzw_bits = calculate_bits(lzw_compressed)
+    # 6. Кодирование LZW: куски сжимаются и сразу восстанавливаются, сжатые данные целиком не хранятся
+    lzw_options = (args.lzw_max_size or None, args.lzw_policy)
+    throughput = measure_throughput((chunk.encode("utf-8") for chunk in open_limited_text()), *lzw_options)
+    lzw_bits = throughput["bytes"] * 8
     print(f"\nLZW кодирование:")
-    print(f"Количество кодов: {len(lzw_compressed)}")
+    print(f"Размер: {throughput['bytes']} байт")
     print(f"Общее количество бит: {lzw_bits}")
+    print(f"Декодированный текст совпадает с исходным: {throughput['roundtrip']}")
+    print(f"Скорость: сжатие {throughput['compress_mb_s']:.1f} МБ/с, "
+          f"восстановление {throughput['decompress_mb_s']:.1f} МБ/с")
 
     # 7. Равномерное кодирование
-    uniform_bits = uniform_encoding(limited_text, used_chars)
+    uniform_bits = uniform_encoding(open_limited_text(), used_chars)
     print(f"\nРавномерное кодирование:")
-    print(f"Количество символов: {len(limited_text)}")
+    print(f"Количество символов: {text_length}")
     print(f"Бит на символ: {math.ceil(math.log2(len(used_chars)))}")
     print(f"Общее количество бит: {uniform_bits}")
 
     # 8. Кодирование Хаффмана
-    huffman_bits = huffman_encoding(limited_text, char_counter)
+    huffman_bits = huffman_encoding(open_limited_text(), char_counter)
     print(f"\nКодирование Хаффмана:")
     print(f"Общее количество бит: {huffman_bits}")
 
-    # 9. Сравнение методов
+    # 9. Потоковое кодирование кадрами: текст подаётся кусками, любой фрагмент читается без декодирования всего
+    with tempfile.TemporaryFile() as container:
+        for data in encode_stream(open_limited_text(), HuffmanFrames(huffman_code_lengths(char_counter)),
+                                  frame_chars=4096):
+            container.write(data)
+        reader = FrameReader(container)
+        middle = text_length // 2
+        fragment = text_slice(open_limited_text(), middle, middle + 100)
+        print(f"\nКонтейнер Хаффмана: {container.seek(0, 2)} байт, кадров: {len(reader.offsets)}")
+        print(f"Фрагмент из середины совпадает: {reader.read(middle, middle + 100) == fragment}")
+
+    # 10. Контекстная модель + интервальное кодирование: вероятность символа при известном предыдущем
+    trigram_counter = NgramModel(3, used_chars, max_symbols=len(used_chars)).fit(open_limited_text()).distribution(3)
+    print(f"\nКонтекстная модель + интервальное (range) кодирование:")
+    context_results = {}
+    for name, coder in (("порядок 1, статическая по биграммам", ContextCoder.from_counts(bigram_counter, used_chars)),
+                        ("порядок 2, статическая по триграммам", ContextCoder.from_counts(trigram_counter, used_chars)),
+                        ("порядок 1, адаптивная", ContextCoder(used_chars, 1)),
+                        ("порядок 2, адаптивная", ContextCoder(used_chars, 2))):
+        rate, roundtrip = bits_per_char(coder, open_limited_text)
+        context_results[name] = rate
+        print(f"{name}: {rate:.3f} бит/символ, декодированный текст совпадает: {roundtrip}")
+    print("(для статических моделей таблица частот хранится отдельно и здесь не учтена)")
+    context_bits = context_results["порядок 1, адаптивная"] * text_length
+
+    # 11. Сравнение методов
     print(f"\nСравнение методов кодирования:")
     print(f"LZW / Равномерное: {lzw_bits / uniform_bits:.2%}")
     print(f"LZW / Хаффман: {lzw_bits / huffman_bits:.2%}")
     print(f"Хаффман / Равномерное: {huffman_bits / uniform_bits:.2%}")
+    print(f"Контекстная (порядок 1, адаптивная) / Хаффман: {context_bits / huffman_bits:.2%}")
+    print(f"\nБит на символ:")
+    print(f"Равномерное: {uniform_bits / text_length:.3f}")
+    print(f"Хаффман: {huffman_bits / text_length:.3f}")
+    print(f"LZW: {lzw_bits / text_length:.3f}")
+    for name, rate in context_results.items():
+        print(f"Контекстная, {name}: {rate:.3f}")
 
 
 if __name__ == "__main__":
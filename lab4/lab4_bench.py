@@ -0,0 +1,280 @@
+import argparse
+import json
+import math
+import platform
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from corpus import CHUNK_SIZE, GUTENBERG_URL, open_corpus
+from ngrams import NgramModel
+from normalize import TextNormalizer, limit_alphabet
+from rangecoder import ContextCoder
+from stream import HuffmanFrames, LZWFrames
+
+# Размеры синтетических корпусов в символах (текст после обработки — ASCII, то есть и в байтах)
+SIZES = {
+    "16k": 16 * 1024,
+    "256k": 256 * 1024,
+    "1m": 1 << 20,
+    "16m": 1 << 24,
+    "256m": 1 << 28,
+    "1g": 1 << 30,
+}
+
+
+class MarkovSource:
+    """
+    Распределения символов и биграмм, измеренные на настоящем тексте, и генератор
+    синтетического текста с теми же распределениями.
+    """
+
+    def __init__(self, chunks):
+        model = NgramModel(2, max_symbols=256).fit(chunks)
+        self.alphabet = list(model.symbols)
+        self.char_counts = model.distribution(1)
+        self.bigram_counts = model.distribution(2)
+        k = len(self.alphabet)
+        keys, counts, _ = model.counts(1)
+        self.unigram = np.zeros(k)
+        self.unigram[keys] = counts
+        self.unigram /= self.unigram.sum()
+        keys, counts, _ = model.counts(2)
+        transitions = np.zeros((k, k))
+        transitions[keys // model.max_symbols, keys % model.max_symbols] = counts
+        empty = transitions.sum(axis=1) == 0  # После последнего символа текста ничего нет
+        transitions[empty] = self.unigram
+        self.transitions = transitions / transitions.sum(axis=1, keepdims=True)
+        self._chars = np.array([ord(char) for char in self.alphabet], dtype=np.uint32)
+
+    @staticmethod
+    def _alias_tables(rows):
+        # Метод Уолкера (вариант Воуза): выбор из k исходов за одно сравнение
+        k = rows.shape[1]
+        prob = np.ones(rows.shape)
+        alias = np.tile(np.arange(k), (rows.shape[0], 1))
+        for row, p in enumerate(rows):
+            scaled = list(p * k)
+            small = [i for i, value in enumerate(scaled) if value < 1]
+            large = [i for i, value in enumerate(scaled) if value >= 1]
+            while small and large:
+                less, more = small.pop(), large.pop()
+                prob[row, less] = scaled[less]
+                alias[row, less] = more
+                scaled[more] -= 1 - scaled[less]
+                (small if scaled[more] < 1 else large).append(more)
+        return prob, alias
+
+    def generate(self, size, order=1, seed=0, chunk_size=CHUNK_SIZE):
+        """
+        :param order: 0 — символы независимы (частоты символов), 1 — цепь Маркова по биграммам.
+        :return: Генератор кусков текста общей длиной size.
+        Цепи генерируются параллельно (много независимых цепей за шаг NumPy) и склеиваются;
+        каждая цепь не короче 256 символов, поэтому стыки почти не меняют частоты биграмм.
+        """
+        rng = np.random.default_rng(seed)
+        rows = self.transitions if order else np.tile(self.unigram, (len(self.alphabet), 1))
+        prob, alias = self._alias_tables(rows)
+        k = len(self.alphabet)
+        produced = 0
+        while produced < size:
+            n = min(chunk_size, size - produced)
+            chains = max(1, min(4096, n // 256))
+            steps = -(-n // chains)
+            codes = np.empty((chains, steps), dtype=np.int64)
+            state = rng.choice(k, size=chains, p=self.unigram)
+            codes[:, 0] = state
+            for t in range(1, steps):
+                pick = rng.integers(k, size=chains)
+                keep = rng.random(chains) < prob[state, pick]
+                state = np.where(keep, pick, alias[state, pick])
+                codes[:, t] = state
+            yield self._chars[codes.ravel()[:n]].tobytes().decode("utf-32-le")
+            produced += n
+
+
+class UniformCoder:
+    """
+    Равномерный код: каждый символ — номер в алфавите шириной ceil(log2 k) бит.
+    """
+
+    def __init__(self, alphabet):
+        self.alphabet = list(alphabet)
+        self.width = max(1, math.ceil(math.log2(len(self.alphabet))))
+        self._lookup = np.full(0x110000, -1, dtype=np.int64)
+        self._lookup[[ord(char) for char in self.alphabet]] = np.arange(len(self.alphabet))
+        self._chars = np.array([ord(char) for char in self.alphabet], dtype=np.uint32)
+        self._shifts = np.arange(self.width - 1, -1, -1)
+
+    def encode(self, text):
+        codes = self._lookup[np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)]
+        if (codes < 0).any():
+            raise KeyError("Символ не из алфавита")
+        bits = ((codes[:, None] >> self._shifts) & 1).astype(np.uint8)
+        return np.packbits(bits).tobytes()
+
+    def decode(self, data, count):
+        bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8))[:count * self.width]
+        codes = bits.reshape(count, self.width).astype(np.int64) @ (1 << self._shifts)
+        return self._chars[codes].tobytes().decode("utf-32-le")
+
+
+# Кодеры: по источнику строят объект с encode(text) -> bytes и decode(bytes, число символов) -> text.
+# Статические таблицы (Хаффман, контекстная по биграммам) строятся по измеренным частотам
+CODERS = {
+    "uniform": lambda source: UniformCoder(source.alphabet),
+    "huffman": lambda source: HuffmanFrames.from_frequencies(source.char_counts),
+    "lzw": lambda source: LZWFrames(1 << 16, "reset"),
+    "lzw_lru": lambda source: LZWFrames(1 << 12, "lru"),
+    "context1_static": lambda source: ContextCoder.from_counts(source.bigram_counts, source.alphabet),
+    "context1": lambda source: ContextCoder(source.alphabet, 1),
+    "context2": lambda source: ContextCoder(source.alphabet, 2),
+}
+
+# Корпуса: порядок цепи Маркова
+CORPORA = {
+    "chars": 0,  # Независимые символы с частотами исходного текста
+    "bigrams": 1,  # Цепь Маркова по частотам биграмм
+}
+
+
+def run_coder(coder, chunks):
+    """
+    Один прогон кодера по потоку кусков: каждый кусок сжимается и восстанавливается
+    отдельно, поэтому память не зависит от размера корпуса.
+    :return: Словарь со временем, размером сжатых данных и проверкой восстановления.
+    """
+    compress_seconds = 0.0
+    decompress_seconds = 0.0
+    chars = 0
+    input_bytes = 0
+    compressed = 0
+    roundtrip = True
+    for chunk in chunks:
+        started = time.perf_counter()
+        data = coder.encode(chunk)
+        encoded = time.perf_counter()
+        restored = coder.decode(data, len(chunk))
+        decoded = time.perf_counter()
+        compress_seconds += encoded - started
+        decompress_seconds += decoded - encoded
+        chars += len(chunk)
+        input_bytes += len(chunk.encode("utf-8"))
+        compressed += len(data)
+        roundtrip = roundtrip and restored == chunk
+    return {
+        "chars": chars,
+        "input_bytes": input_bytes,
+        "compressed_bytes": compressed,
+        "compress_seconds": compress_seconds,
+        "decompress_seconds": decompress_seconds,
+        "roundtrip": roundtrip,
+    }
+
+
+def peak_memory(coder, chunks):
+    # Отдельный прогон под tracemalloc: он заметно замедляет код, поэтому время меряем без него
+    tracemalloc.start()
+    try:
+        run_coder(coder, chunks)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def corpus_entropy(source, corpus, size, seed):
+    # Энтропия Шеннона по частотам символов корпуса (как calculate_shannon_entropy в lab4.2.py)
+    # и условная энтропия H(X2 | X1) — предел для контекстной модели порядка 1
+    model = NgramModel(2, source.alphabet, max_symbols=len(source.alphabet))
+    for chunk in source.generate(size, CORPORA[corpus], seed):
+        model.update(chunk)
+    return model.entropy(1), model.conditional_entropy(2)
+
+
+def run_case(source, corpus, size, coders, measure_memory, seed):
+    # Все кодеры на одном корпусе: он генерируется заново для каждого прогона с тем же seed
+    chars = SIZES[size]
+    entropy, conditional_entropy = corpus_entropy(source, corpus, chars, seed)
+    records = []
+    for name in coders:
+        coder = CODERS[name](source)
+        run = run_coder(coder, source.generate(chars, CORPORA[corpus], seed))
+        megabytes = run["input_bytes"] / 1e6
+        bits_per_char = run["compressed_bytes"] * 8 / chars
+        record = {
+            "corpus": corpus,
+            "size": size,
+            "coder": name,
+            **run,
+            "compress_mb_s": megabytes / max(run["compress_seconds"], 1e-9),
+            "decompress_mb_s": megabytes / max(run["decompress_seconds"], 1e-9),
+            "bits_per_char": bits_per_char,
+            "entropy_bits_per_char": entropy,
+            "conditional_entropy_bits_per_char": conditional_entropy,
+            "ratio_to_entropy": bits_per_char / entropy if entropy else None,
+            "peak_memory_bytes": peak_memory(coder, source.generate(chars, CORPORA[corpus], seed))
+            if measure_memory else None,
+        }
+        records.append(record)
+        # Энтропия нулевая, если в корпусе один символ: отношения к ней нет
+        ratio = "n/a" if record["ratio_to_entropy"] is None else f"{record['ratio_to_entropy']:.3f}"
+        print(f"{corpus:>8} {size:>5} {name:>16}: {bits_per_char:.3f} бит/символ "
+              f"({ratio} энтропии), сжатие {record['compress_mb_s']:.2f} МБ/с, "
+              f"восстановление {record['decompress_mb_s']:.2f} МБ/с")
+    return records
+
+
+def run_benchmarks(source, corpora, sizes, coders, measure_memory=True, seed=0):
+    results = []
+    for corpus in corpora:
+        for size in sizes:
+            results += run_case(source, corpus, size, coders, measure_memory, seed)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замеры кодеров lab4 на синтетических текстах")
+    parser.add_argument("--source", default=GUTENBERG_URL, help="текст, по которому измеряются частоты")
+    parser.add_argument("--prefix", type=int, default=0, help="сколько первых символов текста брать (0 — весь текст)")
+    parser.add_argument("--offline", action="store_true", help="не обращаться к сети, брать URL только из кэша")
+    parser.add_argument("--corpora", nargs="+", choices=list(CORPORA), default=list(CORPORA))
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["16k", "256k"])
+    parser.add_argument("--coders", nargs="+", choices=list(CODERS),
+                        default=[c for c in CODERS if c != "lzw_lru"])  # LRU-вытеснение на чистом Python медленное
+    parser.add_argument("--no-memory", action="store_true", help="не замерять пиковую память")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="lab4_bench.json", help="файл для результатов в формате JSON")
+    args = parser.parse_args()
+
+    # Частоты — по тексту после той же обработки, что в lab4.3.py
+    def open_processed_text():
+        return TextNormalizer().normalize(open_corpus(args.source, args.prefix or None, offline=args.offline))
+
+    _, open_limited_text = limit_alphabet(open_processed_text)
+    source = MarkovSource(open_limited_text())
+
+    results = run_benchmarks(source, args.corpora, args.sizes, args.coders, not args.no_memory, args.seed)
+    failures = [(record["corpus"], record["size"], record["coder"]) for record in results if not record["roundtrip"]]
+    for corpus, size, coder in failures:
+        print(f"Восстановленный текст не совпал с исходным: {corpus}, {size}, {coder}")
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "source": args.source,
+        "prefix": args.prefix,
+        "alphabet": ''.join(source.alphabet),
+        "seed": args.seed,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"Результаты записаны в {args.output}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
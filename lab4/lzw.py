@@ -0,0 +1,353 @@
+"""
+LZW для lab4: словарь — целочисленный бор (ключ prefix_code << 8 | byte), коды пишутся
+в байты переменной ширины (9 бит и больше, по мере роста словаря), размер словаря
+ограничен, при заполнении — сброс (код CLEAR) или вытеснение давно не использованной
+строки-листа (LRU). Кодер и декодер потоковые: feed(данные) -> байты, flush() в конце.
+
+Ширина кода: кодер пишет код шириной bit_length(size - 1), где size — число занятых кодов
+в этот момент. Декодер отстаёт на одну запись словаря, поэтому для чтения берёт свой
+размер плюс одну ожидающую запись — ширины всегда совпадают.
+"""
+import heapq
+import time
+from itertools import chain
+
+from corpus import iter_chunks
+
+CLEAR = 256  # Сброс словаря
+END = 257  # Конец потока
+FIRST_CODE = 258
+MIN_WIDTH = 9
+POLICIES = ("reset", "lru")
+
+
+class _Dictionary:
+    # Общая для кодера и декодера часть: размер словаря, ширина кода и вытеснение (LRU).
+    # Для LRU у каждой строки хранится время последнего использования, листья лежат в куче
+    # (с устаревшими записями, которые пропускаются). Кодер и декодер выполняют одни и те же
+    # действия в одном порядке, поэтому вытесняют одни и те же строки.
+    def __init__(self, max_size, policy):
+        if policy not in POLICIES:
+            raise ValueError(f"Неизвестная политика: {policy!r}, допустимые: {', '.join(POLICIES)}")
+        if max_size is not None and max_size <= FIRST_CODE:
+            raise ValueError(f"Словарь должен вмещать больше {FIRST_CODE} кодов")
+        self.max_size = max_size
+        self.policy = policy
+        self.reset()
+
+    def reset(self):
+        self.size = FIRST_CODE
+        self.parent = {}  # Код -> (код префикса, последний байт)
+        self.children = {}  # Код -> число строк, продолжающих его
+        self.used = {}  # Код -> время последнего использования
+        self.leaves = []  # Куча (время, код) листьев
+        self.clock = 0
+
+    def width(self, pending):
+        # pending — кодер уже добавил запись, которую декодер добавит только сейчас
+        size = self.size + pending
+        if self.max_size is not None:
+            size = min(size, self.max_size)
+        return max(MIN_WIDTH, (size - 1).bit_length())
+
+    def touch(self, code):
+        if code >= FIRST_CODE:
+            self.clock += 1
+            self.used[code] = self.clock
+            if not self.children[code]:
+                heapq.heappush(self.leaves, (self.clock, code))
+
+    def slot(self, prefix):
+        """
+        Код для новой записи с префиксом prefix: следующий свободный или, если словарь
+        заполнен, давно не использованный лист; None — записывать некуда.
+        Вытесненная запись удаляется.
+        """
+        if self.max_size is None or self.size < self.max_size:
+            return self.size
+        if len(self.leaves) > 4 * self.max_size:
+            # Слишком много устаревших записей — пересобираем кучу
+            self.leaves = [(self.used[code], code) for code in self.used if not self.children[code]]
+            heapq.heapify(self.leaves)
+        skipped = None
+        victim = None
+        while self.leaves:
+            used, code = heapq.heappop(self.leaves)
+            if self.used.get(code) != used or self.children[code]:
+                continue
+            if code == prefix:  # Префикс новой записи вытеснять нельзя
+                skipped = (used, code)
+                continue
+            victim = code
+            break
+        if skipped is not None:
+            heapq.heappush(self.leaves, skipped)
+        if victim is not None:
+            self.remove(victim)
+        return victim
+
+    def remove(self, code):
+        prefix, _ = self.parent.pop(code)
+        del self.children[code]
+        del self.used[code]
+        if prefix >= FIRST_CODE:
+            self.children[prefix] -= 1
+            if not self.children[prefix]:
+                heapq.heappush(self.leaves, (self.used[prefix], prefix))
+
+    def add(self, code, prefix, byte):
+        self.parent[code] = (prefix, byte)
+        self.children[code] = 0
+        if prefix >= FIRST_CODE:
+            self.children[prefix] += 1
+        self.clock += 1
+        self.used[code] = self.clock
+        heapq.heappush(self.leaves, (self.clock, code))
+        if code == self.size:
+            self.size += 1
+
+
+class LZWEncoder(_Dictionary):
+    def __init__(self, max_size=1 << 16, policy="reset"):
+        super().__init__(max_size, policy)
+        self.code = None  # Код самой длинной найденной строки, которая ещё не выдана
+        self.out = bytearray()
+        self.acc = 0  # Биты, ещё не ставшие целым байтом
+        self.nbits = 0
+
+    def reset(self):
+        super().reset()
+        self.trie = {}  # prefix_code << 8 | byte -> код строки
+
+    def remove(self, code):
+        prefix, byte = self.parent[code]
+        del self.trie[prefix << 8 | byte]
+        super().remove(code)
+
+    def _emit(self, code, pending=False):
+        width = self.width(pending)
+        self.acc = (self.acc << width) | code
+        self.nbits += width
+        while self.nbits >= 8:
+            self.nbits -= 8
+            self.out.append((self.acc >> self.nbits) & 0xFF)
+        self.acc &= (1 << self.nbits) - 1
+
+    def _take(self):
+        out = bytes(self.out)
+        self.out.clear()
+        return out
+
+    def feed(self, data):
+        """
+        :return: Байты сжатых данных, готовые к этому моменту.
+        """
+        if not data:
+            return self._take()
+        data = memoryview(data).cast("B")
+        if self.code is None:
+            self.code = data[0]
+            data = data[1:]
+        trie = self.trie
+        code = self.code
+        lru = self.policy == "lru"
+        out = self.out
+        acc = self.acc
+        nbits = self.nbits
+        width = self.width(False)
+        for byte in data:
+            key = code << 8 | byte
+            next_code = trie.get(key)
+            if next_code is not None:
+                code = next_code
+                continue
+            # Выдаём код найденной строки
+            acc = acc << width | code
+            nbits += width
+            if nbits >= 32:
+                whole = nbits >> 3
+                nbits &= 7
+                out += (acc >> nbits).to_bytes(whole, "big")
+                acc &= (1 << nbits) - 1
+            # И добавляем строку + следующий байт
+            if lru:
+                self.touch(code)
+                slot = self.slot(code)
+                if slot is not None:
+                    self.add(slot, code, byte)
+                    trie[key] = slot
+                width = self.width(False)
+            else:
+                trie[key] = self.size
+                self.size += 1
+                if self.size == self.max_size:
+                    self.acc, self.nbits = acc, nbits
+                    self._emit(CLEAR)
+                    acc, nbits = self.acc, self.nbits
+                    self.reset()
+                    trie = self.trie
+                width = (self.size - 1).bit_length()  # Без LRU словарь не бывает полным
+            code = byte
+        self.code = code
+        self.acc = acc
+        self.nbits = nbits
+        return self._take()
+
+    def flush(self):
+        """
+        Выдаёт последнюю строку, код END и дополняет последний байт нулями.
+        """
+        pending = False
+        if self.code is not None:
+            self._emit(self.code)
+            pending = True
+            self.code = None
+        self._emit(END, pending=pending)
+        if self.nbits:
+            self.out.append((self.acc << (8 - self.nbits)) & 0xFF)
+            self.acc = 0
+            self.nbits = 0
+        return self._take()
+
+
+class LZWDecoder(_Dictionary):
+    def __init__(self, max_size=1 << 16, policy="reset"):
+        super().__init__(max_size, policy)
+        self.previous = None  # Код предыдущей строки
+        self.finished = False
+        self.acc = 0
+        self.nbits = 0
+
+    def reset(self):
+        super().reset()
+        self.strings = [bytes((byte,)) for byte in range(CLEAR)] + [b"", b""]  # Код -> строка байт
+
+    def feed(self, data):
+        """
+        :return: Байты, которые уже можно восстановить.
+        """
+        if self.finished:
+            if data:
+                raise ValueError("Данные после кода END")
+            return b""
+        out = bytearray()
+        lru = self.policy == "lru"
+        acc = self.acc
+        nbits = self.nbits
+        width = self.width(self.previous is not None)
+        for byte in data:
+            acc = acc << 8 | byte
+            nbits += 8
+            if nbits < width:  # Код не короче 9 бит, поэтому за байт заканчивается не больше одного
+                continue
+            nbits -= width
+            code = acc >> nbits
+            acc &= (1 << nbits) - 1
+            if code == END:
+                self.finished = True
+                break
+            if code == CLEAR:
+                self.reset()
+                self.previous = None
+            elif lru:
+                self._decode(code, out)
+            else:
+                strings = self.strings
+                if self.previous is None:
+                    if code > CLEAR:
+                        raise ValueError(f"Повреждённые данные LZW: код {code} в начале словаря")
+                    string = strings[code]
+                else:
+                    previous = strings[self.previous]
+                    if code < self.size:
+                        string = strings[code]
+                    elif code == self.size:
+                        string = previous + previous[:1]  # Случай «строка + её первый байт»
+                    else:
+                        raise ValueError(f"Повреждённые данные LZW: неизвестный код {code}")
+                    strings.append(previous + string[:1])
+                    self.size += 1
+                out += string
+                self.previous = code
+            width = self.width(self.previous is not None)
+        self.acc = acc
+        self.nbits = nbits
+        return bytes(out)
+
+    def _decode(self, code, out):
+        # Общий путь (LRU): запись для предыдущей строки, вытеснение, затем сама строка
+        strings = self.strings
+        if self.previous is None:
+            if code > CLEAR:
+                raise ValueError(f"Повреждённые данные LZW: код {code} в начале словаря")
+            out += strings[code]
+            self.previous = code
+            return
+        previous = strings[self.previous]
+        slot = self.slot(self.previous)
+        if code == slot:
+            string = previous + previous[:1]
+        elif code < self.size and code != CLEAR:
+            string = strings[code]
+        else:
+            raise ValueError(f"Повреждённые данные LZW: неизвестный код {code}")
+        if slot is not None:
+            self.add(slot, self.previous, string[0])
+            if slot == len(strings):
+                strings.append(previous + string[:1])
+            else:
+                strings[slot] = previous + string[:1]
+        out += string
+        self.touch(code)
+        self.previous = code
+
+    def flush(self):
+        if not self.finished:
+            raise ValueError("Поток LZW оборвался до кода END")
+        return b""
+
+
+def lzw_compress_bytes(data, max_size=1 << 16, policy="reset"):
+    encoder = LZWEncoder(max_size, policy)
+    return encoder.feed(data) + encoder.flush()
+
+
+def lzw_decompress_bytes(data, max_size=1 << 16, policy="reset"):
+    decoder = LZWDecoder(max_size, policy)
+    return decoder.feed(data) + decoder.flush()
+
+
+def measure_throughput(data, max_size=1 << 16, policy="reset"):
+    """
+    Сжимает и восстанавливает data (байты или поток кусков байт) по кускам, проверяет совпадение.
+    Ни исходные, ни сжатые данные целиком в памяти не держатся.
+    :return: Словарь: скорость сжатия и восстановления (МБ/с исходных данных), размер, совпадение.
+    """
+    encoder = LZWEncoder(max_size, policy)
+    decoder = LZWDecoder(max_size, policy)
+    compress_seconds = 0.0
+    decompress_seconds = 0.0
+    input_bytes = 0
+    packed_bytes = 0
+    expected = bytearray()  # Исходные байты, которые декодер ещё не восстановил
+    roundtrip = True
+    for chunk in chain(iter_chunks(data), [None]):  # None — конец потока
+        started = time.perf_counter()
+        packed = encoder.flush() if chunk is None else encoder.feed(chunk)
+        compressed = time.perf_counter()
+        restored = decoder.feed(packed) + (decoder.flush() if chunk is None else b"")
+        decompress_seconds += time.perf_counter() - compressed
+        compress_seconds += compressed - started
+        if chunk is not None:
+            input_bytes += len(chunk)
+            expected += chunk
+        packed_bytes += len(packed)
+        roundtrip = roundtrip and expected[:len(restored)] == restored
+        del expected[:len(restored)]
+    megabytes = input_bytes / 1e6
+    return {
+        "compress_mb_s": megabytes / max(compress_seconds, 1e-9),
+        "decompress_mb_s": megabytes / max(decompress_seconds, 1e-9),
+        "bytes": packed_bytes,
+        "roundtrip": roundtrip and not expected,
+    }
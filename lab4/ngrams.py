@@ -0,0 +1,270 @@
+"""
+Подсчёт n-грамм на NumPy для lab4. Символы переводятся в коды uint8 (алфавит не больше
+256 символов, после limit_characters — не больше 64), n-грамма упаковывается в одно
+целое key = x1 * K^(n-1) + ... + xn и считается через np.bincount (или np.unique,
+если возможных ключей слишком много). Текст подаётся кусками: последние n-1 символов
+куска переносятся в следующий, поэтому n-граммы на стыках не теряются.
+"""
+import mmap
+import os
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from corpus import CHUNK_SIZE, iter_chunks
+
+DENSE_LIMIT = 1 << 22  # Больше возможных ключей — храним только встреченные (np.unique)
+UNSEEN = np.iinfo(np.int64).max  # Позиция первого появления ещё не встреченной n-граммы
+
+
+class NgramModel:
+    """
+    Частоты n-грамм для всех n от 1 до order.
+    Порядок n-грамм с равной частотой — по первому появлению, как у Counter.
+    """
+
+    def __init__(self, order=2, alphabet=(), max_symbols=64):
+        if not 1 <= max_symbols <= 256:
+            raise ValueError("Алфавит должен помещаться в uint8: от 1 до 256 символов")
+        if max_symbols ** order >= 1 << 63:
+            raise ValueError(f"n-граммы порядка {order} не помещаются в int64")
+        self.order = order
+        self.max_symbols = max_symbols
+        self.symbols = []  # Символ по коду, коды выдаются в порядке первого появления
+        self._lookup = np.zeros(0x110000, dtype=np.uint16)  # Кодовая точка -> код + 1 (0 — нет в алфавите)
+        self.total = 0  # Сколько символов обработано
+        self._tail = np.empty(0, dtype=np.uint8)  # Последние order-1 кодов прошлого куска
+        self._dense = {}  # n -> (счётчики, позиция первого появления) по всем возможным ключам
+        self._sparse = {}  # n -> (встреченные ключи по возрастанию, счётчики, первое появление)
+        for n in range(1, order + 1):
+            size = max_symbols ** n
+            if size <= DENSE_LIMIT:
+                self._dense[n] = (np.zeros(size, dtype=np.int64), np.full(size, UNSEEN, dtype=np.int64))
+            else:
+                empty = np.empty(0, dtype=np.int64)
+                self._sparse[n] = (empty, empty, empty)
+        self._add_symbols(alphabet)
+
+    def _add_symbols(self, symbols):
+        for symbol in symbols:
+            if symbol in self.symbols:
+                continue
+            if len(self.symbols) == self.max_symbols:
+                raise ValueError(f"В тексте больше {self.max_symbols} различных символов")
+            self.symbols.append(symbol)
+            self._lookup[ord(symbol)] = len(self.symbols)
+
+    def encode(self, chunk):
+        """
+        Переводит кусок текста в массив кодов uint8; новые символы добавляет в алфавит.
+        """
+        cps = np.frombuffer(chunk.encode("utf-32-le"), dtype=np.uint32)
+        codes = self._lookup[cps]
+        unknown = cps[codes == 0]
+        if unknown.size:
+            # Новые символы — в порядке первого появления; их не больше размера алфавита
+            while unknown.size:
+                self._add_symbols(chr(unknown[0]))
+                unknown = unknown[unknown != unknown[0]]
+            codes = self._lookup[cps]
+        return (codes - 1).astype(np.uint8)
+
+    def _pack(self, seq, start, count, n):
+        keys = np.zeros(count, dtype=np.int64)
+        for j in range(n):
+            keys *= self.max_symbols
+            keys += seq[start + j:start + j + count]
+        return keys
+
+    def update(self, chunk):
+        codes = self.encode(chunk)
+        if not codes.size:
+            return self
+        seq = np.concatenate([self._tail, codes])
+        tail = len(self._tail)
+        base = self.total - tail  # Позиция seq[0] в потоке
+        for n in range(1, self.order + 1):
+            # Только n-граммы, которые заканчиваются в новом куске
+            start = max(0, tail - n + 1)
+            count = len(seq) - n + 1 - start
+            if count <= 0:
+                continue
+            keys = self._pack(seq, start, count, n)
+            if n in self._dense:
+                counts, first = self._dense[n]
+                counts += np.bincount(keys, minlength=counts.size)
+                fresh = first[keys] == UNSEEN
+                if fresh.any():
+                    np.minimum.at(first, keys[fresh], base + start + np.flatnonzero(fresh))
+            else:
+                old_keys, old_counts, old_first = self._sparse[n]
+                new, index, new_counts = np.unique(keys, return_index=True, return_counts=True)
+                merged, inverse = np.unique(np.concatenate([old_keys, new]), return_inverse=True)
+                counts = np.bincount(inverse, weights=np.concatenate([old_counts, new_counts]),
+                                     minlength=merged.size).astype(np.int64)
+                first = np.empty(merged.size, dtype=np.int64)
+                first[inverse[old_keys.size:]] = base + start + index
+                first[inverse[:old_keys.size]] = old_first  # Старые ключи встречались раньше
+                self._sparse[n] = (merged, counts, first)
+        self._tail = seq[len(seq) - min(self.order - 1, len(seq)):]
+        self.total += codes.size
+        return self
+
+    def fit(self, chunks):
+        for chunk in iter_chunks(chunks):
+            self.update(chunk)
+        return self
+
+    def counts(self, n):
+        """
+        :return: Встреченные ключи n-грамм (по возрастанию), их частоты и позиции первого появления.
+        """
+        if n in self._dense:
+            counts, first = self._dense[n]
+            keys = np.flatnonzero(counts)
+            return keys, counts[keys], first[keys]
+        return self._sparse[n]
+
+    def decode(self, key, n):
+        chars = []
+        for _ in range(n):
+            key, code = divmod(int(key), self.max_symbols)
+            chars.append(self.symbols[code])
+        return ''.join(reversed(chars))
+
+    def most_common(self, n, k=None):
+        """
+        :return: Список (n-грамма, частота) по убыванию частоты, как Counter.most_common.
+        """
+        keys, counts, first = self.counts(n)
+        order = np.lexsort((first, -counts))[:k]
+        return [(self.decode(key, n), int(count)) for key, count in zip(keys[order], counts[order])]
+
+    def distribution(self, n):
+        """
+        :return: Counter всех n-грамм; ключи в порядке первого появления, как у Counter(список n-грамм).
+        """
+        keys, counts, first = self.counts(n)
+        order = np.argsort(first, kind="stable")
+        return Counter({self.decode(key, n): int(count) for key, count in zip(keys[order], counts[order])})
+
+    @staticmethod
+    def _entropy(counts):
+        total = counts.sum()
+        if not total:
+            return 0.0
+        p = counts[counts > 0] / total
+        return float(-(p * np.log2(p)).sum())
+
+    def entropy(self, n=1):
+        """
+        Энтропия распределения n-грамм, бит на n-грамму.
+        """
+        return self._entropy(self.counts(n)[1])
+
+    def conditional_entropy(self, n):
+        """
+        Условная энтропия H(Xn | X1...Xn-1) = H(X1...Xn) - H(X1...Xn-1), бит на символ.
+        Префиксы берутся из тех же n-грамм, поэтому оценка согласована на конечном тексте.
+        """
+        keys, counts, _ = self.counts(n)
+        if n == 1:
+            return self._entropy(counts)
+        _, inverse = np.unique(keys // self.max_symbols, return_inverse=True)
+        prefix_counts = np.bincount(inverse, weights=counts)
+        return self._entropy(counts) - self._entropy(prefix_counts)
+
+
+def conditional_entropies(chunks, order=3, max_symbols=64):
+    """
+    :return: Список H(X1), H(X2 | X1), ..., H(Xorder | X1...Xorder-1) в битах на символ.
+    """
+    model = NgramModel(order, max_symbols=max_symbols).fit(chunks)
+    return [model.conditional_entropy(n) for n in range(1, order + 1)]
+
+
+# Параллельный подсчёт (map-reduce): каждый процесс считает n-граммы своего куска,
+# при слиянии добавляются n-граммы, которые пересекают границы кусков
+def _count_text(text, orders):
+    try:
+        model = NgramModel(max(orders), max_symbols=256).fit(text)
+        return {n: model.distribution(n) for n in orders}
+    except ValueError:  # Больше 256 различных символов — считаем обычным Counter
+        return {n: Counter(text[i:i + n] for i in range(len(text) - n + 1)) for n in orders}
+
+
+def _count_task(task, orders):
+    # task — кусок текста или (путь, начало, конец) в байтах: тогда процесс читает файл сам
+    if isinstance(task, tuple):
+        path, start, end = task
+        with open(path, "rb") as file:
+            file.seek(start)
+            task = file.read(end - start).decode("utf-8", errors="replace")
+    edge = max(orders) - 1
+    return _count_text(task, orders), task[:edge], task[len(task) - edge:] if edge else "", len(task)
+
+
+def _file_ranges(path, chunk_size):
+    # Границы кусков сдвигаем вперёд до начала символа UTF-8
+    size = os.path.getsize(path)
+    if not size:
+        return []
+    bounds = [0]
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        position = chunk_size
+        while position < size:
+            while position < size and data[position] & 0xC0 == 0x80:
+                position += 1
+            if position < size:
+                bounds.append(position)
+            position += chunk_size
+    bounds.append(size)
+    return [(path, start, end) for start, end in zip(bounds, bounds[1:])]
+
+
+def parallel_ngram_counts(source, orders=(1, 2), workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Частоты n-грамм в пуле процессов; результат совпадает с Counter по всему тексту,
+    включая порядок ключей.
+    :param source: Строка, поток кусков или путь к файлу UTF-8 в виде os.PathLike
+    (например, pathlib.Path) — тогда процессы читают свои диапазоны файла сами.
+    :param orders: Для каких n считать.
+    :param workers: Число процессов (None — по числу ядер).
+    :return: Словарь {n: Counter}.
+    """
+    orders = tuple(orders)
+    workers = workers or os.cpu_count() or 1
+    if isinstance(source, os.PathLike):
+        tasks = iter(_file_ranges(os.fspath(source), chunk_size))
+    elif isinstance(source, str):
+        tasks = (source[i:i + chunk_size] for i in range(0, len(source), chunk_size))
+    else:
+        tasks = iter(source)
+
+    result = {n: Counter() for n in orders}
+    edge = max(orders) - 1
+    carry = ""  # Последние edge символов уже обработанного текста
+
+    def merge(counts, head, tail, length):
+        nonlocal carry
+        # Сначала n-граммы на стыке: они начинаются раньше куска, значит, и появились раньше
+        junction = carry + head
+        for n in orders:
+            for i in range(max(0, len(carry) - n + 1), len(carry)):
+                if i + n <= len(junction):
+                    result[n][junction[i:i + n]] += 1
+            result[n].update(counts[n])
+        carry = (carry + head)[-edge:] if length <= edge else tail
+        if not edge:
+            carry = ""
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()  # Не больше 2 * workers кусков в работе — память ограничена
+        for task in tasks:
+            pending.append(executor.submit(_count_task, task, orders))
+            if len(pending) >= 2 * workers:
+                merge(*pending.popleft().result())
+        while pending:
+            merge(*pending.popleft().result())
+    return result
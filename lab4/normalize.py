@@ -0,0 +1,137 @@
+"""
+Потоковая нормализация текста для lab4: нижний регистр, только разрешённые символы,
+без повторных пробелов. Работает по кускам с памятью O(размер куска), пробелы
+схлопываются и на стыках кусков. Ограничение алфавита — два прохода по источнику:
+подсчёт символов и фильтрация.
+"""
+import codecs
+import re
+from collections import Counter
+
+from corpus import iter_chunks, reopenable
+
+ALLOWED_CHARS = "abcdefghijklmnopqrstuvwxyz "
+_SPACES = re.compile("  +")
+_SPACES_BYTES = re.compile(b"  +")
+_ERROR_HANDLERS = {}  # Разрешённые символы -> (имя обработчика ошибок кодека, его таблица)
+
+
+class _LowerTable(dict):
+    # Таблица для str.translate, которая заполняется по мере встречи символов:
+    # символ переходит в разрешённые символы своей строчной формы, остальное удаляется
+    # (строчная форма берётся посимвольно, поэтому контекстная ς для Σ в конце слова не возникает)
+    def __init__(self, allowed):
+        super().__init__()
+        self.allowed = allowed
+
+    def __missing__(self, code):
+        lowered = ''.join(c for c in chr(code).lower() if c in self.allowed) or None
+        self[code] = lowered
+        return lowered
+
+
+def _error_handler(allowed):
+    # Обработчик регистрируется один раз на набор символов: codecs.register_error
+    # не умеет удалять обработчики, и их число не должно расти с числом нормализаторов
+    key = frozenset(allowed)
+    if key not in _ERROR_HANDLERS:
+        name = f"lab4-normalize-{''.join(sorted(key))!r}"
+        table = _LowerTable(key)
+        codecs.register_error(name, lambda error: (
+            error.object[error.start:error.end].translate(table) or "", error.end))
+        _ERROR_HANDLERS[key] = name, table
+    return _ERROR_HANDLERS[key]
+
+
+class TextNormalizer:
+    """
+    Делает то же, что lower + фильтр по allowed + схлопывание пробелов + strip,
+    но одним проходом по таблице перевода. Для ASCII-кусков используется
+    bytes.translate, остальные символы переводит ленивая таблица str.translate.
+    """
+
+    def __init__(self, allowed=ALLOWED_CHARS):
+        self.allowed = set(allowed)
+        self.ascii = all(ord(c) < 128 for c in self.allowed)
+        mapping = bytearray(range(256))
+        delete = bytearray()
+        for b in range(256):
+            lowered = chr(b).lower() if b < 128 else ""
+            if lowered in self.allowed:
+                mapping[b] = ord(lowered)
+            else:
+                delete.append(b)
+        self.byte_table = bytes(mapping)
+        self.byte_delete = bytes(delete)
+        # Редкие не-ASCII символы переводит обработчик ошибок кодека прямо во время encode;
+        # его ленивая таблица общая для нормализаторов с тем же набором символов
+        self.errors, self.table = _error_handler(self.allowed)
+
+    def _translate(self, chunk):
+        if not self.ascii:
+            return _SPACES.sub(" ", chunk.translate(self.table))
+        data = chunk.encode("ascii", self.errors).translate(self.byte_table, self.byte_delete)
+        return _SPACES_BYTES.sub(b" ", data).decode("ascii")
+
+    def normalize(self, chunks):
+        """
+        :return: Генератор нормализованных кусков.
+        """
+        started = False
+        pending_space = False  # Пробел на стыке кусков выводим только перед следующим словом
+        for chunk in iter_chunks(chunks):
+            text = self._translate(chunk)
+            leading, trailing = text.startswith(" "), text.endswith(" ")
+            text = text.strip(" ")
+            if not text:
+                pending_space = pending_space or leading
+                continue
+            if started and (pending_space or leading):
+                text = " " + text
+            started = True
+            pending_space = trailing
+            yield text
+
+    __call__ = normalize
+
+
+def count_chars(chunks):
+    """
+    Частоты символов потока. Порядок ключей — по первому появлению, как у Counter(text),
+    поэтому most_common при равных частотах даёт тот же порядок.
+    """
+    counts = {}
+    first_seen = {}
+    known = {}  # Таблица удаления уже встреченных символов: новые ищем только в остатке
+    offset = 0
+    for chunk in iter_chunks(chunks):
+        for c in set(chunk.translate(known)):
+            counts[c] = 0
+            first_seen[c] = offset + chunk.find(c)
+            known[ord(c)] = None
+        for c in counts:
+            counts[c] += chunk.count(c)
+        offset += len(chunk)
+    return Counter({c: counts[c] for c in sorted(counts, key=first_seen.get)})
+
+
+def limit_alphabet(open_chunks, max_chars=64):
+    """
+    Оставляет в тексте только max_chars самых частых символов.
+    :param open_chunks: Функция, каждый раз открывающая поток кусков заново (или строка, список кусков).
+    :return: Список оставленных символов (по убыванию частоты) и функция, каждый раз заново
+    открывающая поток отфильтрованных кусков.
+    """
+    open_chunks = reopenable(open_chunks)
+    counts = count_chars(open_chunks())  # Первый проход: подсчёт
+    most_common_chars = [char for char, count in counts.most_common(max_chars)]
+    dropped = {ord(c): None for c in counts if c not in set(most_common_chars)}
+
+    def filtered():
+        # Следующие проходы: фильтрация
+        for chunk in open_chunks():
+            chunk = chunk.translate(dropped) if dropped else chunk
+            if chunk:
+                yield chunk
+
+    return most_common_chars, filtered
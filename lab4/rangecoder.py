@@ -0,0 +1,225 @@
+"""
+Контекстное моделирование с интервальным (range) кодированием для lab4.
+Вероятность символа берётся при условии order предыдущих символов, поэтому текст
+сжимается ниже энтропии нулевого порядка, которая ограничивает код Хаффмана.
+
+Модель статическая (таблицы частот по биграммам/триграммам текста, их нужно хранить
+отдельно) или адаптивная (частоты набираются по ходу кодирования одинаково в кодере
+и декодере, таблица не нужна). Кодер — байтовый range coder с переносом, как в LZMA.
+"""
+from bisect import bisect_right
+from itertools import accumulate
+
+from corpus import CHUNK_SIZE, chunks_equal, iter_chunks, reopenable
+from ngrams import NgramModel
+
+TOP = 1 << 24  # Меньше — диапазон сдвигается на байт
+MAX_TOTAL = 1 << 16  # Сумма частот в контексте: при диапазоне от 2^24 на частоту 1 остаётся от 2^8
+INCREMENT = 32  # Прибавка к частоте символа в адаптивной модели
+
+
+class RangeEncoder:
+    def __init__(self):
+        self.low = 0
+        self.range = 0xFFFFFFFF
+        self.cache = 0  # Байт, который ещё может измениться из-за переноса
+        self.cache_size = 1  # Он и следующие за ним байты 0xFF
+        self.out = bytearray()
+
+    def encode(self, cum, freq, total):
+        r = self.range // total
+        self.low += r * cum
+        self.range = r * freq
+        while self.range < TOP:
+            self.range <<= 8
+            self._shift_low()
+
+    def _shift_low(self):
+        if self.low < 0xFF000000 or self.low >> 32:
+            carry = self.low >> 32
+            byte = self.cache
+            while self.cache_size:
+                self.out.append((byte + carry) & 0xFF)
+                byte = 0xFF
+                self.cache_size -= 1
+            self.cache = (self.low >> 24) & 0xFF
+        self.cache_size += 1
+        self.low = (self.low << 8) & 0xFFFFFFFF
+
+    def finish(self):
+        for _ in range(5):
+            self._shift_low()
+        return bytes(self.out)
+
+
+class RangeDecoder:
+    def __init__(self, data):
+        self.data = data
+        self.position = 5
+        self.code = int.from_bytes(bytes(data[:5]).ljust(5, b"\0"), "big")
+        self.range = 0xFFFFFFFF
+        self.r = 0
+
+    def target(self, total):
+        """
+        :return: Число из [0, total), по которому ищется символ.
+        """
+        self.r = self.range // total
+        return min(self.code // self.r, total - 1)
+
+    def consume(self, cum, freq):
+        self.code -= cum * self.r
+        self.range = self.r * freq
+        while self.range < TOP:
+            byte = self.data[self.position] if self.position < len(self.data) else 0
+            self.position += 1
+            self.code = (self.code << 8) | byte
+            self.range <<= 8
+
+
+class ContextCoder:
+    """
+    Range coder с моделью порядка order: частоты символа зависят от order предыдущих.
+    Контекст в начале текста — order раз первый символ алфавита.
+    :param alphabet: Символы, которые могут встретиться (в этом порядке нумеруются).
+    :param counts: Частоты (order + 1)-грамм, например Counter биграмм, — статическая
+    модель; None — адаптивная.
+    """
+
+    def __init__(self, alphabet, order=1, counts=None):
+        self.alphabet = list(alphabet)
+        if not self.alphabet:
+            raise ValueError("Пустой алфавит")
+        if len(self.alphabet) > MAX_TOTAL // 2:
+            raise ValueError(f"Алфавит больше {MAX_TOTAL // 2} символов")
+        self.index = {char: i for i, char in enumerate(self.alphabet)}
+        self.order = order
+        self.contexts = len(self.alphabet) ** order
+        self.static = None if counts is None else self._scale(counts)
+
+    @classmethod
+    def from_counts(cls, counts, alphabet):
+        """
+        Статическая модель по Counter n-грамм; порядок — длина n-граммы минус один.
+        """
+        order = len(next(iter(counts))) - 1 if counts else 1
+        return cls(alphabet, order, counts)
+
+    @classmethod
+    def from_text(cls, chunks, alphabet, order=1):
+        """
+        Статическая модель по частотам (order + 1)-грамм текста.
+        """
+        model = NgramModel(order + 1, alphabet, max_symbols=max(len(alphabet), 1)).fit(chunks)
+        return cls(alphabet, order, model.distribution(order + 1))
+
+    def _scale(self, counts):
+        # Частоты каждого контекста приводятся к сумме не больше MAX_TOTAL, каждому символу — от 1
+        k = len(self.alphabet)
+        raw = [[0] * k for _ in range(self.contexts)]
+        for ngram, count in counts.items():
+            if len(ngram) != self.order + 1:
+                raise ValueError(f"Нужны частоты {self.order + 1}-грамм, а не {ngram!r}")
+            context = 0
+            for char in ngram[:-1]:
+                context = context * k + self.index[char]
+            raw[context][self.index[ngram[-1]]] += count
+        tables = []
+        for row in raw:
+            total = sum(row)
+            scale = (MAX_TOTAL - k) / total if total else 0
+            freqs = [1 + int(count * scale) for count in row]
+            cums = [0, *accumulate(freqs)]
+            tables.append((cums, freqs, cums[-1]))
+        return tables
+
+    def encode(self, chunks):
+        """
+        :return: Сжатые байты; длину текста декодеру нужно передать отдельно.
+        """
+        encoder = RangeEncoder()
+        index = self.index
+        k = len(self.alphabet)
+        static = self.static
+        freqs_of = {}  # Адаптивная модель: контекст -> частоты символов
+        totals = {}
+        context = 0
+        for chunk in iter_chunks(chunks):
+            for char in chunk:
+                symbol = index[char]
+                if static is not None:
+                    cums, freqs, total = static[context]
+                    encoder.encode(cums[symbol], freqs[symbol], total)
+                else:
+                    freqs = freqs_of.get(context)
+                    if freqs is None:
+                        freqs = freqs_of[context] = [1] * k
+                        totals[context] = k
+                    encoder.encode(sum(freqs[:symbol]), freqs[symbol], totals[context])
+                    self._update(freqs, totals, context, symbol)
+                context = (context * k + symbol) % self.contexts
+        return encoder.finish()
+
+    def decode(self, data, count):
+        return ''.join(self.iter_decode(data, count))
+
+    def iter_decode(self, data, count, chunk_size=CHUNK_SIZE):
+        """
+        :return: Генератор кусков декодированного текста (по chunk_size символов).
+        """
+        decoder = RangeDecoder(data)
+        alphabet = self.alphabet
+        k = len(alphabet)
+        static = self.static
+        freqs_of = {}
+        totals = {}
+        context = 0
+        out = []
+        for _ in range(count):
+            if static is not None:
+                cums, freqs, total = static[context]
+                symbol = bisect_right(cums, decoder.target(total)) - 1
+                decoder.consume(cums[symbol], freqs[symbol])
+            else:
+                freqs = freqs_of.get(context)
+                if freqs is None:
+                    freqs = freqs_of[context] = [1] * k
+                    totals[context] = k
+                ends = list(accumulate(freqs))
+                symbol = bisect_right(ends, decoder.target(totals[context]))
+                decoder.consume(ends[symbol] - freqs[symbol], freqs[symbol])
+                self._update(freqs, totals, context, symbol)
+            out.append(alphabet[symbol])
+            if len(out) == chunk_size:
+                yield ''.join(out)
+                out = []
+            context = (context * k + symbol) % self.contexts
+        if out:
+            yield ''.join(out)
+
+    @staticmethod
+    def _update(freqs, totals, context, symbol):
+        freqs[symbol] += INCREMENT
+        totals[context] += INCREMENT
+        if totals[context] > MAX_TOTAL:
+            freqs[:] = [(freq + 1) // 2 for freq in freqs]
+            totals[context] = sum(freqs)
+
+
+def bits_per_char(coder, text):
+    """
+    Кодирует text, проверяет восстановление.
+    :param text: Строка, список кусков или функция, каждый раз заново открывающая поток кусков.
+    :return: Бит на символ и совпадение декодированного текста с исходным.
+    """
+    open_chunks = reopenable(text)
+    count = 0
+
+    def counted(chunks):
+        nonlocal count
+        for chunk in chunks:
+            count += len(chunk)
+            yield chunk
+
+    data = coder.encode(counted(open_chunks()))
+    return len(data) * 8 / max(count, 1), chunks_equal(coder.iter_decode(data, count), open_chunks())
@@ -0,0 +1,346 @@
+"""
+Потоковое кодирование для lab4: текст подаётся кусками (feed), кодируется кадрами по
+frame_chars символов, каждый кадр декодируется независимо. Буферы ограничены размером
+кадра, поэтому корпус не обязан помещаться в память.
+
+Формат контейнера (числа little-endian):
+    заголовок  MAGIC, версия, кодек, длина параметров (u32), параметры кодека
+    кадры      число символов (u32), длина данных (u32), данные
+    конец      кадр 0, 0
+    индекс     число кадров (u32), всего символов (u64), для каждого кадра: смещение (u64), первый символ (u64)
+    хвост      смещение индекса (u64), MAGIC
+По хвосту и индексу FrameReader находит нужные кадры и декодирует только их.
+
+Пример:
+    python stream.py compress text.txt text.l4c --codec huffman
+    python stream.py read text.l4c 1000000 1000200
+"""
+import argparse
+import bisect
+import struct
+
+from corpus import iter_chunks, iter_file_chunks
+from huffman import (TABLE_SYMBOLS, CanonicalHuffmanCodec, HuffmanCodec, canonical_codes, huffman_code_lengths,
+                     pack_code_lengths, unpack_code_lengths)
+from lzw import POLICIES, lzw_compress_bytes, lzw_decompress_bytes
+from normalize import count_chars
+
+MAGIC = b"L4CF"
+VERSION = 1
+FRAME_CHARS = 1 << 20  # Символов в кадре
+HUFFMAN, LZW = 0, 1
+_HEADER = struct.Struct("<4sBBI")
+_FRAME = struct.Struct("<II")
+_INDEX = struct.Struct("<IQ")
+_ENTRY = struct.Struct("<QQ")
+_TRAILER = struct.Struct("<Q4s")
+
+
+class HuffmanFrames:
+    """
+    Кадры Хаффмана: канонические коды по длинам, в заголовок пишутся алфавит и длины.
+    """
+    codec_id = HUFFMAN
+
+    def __init__(self, lengths):
+        self.lengths = dict(lengths)
+        if len(self.lengths) <= TABLE_SYMBOLS:
+            self.codec = HuffmanCodec(canonical_codes(self.lengths))
+        else:  # Большой алфавит: те же канонические коды, декодер без таблицы переходов
+            self.codec = CanonicalHuffmanCodec(self.lengths)
+
+    @classmethod
+    def from_frequencies(cls, frequencies):
+        return cls(huffman_code_lengths(frequencies))
+
+    def params(self):
+        alphabet = ''.join(sorted(self.lengths))
+        data = alphabet.encode("utf-8")
+        return struct.pack("<I", len(data)) + data + pack_code_lengths(self.lengths, alphabet)
+
+    @classmethod
+    def from_params(cls, params):
+        (size,) = struct.unpack_from("<I", params)
+        alphabet = params[4:4 + size].decode("utf-8")
+        return cls(unpack_code_lengths(params[4 + size:], alphabet))
+
+    def encode(self, text):
+        return self.codec.encode(text)[0]
+
+    def decode(self, payload, chars):
+        return ''.join(self.codec.decode(payload, chars))
+
+
+class LZWFrames:
+    """
+    Кадры LZW: каждый кадр сжимается с пустым словарём, в заголовок пишутся его размер и политика.
+    """
+    codec_id = LZW
+
+    def __init__(self, max_size=1 << 16, policy="reset"):
+        self.max_size = max_size
+        self.policy = policy
+
+    def params(self):
+        return struct.pack("<IB", self.max_size or 0, POLICIES.index(self.policy))
+
+    @classmethod
+    def from_params(cls, params):
+        max_size, policy = struct.unpack("<IB", params)
+        return cls(max_size or None, POLICIES[policy])
+
+    def encode(self, text):
+        return lzw_compress_bytes(text.encode("utf-8"), self.max_size, self.policy)
+
+    def decode(self, payload, chars):
+        text = lzw_decompress_bytes(payload, self.max_size, self.policy).decode("utf-8")
+        if len(text) != chars:
+            raise ValueError("Повреждённый кадр LZW: не совпадает число символов")
+        return text
+
+
+_CODECS = {HUFFMAN: HuffmanFrames, LZW: LZWFrames}
+
+
+def _parse_header(data):
+    # :return: (кодек кадров, длина заголовка) или None, если заголовок ещё не дочитан
+    if len(data) < _HEADER.size:
+        return None
+    magic, version, codec_id, size = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION or codec_id not in _CODECS:
+        raise ValueError("Это не контейнер lab4 или неподдерживаемая версия")
+    if len(data) < _HEADER.size + size:
+        return None
+    params = bytes(data[_HEADER.size:_HEADER.size + size])
+    return _CODECS[codec_id].from_params(params), _HEADER.size + size
+
+
+class StreamEncoder:
+    """
+    Кодирует поток кусков текста в контейнер. feed(кусок) и flush() возвращают
+    очередные байты контейнера; в памяти держится не больше одного кадра.
+    """
+
+    def __init__(self, frames, frame_chars=FRAME_CHARS):
+        self.frames = frames
+        self.frame_chars = frame_chars
+        self.pending = []  # Куски текста, ещё не ставшие кадром
+        self.pending_chars = 0
+        self.position = 0  # Сколько байт контейнера уже выдано
+        self.chars = 0  # Сколько символов уже закодировано
+        self.index = []  # (смещение кадра, первый символ)
+        self.started = False
+
+    def _start(self, out):
+        if not self.started:
+            params = self.frames.params()
+            self._write(out, _HEADER.pack(MAGIC, VERSION, self.frames.codec_id, len(params)) + params)
+            self.started = True
+
+    def _write(self, out, data):
+        out += data
+        self.position += len(data)
+
+    def _frame(self, out, text):
+        payload = self.frames.encode(text)
+        self.index.append((self.position, self.chars))
+        self._write(out, _FRAME.pack(len(text), len(payload)))
+        self._write(out, payload)
+        self.chars += len(text)
+
+    def feed(self, chunk):
+        out = bytearray()
+        self._start(out)
+        # Кусок режется по границам кадров: каждый символ копируется один раз,
+        # сколько бы кадров ни было в куске
+        offset = 0
+        while self.pending_chars + len(chunk) - offset >= self.frame_chars:
+            end = offset + self.frame_chars - self.pending_chars
+            self.pending.append(chunk[offset:end])
+            self._frame(out, ''.join(self.pending))
+            self.pending = []
+            self.pending_chars = 0
+            offset = end
+        if offset < len(chunk):
+            self.pending.append(chunk[offset:])
+            self.pending_chars += len(chunk) - offset
+        return bytes(out)
+
+    def flush(self):
+        """
+        Последний кадр, признак конца, индекс и хвост.
+        """
+        out = bytearray()
+        self._start(out)
+        if self.pending_chars:
+            self._frame(out, ''.join(self.pending))
+            self.pending = []
+            self.pending_chars = 0
+        self._write(out, _FRAME.pack(0, 0))
+        index_offset = self.position
+        self._write(out, _INDEX.pack(len(self.index), self.chars))
+        for entry in self.index:
+            self._write(out, _ENTRY.pack(*entry))
+        self._write(out, _TRAILER.pack(index_offset, MAGIC))
+        return bytes(out)
+
+
+class StreamDecoder:
+    """
+    Последовательно декодирует контейнер, поданный кусками байт любого размера.
+    feed возвращает текст всех кадров, которые удалось дочитать.
+    """
+
+    def __init__(self):
+        self.frames = None
+        self.buffer = bytearray()  # Не больше одного кадра
+        self.finished = False
+
+    def feed(self, data):
+        if self.finished:
+            return ""  # Индекс и хвост для последовательного чтения не нужны
+        self.buffer += data
+        if self.frames is None:
+            header = _parse_header(self.buffer)
+            if header is None:
+                return ""
+            self.frames, size = header
+            del self.buffer[:size]
+        out = []
+        while len(self.buffer) >= _FRAME.size:
+            chars, size = _FRAME.unpack_from(self.buffer)
+            if not chars and not size:
+                self.finished = True
+                self.buffer.clear()
+                break
+            if len(self.buffer) < _FRAME.size + size:
+                break
+            out.append(self.frames.decode(bytes(self.buffer[_FRAME.size:_FRAME.size + size]), chars))
+            del self.buffer[:_FRAME.size + size]
+        return ''.join(out)
+
+    def flush(self):
+        if not self.finished:
+            raise ValueError("Контейнер оборвался до последнего кадра")
+        return ""
+
+
+class FrameReader:
+    """
+    Произвольный доступ к контейнеру в файле (бинарный, с seek): read(start, stop)
+    декодирует только кадры, в которые попадает диапазон символов.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        file.seek(0)
+        data = file.read(_HEADER.size)
+        if len(data) == _HEADER.size:
+            data += file.read(_HEADER.unpack(data)[3])
+        header = _parse_header(data)
+        if header is None:
+            raise ValueError("Контейнер обрывается в заголовке")
+        self.frames = header[0]
+        file.seek(-_TRAILER.size, 2)
+        index_offset, magic = _TRAILER.unpack(file.read(_TRAILER.size))
+        if magic != MAGIC:
+            raise ValueError("Нет индекса кадров: контейнер не дописан")
+        file.seek(index_offset)
+        count, self.total = _INDEX.unpack(file.read(_INDEX.size))
+        entries = list(_ENTRY.iter_unpack(file.read(count * _ENTRY.size)))
+        self.offsets = [offset for offset, _ in entries]
+        self.starts = [start for _, start in entries]
+
+    def __len__(self):
+        return self.total
+
+    def frame(self, i):
+        self.file.seek(self.offsets[i])
+        chars, size = _FRAME.unpack(self.file.read(_FRAME.size))
+        return self.frames.decode(self.file.read(size), chars)
+
+    def __iter__(self):
+        for i in range(len(self.offsets)):
+            yield self.frame(i)
+
+    def read(self, start=0, stop=None):
+        """
+        :return: Символы текста с start по stop (как срез строки).
+        """
+        start, stop, _ = slice(start, stop).indices(self.total)
+        if start >= stop:
+            return ""
+        first = bisect.bisect_right(self.starts, start) - 1
+        parts = []
+        i = first
+        while i < len(self.starts) and self.starts[i] < stop:
+            parts.append(self.frame(i))
+            i += 1
+        text = ''.join(parts)
+        offset = self.starts[first]
+        return text[start - offset:stop - offset]
+
+
+def encode_stream(chunks, frames, frame_chars=FRAME_CHARS):
+    """
+    :return: Генератор байт контейнера для потока кусков текста.
+    """
+    encoder = StreamEncoder(frames, frame_chars)
+    for chunk in iter_chunks(chunks):
+        data = encoder.feed(chunk)
+        if data:
+            yield data
+    yield encoder.flush()
+
+
+def decode_stream(blocks):
+    """
+    :return: Генератор кусков текста (по кадрам) для потока байт контейнера.
+    """
+    decoder = StreamDecoder()
+    for block in blocks:
+        text = decoder.feed(block)
+        if text:
+            yield text
+    decoder.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Потоковое сжатие текста в контейнер с кадрами")
+    commands = parser.add_subparsers(dest="command", required=True)
+    compress = commands.add_parser("compress", help="сжать текстовый файл UTF-8")
+    compress.add_argument("input")
+    compress.add_argument("output")
+    compress.add_argument("--codec", choices=("huffman", "lzw"), default="huffman")
+    compress.add_argument("--frame-chars", type=int, default=FRAME_CHARS)
+    compress.add_argument("--lzw-max-size", type=int, default=1 << 16, help="0 — без ограничения")
+    compress.add_argument("--lzw-policy", choices=POLICIES, default="reset")
+    decompress = commands.add_parser("decompress", help="восстановить весь текст")
+    decompress.add_argument("input")
+    decompress.add_argument("output")
+    read = commands.add_parser("read", help="вывести символы с start по stop")
+    read.add_argument("input")
+    read.add_argument("start", type=int)
+    read.add_argument("stop", type=int)
+    args = parser.parse_args()
+
+    if args.command == "compress":
+        if args.codec == "huffman":
+            # Первый проход — частоты символов, второй — кодирование
+            frames = HuffmanFrames.from_frequencies(count_chars(iter_file_chunks(args.input)))
+        else:
+            frames = LZWFrames(args.lzw_max_size or None, args.lzw_policy)
+        with open(args.output, "wb") as file:
+            for data in encode_stream(iter_file_chunks(args.input), frames, args.frame_chars):
+                file.write(data)
+    elif args.command == "decompress":
+        with open(args.input, "rb") as source, open(args.output, "w", encoding="utf-8", newline="") as file:
+            for text in decode_stream(iter(lambda: source.read(1 << 16), b"")):
+                file.write(text)
+    else:
+        with open(args.input, "rb") as file:
+            print(FrameReader(file).read(args.start, args.stop))
+
+
+if __name__ == "__main__":
+    main()
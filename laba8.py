@@ -1,20 +1,427 @@
-import matplotlib.pyplot as plt
-import networkx as nx
-from collections import defaultdict
+import argparse
+from collections import defaultdict, deque
 import random
+import json
+import math
+import os
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from operator import itemgetter
+
+# Доступные алгоритмы поиска максимального потока
+ALGORITHMS = ("dfs", "capacity_scaling", "edmonds_karp", "dinic", "push_relabel_fifo", "push_relabel_highest")
+# Относительная погрешность дробных ёмкостей: остатки меньше FLOW_EPSILON * (наибольшая ёмкость)
+# считаются ошибкой округления и обнуляются
+FLOW_EPSILON = 1e-9
+
+
+def build_residual_graph(edges):
+    """
+    Строит остаточную сеть по списку рёбер [u, v, capacity].
+    Антипараллельные рёбра (u -> v и v -> u) не перезаписывают друг друга:
+    ёмкость прямого ребра складывается с уже записанной, обратное ребро
+    добавляется с нулевой ёмкостью, только если его ещё нет.
+    """
+    graph = defaultdict(dict)
+    for u, v, capacity in edges:
+        graph[u][v] = graph[u].get(v, 0) + capacity
+        graph[v].setdefault(u, 0)  # Обратное ребро для обратного потока
+    return graph
+
+
+# Алгоритмы, реализованные для сжатой сети CSRNetwork
+CSR_ALGORITHMS = ("edmonds_karp", "dinic")
+
+
+def _smallest_typecode(max_value):
+    # Самый компактный беззнаковый тип array, в который помещается max_value
+    for typecode in ("B", "H", "I", "Q"):
+        if max_value < 1 << (8 * array(typecode).itemsize):
+            return typecode
+    raise ValueError(f"Значение {max_value} не помещается в 64 бита")
+
+
+class CSRNetwork:
+    """
+    Остаточная сеть в сжатом виде (CSR): метки вершин заменены целыми номерами,
+    дуги вершины u лежат подряд в head/capacity/rev с индексами от offsets[u] до offsets[u + 1]:
+    сначала out_degree[u] дуг исходных рёбер, затем обратные. rev[a] — индекс парной дуги для дуги a.
+    Вместо словаря на каждую вершину — несколько плоских массивов array с самыми
+    узкими подходящими типами, поэтому на ребро уходят десятки байт, а не сотни.
+    """
+
+    def __init__(self, labels, offsets, out_degree, head, capacity, rev):
+        # labels — метки по номерам: отсортированный массив NumPy, если метки одного типа
+        # (номер ищется двоичным поиском), иначе список
+        self.labels = labels
+        self.offsets = offsets
+        self.out_degree = out_degree
+        self.head = head
+        self.capacity = capacity  # Остаточные ёмкости
+        self.rev = rev
+
+    def node_id(self, label):
+        # Номер вершины по метке; нужен только для источника и стока, поэтому словаря не храним
+        if isinstance(self.labels, list):
+            try:
+                return self.labels.index(label)
+            except ValueError:
+                raise KeyError(label) from None
+        try:
+            i = bisect_left(self.labels, label)
+            if i < len(self.labels) and self.labels[i] == label:
+                return i
+        except TypeError:  # Метка другого типа
+            pass
+        raise KeyError(label)
+
+    def label(self, i):
+        return self.labels[i] if isinstance(self.labels, list) else self.labels.item(i)
+
+    @classmethod
+    def from_edges(cls, edges, nodes=()):
+        """
+        Строит сеть по списку рёбер [u, v, capacity]; nodes — метки, которые нужно добавить
+        даже без рёбер (например, источник и сток). Построение — векторные операции NumPy:
+        номера вершин — np.unique, смещения — bincount/cumsum, порядок дуг — одна сортировка.
+        """
+        import numpy as np  # Нужен только для построения; алгоритмы работают с массивами array
+
+        m = len(edges)
+        arcs = 2 * m
+        capacities = np.asarray(list(map(itemgetter(2), edges)))
+        if capacities.dtype.kind not in "biu":
+            capacities = capacities.astype(np.float64)
+        if (capacities < 0).any():
+            i = int(np.flatnonzero(capacities < 0)[0])
+            raise ValueError(f"Ёмкость ребра ({edges[i][0]}, {edges[i][1]}) не может быть отрицательной: {edges[i][2]}")
+
+        # Метки: сначала начала рёбер, затем концы, затем nodes
+        all_labels = list(map(itemgetter(0), edges))
+        all_labels += map(itemgetter(1), edges)
+        all_labels += nodes
+        index_dtype = np.int32 if arcs < 1 << 31 else np.int64
+        if set(map(type, all_labels)) in ({int}, {str}):
+            labels, ids = np.unique(np.array(all_labels), return_inverse=True)
+        else:
+            # Метки разных типов (например, строки и кортежи) не сортируются: нумеруем по первому появлению
+            numbers = dict.fromkeys(all_labels)
+            numbers = dict(zip(numbers, range(len(numbers))))
+            ids = np.fromiter(map(numbers.__getitem__, all_labels), dtype=index_dtype, count=len(all_labels))
+            labels = list(numbers)
+            del numbers
+        del all_labels
+        n = len(labels)
+
+        # Дуга k < m — дуга ребра k (из его начала), дуга k >= m — обратная дуга ребра k - m,
+        # парная дуга — (k + m) % arcs. Устойчивая сортировка по вершине-владельцу ставит
+        # дуги рёбер вершины перед её обратными дугами
+        owner = ids[:arcs].astype(index_dtype, copy=False)
+        del ids
+        order = np.argsort(owner, kind="stable").astype(index_dtype)
+        position = np.empty(arcs, dtype=index_dtype)  # Место дуги k в массивах сети
+        position[order] = np.arange(arcs, dtype=index_dtype)
+        partner = order
+        partner += m
+        partner %= max(arcs, 1)
+        del order
+        head = owner[partner]  # Конец дуги — владелец парной дуги
+        rev = position[partner]
+        del partner
+        capacity = np.zeros(arcs, dtype=capacities.dtype)
+        capacity[position[:m]] = capacities
+        del position
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(owner, minlength=n), out=offsets[1:])
+        out_degree = np.bincount(owner[:m], minlength=n)
+        del owner
+
+        # Остаточная ёмкость дуги не превышает исходную ёмкость ребра, так что хватит типа под максимум
+        typecode = _smallest_typecode(int(capacities.max(initial=0))) if capacities.dtype.kind in "biu" else "d"
+        index_typecode = _smallest_typecode(arcs)
+
+        def packed(values, code):
+            # Копия в array нужного типа без промежуточных bytes
+            out = array(code, [0]) * len(values)
+            if len(values):
+                np.frombuffer(out, dtype=np.dtype(code))[:] = values
+            return out
+
+        degree_typecode = _smallest_typecode(int(out_degree.max(initial=0)))
+        return cls(labels, packed(offsets, index_typecode), packed(out_degree, degree_typecode),
+                   packed(head, _smallest_typecode(n)), packed(capacity, typecode), packed(rev, index_typecode))
+
+    def __len__(self):
+        return len(self.labels)
+
+    def net_outflow(self, node):
+        # Поток из вершины: по дугам рёбер он равен остаточной ёмкости обратной дуги,
+        # по обратным дугам — минус их остаточная ёмкость
+        capacity, rev = self.capacity, self.rev
+        split = self.offsets[node] + self.out_degree[node]
+        return (sum(capacity[rev[a]] for a in range(self.offsets[node], split))
+                - sum(capacity[a] for a in range(split, self.offsets[node + 1])))
+
+    def levels(self, source):
+        # BFS по дугам с положительной остаточной ёмкостью; -1 — вершина недостижима
+        offsets, head, capacity = self.offsets, self.head, self.capacity
+        level = [-1] * len(self.labels)
+        level[source] = 0
+        queue = deque([source])
+        while queue:
+            u = queue.popleft()
+            for a in range(offsets[u], offsets[u + 1]):
+                v = head[a]
+                if capacity[a] > 0 and level[v] < 0:
+                    level[v] = level[u] + 1
+                    queue.append(v)
+        return level
+
+    def reachable(self, source):
+        level = self.levels(source)
+        return {v for v in range(len(level)) if level[v] >= 0}
+
+    def edmonds_karp(self, source, sink, stats):
+        offsets, head, capacity, rev = self.offsets, self.head, self.capacity, self.rev
+        max_flow = 0
+        stats["phases"] = 1
+        while True:
+            parent_arc = [-1] * len(self.labels)  # Дуга, по которой пришли в вершину
+            parent_arc[source] = -2
+            queue = deque([source])
+            while queue and parent_arc[sink] == -1:
+                u = queue.popleft()
+                for a in range(offsets[u], offsets[u + 1]):
+                    v = head[a]
+                    if capacity[a] > 0 and parent_arc[v] == -1:
+                        parent_arc[v] = a
+                        queue.append(v)
+            if parent_arc[sink] == -1:
+                break
+
+            path = []
+            v = sink
+            while v != source:
+                a = parent_arc[v]
+                path.append(a)
+                v = head[rev[a]]
+            path_flow = min(capacity[a] for a in path)
+            for a in path:
+                capacity[a] -= path_flow
+                capacity[rev[a]] += path_flow
+            max_flow += path_flow
+            stats["augmentations"] += 1
+        return max_flow
+
+    def dinic(self, source, sink, stats):
+        offsets, head, capacity, rev = self.offsets, self.head, self.capacity, self.rev
+        max_flow = 0
+        while True:
+            level = self.levels(source)
+            if level[sink] < 0:
+                break
+            stats["phases"] += 1
+            current = offsets[:-1].tolist()  # Указатели текущих дуг
+            path = []  # Индексы дуг от источника до текущей вершины
+            u = source
+            while True:
+                if u == sink:
+                    bottleneck = min(capacity[a] for a in path)
+                    for a in path:
+                        capacity[a] -= bottleneck
+                        capacity[rev[a]] += bottleneck
+                    max_flow += bottleneck
+                    stats["augmentations"] += 1
+                    # Откатываемся к началу первой насыщенной дуги
+                    for k, a in enumerate(path):
+                        if capacity[a] == 0:
+                            del path[k:]
+                            break
+                    u = head[path[-1]] if path else source
+                    continue
+
+                end = offsets[u + 1]
+                a = current[u]
+                next_level = level[u] + 1
+                while a < end and not (capacity[a] > 0 and level[head[a]] == next_level):
+                    a += 1
+                current[u] = a
+                if a < end:
+                    path.append(a)
+                    u = head[a]
+                elif path:
+                    # Тупик: возвращаемся к предыдущей вершине и переходим к её следующей дуге
+                    u = head[rev[path.pop()]]
+                    current[u] += 1
+                else:
+                    break
+        return max_flow
+
 
 class FordFulkerson:
-    def __init__(self, graph):
+    def __init__(self, graph, algorithm="dinic"):
         # Инициализация графа и множества посещённых вершин
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Неизвестный алгоритм: {algorithm!r}, допустимые: {', '.join(ALGORITHMS)}")
+        if isinstance(graph, CSRNetwork) and algorithm not in CSR_ALGORITHMS:
+            raise ValueError(f"Для CSRNetwork доступны только алгоритмы: {', '.join(CSR_ALGORITHMS)}")
         self.graph = graph  # Граф представлен в виде словаря
         self.visited = set()  # Множество для отслеживания посещённых вершин
+        self.algorithm = algorithm
+        self.stats = {"phases": 0, "augmentations": 0}  # Статистика последнего запуска
+        # Состояние для пересчёта после изменения ёмкостей (update_capacity / reoptimize)
+        self.source = None
+        self.sink = None
+        self.flow_value = 0
+        self.imbalance = {}  # Вершина -> избыток (>0) или недостаток (<0) после уменьшения ёмкостей
+        if isinstance(graph, CSRNetwork):
+            self.capacity = None  # Исходные ёмкости хранит сама сеть
+            return
+
+        # Добавляем недостающие обратные рёбра с нулевой ёмкостью
+        for u, v in [(u, v) for u in list(graph) for v in graph[u]]:
+            graph.setdefault(v, {}).setdefault(u, 0)
+        # Исходные ёмкости нужны, чтобы в разрез попадали только настоящие рёбра
+        self.capacity = {u: dict(neighbours) for u, neighbours in graph.items()}
 
     def ford_fulkerson(self, source, sink):
+        # Выбор реализации по названию алгоритма
+        solvers = {
+            "dfs": self._augment_dfs,
+            "capacity_scaling": self._capacity_scaling,
+            "edmonds_karp": self._edmonds_karp,
+            "dinic": self._dinic,
+            "push_relabel_fifo": lambda s, t: self._push_relabel(s, t, highest_label=False),
+            "push_relabel_highest": lambda s, t: self._push_relabel(s, t, highest_label=True),
+        }
+        self.stats = {"phases": 0, "augmentations": 0}
+        self.source, self.sink = source, sink
+        if source == sink:
+            return 0
+        if isinstance(self.graph, CSRNetwork):
+            s, t = self.graph.node_id(source), self.graph.node_id(sink)
+            max_flow = getattr(self.graph, self.algorithm)(s, t, self.stats)
+            self.flow_value = self.graph.net_outflow(s)
+            return max_flow
+        max_flow = solvers[self.algorithm](source, sink)
+        self.flow_value = self._net_outflow(source)
+        return max_flow
+
+    def _net_outflow(self, node):
+        # Поток через рёбра вершины: исходная ёмкость минус остаточная
+        return sum(self.capacity[node].get(v, 0) - capacity for v, capacity in self.graph[node].items())
+
+    def update_capacity(self, u, v, capacity):
+        """
+        Меняет ёмкость ребра u -> v, сохраняя текущий поток в остаточной сети.
+        Если новая ёмкость меньше потока по ребру, лишний поток снимается с ребра,
+        а возникший дисбаланс в вершинах исправляет следующий вызов reoptimize().
+        """
+        if capacity < 0:
+            raise ValueError(f"Ёмкость ребра ({u}, {v}) не может быть отрицательной: {capacity}")
+        if isinstance(self.graph, CSRNetwork):
+            raise ValueError("update_capacity поддерживается только для словарной сети")
+        for a, b in ((u, v), (v, u)):
+            self.graph.setdefault(a, {}).setdefault(b, 0)
+            self.capacity.setdefault(a, {}).setdefault(b, 0)
+
+        old = self.capacity[u][v]
+        flow = old - self.graph[u][v]  # Текущий поток по ребру (отрицательный — поток идёт v -> u)
+        self.capacity[u][v] = capacity
+        if flow <= capacity:
+            self.graph[u][v] += capacity - old
+            return
+
+        # Поток больше новой ёмкости: урезаем его до ёмкости
+        excess = flow - capacity
+        self.graph[u][v] = 0
+        self.graph[v][u] -= excess
+        self.imbalance[u] = self.imbalance.get(u, 0) + excess
+        self.imbalance[v] = self.imbalance.get(v, 0) - excess
+
+    def reoptimize(self):
+        """
+        Восстанавливает максимальный поток после update_capacity, начиная с текущего потока.
+        Алгоритмы увеличивающих путей ищут только недостающие пути; проталкивание предпотока
+        тоже продолжает с текущего потока: высоты вершин задаёт глобальная перемаркировка
+        по текущей остаточной сети, а избыток — только остаточные дуги из источника.
+        :return: Новое значение максимального потока.
+        """
+        if self.source is None:
+            raise RuntimeError("Сначала нужно найти поток: вызовите ford_fulkerson(source, sink)")
+        source, sink = self.source, self.sink
+        # В источнике и стоке дисбаланс допустим — он просто меняет величину потока
+        self.imbalance.pop(source, None)
+        self.imbalance.pop(sink, None)
+
+        # Избыток отправляем сначала в вершины с недостатком, остальное — обратно в источник
+        for node in [w for w, amount in self.imbalance.items() if amount > 0]:
+            while self.imbalance[node] > 0:
+                targets = {w for w, amount in self.imbalance.items() if amount < 0}
+                targets.add(source)
+                if not self._repair_path(node, targets):
+                    raise RuntimeError(f"Не удалось перераспределить поток из вершины {node}")
+        # Недостаток покрываем, забирая поток у стока или у источника: push-relabel может оставить
+        # циркуляцию через источник, и тогда вершину питает только он
+        for node in [w for w, amount in self.imbalance.items() if amount < 0]:
+            while self.imbalance[node] < 0:
+                if not (self._repair_path(sink, {node}) or self._repair_path(source, {node})):
+                    raise RuntimeError(f"Не удалось восполнить поток в вершине {node}")
+        self.imbalance = {}
+
+        self.ford_fulkerson(source, sink)
+        return self.flow_value
+
+    def _repair_path(self, start, targets):
+        # BFS по остаточной сети от start до ближайшей вершины из targets и перенос потока по пути.
+        # Возвращает False, если ни одна вершина из targets недостижима
+        parent = {start: None}
+        queue = deque([start])
+        target = None
+        while queue:
+            u = queue.popleft()
+            if u in targets and u != start:
+                target = u
+                break
+            for v, capacity in self.graph[u].items():
+                if capacity > 0 and v not in parent:
+                    parent[v] = u
+                    queue.append(v)
+        if target is None:
+            return False
+
+        terminal = start in (self.source, self.sink)  # У источника и стока дисбаланс не ограничен
+        amount = float("inf") if terminal else self.imbalance.get(start, 0)
+        if target != self.source:
+            amount = min(amount, -self.imbalance[target])
+        v = target
+        while v != start:
+            amount = min(amount, self.graph[parent[v]][v])
+            v = parent[v]
+        v = target
+        while v != start:
+            u = parent[v]
+            self.graph[u][v] -= amount
+            self.graph[v][u] += amount
+            v = u
+
+        if not terminal:
+            self.imbalance[start] -= amount
+        if target != self.source:
+            self.imbalance[target] += amount
+        return True
+
+    def _augment_dfs(self, source, sink, delta=0):
+        # Одна фаза: увеличиваем поток по путям из рёбер с остаточной ёмкостью не меньше delta
         max_flow = 0
+        self.stats["phases"] += 1
 
         while True:
             # Поиск пути от source к sink с помощью DFS
-            path = self._dfs(source, sink, [])
+            self.visited = set()  # Каждый поиск пути начинается с чистого множества
+            path = self._dfs(source, sink, [], delta)
             if not path:
                 break
 
@@ -29,25 +436,295 @@ class FordFulkerson:
                 self.graph[v][u] += min_capacity  # Увеличиваем ёмкость обратного ребра
 
             max_flow += min_capacity  # Увеличиваем общий максимальный поток
+            self.stats["augmentations"] += 1
+
+        return max_flow
 
+    def _capacity_scaling(self, source, sink):
+        # Масштабирование ёмкостей: сначала только «толстые» рёбра (>= delta), затем delta делим пополам
+        max_capacity = max((c for neighbours in self.graph.values() for c in neighbours.values()), default=0)
+        if max_capacity <= 0:
+            return 0
+        delta = 1 << (int(max_capacity).bit_length() - 1) if max_capacity >= 1 else 0
+        max_flow = 0
+        while delta >= 1:
+            max_flow += self._augment_dfs(source, sink, delta)
+            delta //= 2
+        # Дробные ёмкости: добираем остаток без порога
+        if any(c != int(c) for neighbours in self.graph.values() for c in neighbours.values()):
+            max_flow += self._augment_dfs(source, sink)
         return max_flow
 
-    def _dfs(self, node, sink, path):
-        # Метод для поиска пути с помощью DFS
+    def _dfs(self, node, sink, path, delta=0):
+        # Метод для поиска пути с помощью DFS.
+        # Обход итеративный (явный стек), чтобы длинные пути не упирались в лимит рекурсии.
+        # delta — минимальная остаточная ёмкость ребра, по которому разрешено идти
         if node == sink:
             return path  # Если достигли sink, возвращаем текущий путь
         self.visited.add(node)  # Добавляем текущую вершину в множество посещённых
-        for next_node, capacity in self.graph[node].items():
-            # Перебираем соседние вершины
-            if next_node not in self.visited and capacity > 0:  # Если вершина не посещена и ёмкость положительна
-                new_path = path + [(node, next_node)]  # Добавляем текущее ребро в путь
-                result = self._dfs(next_node, sink, new_path)  # Рекурсивный вызов для следующей вершины
-                if result:
-                    return result
+        path = list(path)
+        stack = [(node, iter(self.graph[node].items()))]
+        while stack:
+            u, neighbours = stack[-1]
+            for next_node, capacity in neighbours:
+                # Перебираем соседние вершины
+                if next_node not in self.visited and capacity > 0 and capacity >= delta:  # Если вершина не посещена и ёмкость достаточна
+                    path.append((u, next_node))  # Добавляем текущее ребро в путь
+                    if next_node == sink:
+                        return path
+                    self.visited.add(next_node)
+                    stack.append((next_node, iter(self.graph[next_node].items())))
+                    break
+            else:
+                # Соседи закончились — возвращаемся на шаг назад
+                stack.pop()
+                if stack:
+                    path.pop()
         return None
 
+    def _edmonds_karp(self, source, sink):
+        # Эдмондс-Карп: каждый раз берём кратчайший по числу рёбер путь (BFS)
+        max_flow = 0
+        while True:
+            parent = {source: None}
+            queue = deque([source])
+            while queue and sink not in parent:
+                u = queue.popleft()
+                for v, capacity in self.graph[u].items():
+                    if capacity > 0 and v not in parent:
+                        parent[v] = u
+                        queue.append(v)
+            if sink not in parent:
+                break
+
+            # Минимальная остаточная ёмкость вдоль пути
+            path_flow = float("inf")
+            v = sink
+            while v != source:
+                u = parent[v]
+                path_flow = min(path_flow, self.graph[u][v])
+                v = u
+
+            v = sink
+            while v != source:
+                u = parent[v]
+                self.graph[u][v] -= path_flow
+                self.graph[v][u] += path_flow
+                v = u
+            max_flow += path_flow
+            self.stats["augmentations"] += 1
+        self.stats["phases"] = 1
+        return max_flow
+
+    def _levels(self, source, sink):
+        # BFS от источника: уровень вершины — расстояние по рёбрам с положительной ёмкостью
+        level = {source: 0}
+        queue = deque([source])
+        while queue:
+            u = queue.popleft()
+            if u == sink:
+                continue  # За сток идти незачем
+            for v, capacity in self.graph[u].items():
+                if capacity > 0 and v not in level:
+                    level[v] = level[u] + 1
+                    queue.append(v)
+        return level
+
+    def _dinic(self, source, sink):
+        # Алгоритм Диница: слоистая сеть + блокирующий поток с указателями текущих дуг
+        adjacency = {u: list(neighbours) for u, neighbours in self.graph.items()}
+        max_flow = 0
+        while True:
+            level = self._levels(source, sink)
+            if sink not in level:
+                break
+            self.stats["phases"] += 1
+            max_flow += self._blocking_flow(source, sink, level, adjacency)
+        return max_flow
+
+    def _blocking_flow(self, source, sink, level, adjacency):
+        graph = self.graph
+        current = dict.fromkeys(adjacency, 0)  # Указатель текущей дуги для каждой вершины
+        flow = 0
+        path = [source]
+        while path:
+            u = path[-1]
+            if u == sink:
+                # Проталкиваем поток вдоль найденного пути
+                bottleneck = min(graph[path[i]][path[i + 1]] for i in range(len(path) - 1))
+                for i in range(len(path) - 1):
+                    graph[path[i]][path[i + 1]] -= bottleneck
+                    graph[path[i + 1]][path[i]] += bottleneck
+                flow += bottleneck
+                self.stats["augmentations"] += 1
+                # Откатываемся к началу первого насыщенного ребра
+                for i in range(len(path) - 1):
+                    if graph[path[i]][path[i + 1]] == 0:
+                        del path[i + 1:]
+                        break
+                continue
+
+            arcs = adjacency[u]
+            i = current[u]
+            next_level = level[u] + 1
+            while i < len(arcs):
+                v = arcs[i]
+                if graph[u][v] > 0 and level.get(v) == next_level:
+                    break
+                i += 1
+            current[u] = i
+            if i < len(arcs):
+                path.append(arcs[i])
+            else:
+                # Тупик: вершина больше не участвует в этой фазе
+                path.pop()
+                if path:
+                    current[path[-1]] += 1
+        return flow
+
+    def _push_relabel(self, source, sink, highest_label):
+        # Проталкивание предпотока (FIFO или «наивысшая метка») с эвристикой разрыва
+        graph = self.graph
+        adjacency = {u: list(neighbours) for u, neighbours in graph.items()}
+        self.stats["phases"] = 1
+        n = len(graph)
+        excess = dict.fromkeys(graph, 0)
+        current = dict.fromkeys(graph, 0)
+        # Начальные высоты — глобальная перемаркировка по текущей остаточной сети: расстояние
+        # до стока обходом в ширину по обратным дугам. В сети уже может быть поток (reoptimize),
+        # и тогда точные высоты сразу ведут избыток по оставшимся путям, а не поднимают вершины
+        # по одной; вершины, из которых сток недостижим, ставим выше источника
+        height = {sink: 0}
+        queue = deque([sink])
+        while queue:
+            v = queue.popleft()
+            for u in adjacency[v]:
+                if u not in height and u != source and graph[u][v] > 0:
+                    height[u] = height[v] + 1
+                    queue.append(u)
+        height[source] = n
+        for u in graph:
+            height.setdefault(u, n + 1)
+        count = [0] * (2 * n + 1)  # Число вершин на каждой высоте
+        for h in height.values():
+            count[h] += 1
+
+        fifo = deque()
+        buckets = [[] for _ in range(2 * n + 1)]
+        top = 0  # Наибольшая высота, на которой могут быть активные вершины
+        # С дробными ёмкостями проталкивание оставляет остатки порядка 1e-15 на дугах, которые
+        # должны быть насыщены: по ним reachable доходит до стока, а крошечные избытки гоняются
+        # по сети без конца. Такие остатки обнуляем; с целыми ёмкостями допуск нулевой
+        capacities = [c for neighbours in graph.values() for c in neighbours.values()]
+        if all(isinstance(c, int) for c in capacities):
+            tolerance = 0
+        else:
+            tolerance = FLOW_EPSILON * max(capacities, default=0)
+
+        def activate(v):
+            nonlocal top
+            if v == source or v == sink:
+                return
+            if highest_label:
+                buckets[height[v]].append(v)
+                top = max(top, height[v])
+            else:
+                fifo.append(v)
+
+        def push(u, v):
+            residual = graph[u][v]
+            delta = min(excess[u], residual)
+            if residual - delta <= tolerance:
+                delta = residual  # Дуга насыщается целиком
+            graph[u][v] -= delta
+            graph[v][u] += delta
+            excess[u] -= delta
+            if u != source and excess[u] <= tolerance:
+                excess[u] = 0
+            was_active = excess[v] > 0
+            excess[v] += delta
+            if not was_active and delta > 0:
+                activate(v)
+
+        def relabel(u):
+            old = height[u]
+            new = min((height[v] for v in adjacency[u] if graph[u][v] > 0), default=2 * n - 1) + 1
+            height[u] = min(new, 2 * n)
+            count[old] -= 1
+            count[height[u]] += 1
+            current[u] = 0
+            if count[old] == 0 and 0 < old < n:
+                # Разрыв: вершины выше old больше не достигают стока
+                for w in graph:
+                    if old < height[w] < n:
+                        count[height[w]] -= 1
+                        height[w] = n + 1
+                        count[n + 1] += 1
+                        if excess[w] > 0:
+                            activate(w)
+
+        def discharge(u):
+            arcs = adjacency[u]
+            while excess[u] > 0:
+                i = current[u]
+                if i == len(arcs):
+                    relabel(u)
+                    continue
+                v = arcs[i]
+                if graph[u][v] > 0 and height[u] == height[v] + 1:
+                    push(u, v)
+                    self.stats["augmentations"] += 1  # Для проталкивания предпотока считаем проталкивания
+                else:
+                    current[u] = i + 1
+
+        # Насыщаем все дуги из источника (при пересчёте — только остаточные)
+        excess[source] = sum(graph[source].values())
+        for v in adjacency[source]:
+            if graph[source][v] > 0:
+                push(source, v)
+
+        if highest_label:
+            while top >= 0:
+                if not buckets[top]:
+                    top -= 1
+                    continue
+                u = buckets[top].pop()
+                if excess[u] > 0 and height[u] == top:  # Устаревшие записи пропускаем
+                    discharge(u)
+        else:
+            while fifo:
+                u = fifo.popleft()
+                if excess[u] > 0:
+                    discharge(u)
+
+        return -self._net_outflow(sink)  # Весь поток в сток, включая прошедший до пересчёта
+
     def min_cut(self, source):
         # Метод для нахождения минимального разреза
+        if isinstance(self.graph, CSRNetwork):
+            network = self.graph
+            capacity, head, rev = network.capacity, network.head, network.rev
+            reachable_ids = network.reachable(network.node_id(source))
+            # Дуги исходных рёбер с ненулевой исходной ёмкостью (сумма остатков пары дуг)
+            return [(network.label(u), network.label(head[a]))
+                    for u in reachable_ids
+                    for a in range(network.offsets[u], network.offsets[u] + network.out_degree[u])
+                    if capacity[a] + capacity[rev[a]] > 0 and head[a] not in reachable_ids]
+        reachable_nodes = self.reachable(source)
+
+        min_cut = []
+        for u in reachable_nodes:
+            for v, capacity in self.capacity[u].items():
+                if v not in reachable_nodes and capacity > 0:
+                    min_cut.append((u, v))  # Если v недостижима, добавляем ребро в минимальный разрез
+
+        return min_cut  # Возвращаем найденный минимальный разрез
+
+    def reachable(self, source):
+        # Вершины, достижимые из source по рёбрам с положительной остаточной ёмкостью
+        if isinstance(self.graph, CSRNetwork):
+            return {self.graph.label(i) for i in self.graph.reachable(self.graph.node_id(source))}
+        self.visited = set()  # Результаты прошлых обходов не должны мешать
         self.visited.add(source)  # Добавляем начальную вершину в множество посещённых
         reachable_nodes = set()  # Множество для хранения достижимых вершин
 
@@ -61,25 +738,263 @@ class FordFulkerson:
                     stack.append(next_node)  # Добавляем в стек для дальнейшего обхода
                     self.visited.add(next_node)  # Помечаем как посещённую
 
-        min_cut = []
-        for u in reachable_nodes:
-            for v, capacity in self.graph[u].items():
-                if v not in reachable_nodes:
-                    min_cut.append((u, v))  # Если v недостижима, добавляем ребро в минимальный разрез
+        return reachable_nodes
+
+
+class GomoryHuTree:
+    """
+    Дерево Гомори-Ху для неориентированной сети (алгоритм Гасфилда).
+    Строится за n - 1 вычислений максимального потока; минимальный разрез
+    между любыми двумя вершинами равен минимальному весу ребра на пути между ними в дереве.
+    """
+
+    def __init__(self, parent, weight):
+        self.parent = parent  # Вершина -> родитель в дереве (у корня None)
+        self.weight = weight  # Вершина -> вес ребра до родителя (величина разреза)
+        self.depth = {}
+        for node in parent:
+            # Глубину считаем итеративно: поднимаемся до уже известной вершины
+            chain = []
+            while node is not None and node not in self.depth:
+                chain.append(node)
+                node = parent[node]
+            depth = -1 if node is None else self.depth[node]
+            for v in reversed(chain):
+                depth += 1
+                self.depth[v] = depth
+
+    @classmethod
+    def build(cls, edges, algorithm="dinic"):
+        """
+        Строит дерево по списку рёбер [u, v, capacity]; направление рёбер не учитывается.
+        """
+        graph = build_residual_graph([(u, v, c) for u, v, c in edges] + [(v, u, c) for u, v, c in edges])
+        nodes = list(graph)
+        if not nodes:
+            return cls({}, {})
+        root = nodes[0]
+        parent = {node: root for node in nodes}
+        parent[root] = None
+        weight = {}
+
+        for s in nodes[1:]:
+            t = parent[s]
+            # Каждый раз считаем поток на свежей копии остаточной сети
+            solver = FordFulkerson({u: dict(neighbours) for u, neighbours in graph.items()}, algorithm)
+            value = solver.ford_fulkerson(s, t)
+            side = solver.reachable(s)  # Сторона разреза, содержащая s
+            weight[s] = value
+            for node in nodes:
+                if node != s and node in side and parent[node] == t:
+                    parent[node] = s
+            if parent[t] in side:
+                # s встаёт между t и его родителем
+                parent[s] = parent[t]
+                parent[t] = s
+                weight[s] = weight[t]
+                weight[t] = value
+
+        return cls(parent, weight)
+
+    def min_cut_value(self, u, v):
+        # Минимальный вес на пути между u и v: поднимаемся от более глубокой вершины
+        if u == v:
+            return float("inf")
+        result = float("inf")
+        while u != v:
+            if self.depth[u] < self.depth[v]:
+                u, v = v, u
+            result = min(result, self.weight[u])
+            u = self.parent[u]
+        return result
+
+    def to_list(self):
+        # Сериализация в список [вершина, родитель, вес] — подходит для json.dump
+        return [[node, parent, self.weight.get(node)] for node, parent in self.parent.items()]
+
+    @classmethod
+    def from_list(cls, items):
+        parent = {node: parent for node, parent, _ in items}
+        weight = {node: value for node, parent, value in items if parent is not None}
+        return cls(parent, weight)
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_list(), file, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as file:
+            return cls.from_list(json.load(file))
+
+def random_capacities(rng, capacities):
+    # Сэмплер по умолчанию: как в эксперименте со случайными весами, ёмкости от 100 до 1000
+    return [rng.randint(100, 1000) for _ in capacities]
+
+
+# Структура сети в процессе-исполнителе: загружается один раз при старте процесса
+_scenario_network = None
 
-        return min_cut  # Возвращаем найденный минимальный разрез
 
-def visualize_graph(edges):
+def _set_scenario_network(tails, heads, capacities, source, sink, sampler, algorithm):
+    global _scenario_network
+    _scenario_network = {
+        "tails": list(tails),
+        "heads": list(heads),
+        "capacities": list(capacities),
+        "source": source,
+        "sink": sink,
+        "sampler": sampler,
+        "algorithm": algorithm,
+    }
+
+
+def _init_scenario_worker(names, edge_count, source, sink, sampler, algorithm):
+    # Подключаемся к общей памяти, копируем структуру сети к себе и сразу отключаемся
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    try:
+        tails = blocks[0].buf[:edge_count * 8].cast("q")
+        heads = blocks[1].buf[:edge_count * 8].cast("q")
+        capacities = blocks[2].buf[:edge_count * 8].cast("d")
+        _set_scenario_network(tails, heads, capacities, source, sink, sampler, algorithm)
+        tails.release()
+        heads.release()
+        capacities.release()
+    finally:
+        for block in blocks:
+            block.close()
+
+
+def _run_scenario_chunk(seeds):
+    # Решает пачку сценариев; возвращает потоки и число попаданий каждого ребра в разрез
+    network = _scenario_network
+    tails, heads = network["tails"], network["heads"]
+    flows = []
+    cut_counts = [0] * len(tails)
+    for seed in seeds:
+        rng = random.Random(seed)
+        capacities = network["sampler"](rng, network["capacities"])
+        graph = build_residual_graph(zip(tails, heads, capacities))
+        graph[network["source"]]  # Источник и сток должны быть в сети, даже если у них нет рёбер
+        graph[network["sink"]]
+        solver = FordFulkerson(graph, network["algorithm"])
+        flows.append(solver.ford_fulkerson(network["source"], network["sink"]))
+        reachable_nodes = solver.reachable(network["source"])
+        for i, (u, v) in enumerate(zip(tails, heads)):
+            if u in reachable_nodes and v not in reachable_nodes and capacities[i] > 0:
+                cut_counts[i] += 1
+    return flows, cut_counts
+
+
+def run_capacity_scenarios(edges, scenarios, sampler=random_capacities, source='S', sink='T',
+                           workers=None, seed=None, algorithm="dinic"):
+    """
+    Метод Монте-Карло по ёмкостям: решает scenarios вариантов сети со случайными ёмкостями.
+    Структура сети (концы рёбер и базовые ёмкости) передаётся процессам один раз через общую память,
+    в задачах передаются только зёрна генератора.
+    :param sampler: функция (rng, базовые ёмкости) -> список ёмкостей; должна быть определена
+                    на уровне модуля, чтобы её можно было передать в другой процесс.
+    :return: Словарь со статистикой потока и долей сценариев, в которых каждое ребро попало в разрез.
+    """
+    # Переводим метки вершин в целые числа
+    ids = {}
+    for u, v, _ in edges:
+        ids.setdefault(u, len(ids))
+        ids.setdefault(v, len(ids))
+    ids.setdefault(source, len(ids))
+    ids.setdefault(sink, len(ids))
+    tails = array("q", (ids[u] for u, _, _ in edges))
+    heads = array("q", (ids[v] for _, v, _ in edges))
+    capacities = array("d", (c for _, _, c in edges))
+
+    rng = random.Random(seed)
+    seeds = [rng.getrandbits(64) for _ in range(scenarios)]
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, math.ceil(scenarios / (workers * 4)))
+    chunks = [seeds[i:i + chunk] for i in range(0, scenarios, chunk)]
+
+    if workers == 1:
+        _set_scenario_network(tails, heads, capacities, ids[source], ids[sink], sampler, algorithm)
+        results = [_run_scenario_chunk(part) for part in chunks]
+    else:
+        blocks = []
+        try:
+            for data in (tails, heads, capacities):
+                block = shared_memory.SharedMemory(create=True, size=max(1, len(data) * data.itemsize))
+                block.buf[:len(data) * data.itemsize] = data.tobytes()
+                blocks.append(block)
+            initargs = ([block.name for block in blocks], len(edges), ids[source], ids[sink], sampler, algorithm)
+            with ProcessPoolExecutor(workers, initializer=_init_scenario_worker, initargs=initargs) as pool:
+                results = list(pool.map(_run_scenario_chunk, chunks))
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    flows = [flow for part_flows, _ in results for flow in part_flows]
+    cut_counts = [0] * len(edges)
+    for _, part_counts in results:
+        for i, count in enumerate(part_counts):
+            cut_counts[i] += count
+
+    mean = sum(flows) / len(flows) if flows else 0
+    return {
+        "scenarios": len(flows),
+        "mean": mean,
+        "std": math.sqrt(sum((flow - mean) ** 2 for flow in flows) / len(flows)) if flows else 0,
+        "min": min(flows, default=0),
+        "max": max(flows, default=0),
+        "cut_frequency": [count / len(flows) if flows else 0 for count in cut_counts],
+    }
+
+
+# Рисование: при большем числе вершин spring_layout заменяется дешёвой раскладкой,
+# а граф сверх DRAW_MAX_NODES вершин урезается до связного фрагмента
+SPRING_LAYOUT_MAX_NODES = 100
+DRAW_MAX_NODES = 300
+
+
+def _drawable_subgraph(G, max_nodes, start=None):
+    # BFS от start (или первой вершины) до max_nodes вершин — фрагмент остаётся связным
+    if G.number_of_nodes() <= max_nodes:
+        return G
+    start = start if start in G else next(iter(G))
+    nodes = {start}
+    queue = deque([start])
+    while queue and len(nodes) < max_nodes:
+        u = queue.popleft()
+        for v in list(G.successors(u)) + list(G.predecessors(u)):
+            if v not in nodes and len(nodes) < max_nodes:
+                nodes.add(v)
+                queue.append(v)
+    return G.subgraph(nodes)
+
+
+def visualize_graph(edges, max_nodes=DRAW_MAX_NODES):
+    # matplotlib и networkx нужны только для рисования, поэтому импортируются здесь
+    import matplotlib.pyplot as plt
+    import networkx as nx
+
     G = nx.DiGraph()
     for u, v, capacity in edges:
         G.add_edge(u, v, capacity=capacity)
-    pos = nx.spring_layout(G)
-    nx.draw(G, pos, with_labels=True, node_color="skyblue", node_size=500, font_size=12, font_weight="bold")
-    nx.draw_networkx_edge_labels(G, pos, edge_labels={(u, v): str(d["capacity"]) for u, v, d in G.edges(data=True)})
-    plt.title("Граф сети")
+    total_nodes = G.number_of_nodes()
+    G = _drawable_subgraph(G, max_nodes, start='S')
+    small = G.number_of_nodes() <= SPRING_LAYOUT_MAX_NODES
+    pos = nx.spring_layout(G) if small else nx.random_layout(G, seed=0)
+    nx.draw(G, pos, with_labels=small, node_color="skyblue", node_size=500 if small else 20,
+            font_size=12, font_weight="bold", arrows=small)
+    if small:
+        nx.draw_networkx_edge_labels(G, pos, edge_labels={(u, v): str(d["capacity"]) for u, v, d in G.edges(data=True)})
+    title = "Граф сети"
+    if G.number_of_nodes() < total_nodes:
+        title += f" (показано {G.number_of_nodes()} из {total_nodes} вершин)"
+    plt.title(title)
     plt.show()
 
 def find_max_flow_min_cut(edges):
+    import networkx as nx  # Эталонное решение, нужно только для сверки
+
     G = nx.DiGraph()
 
     for edge in edges:
@@ -93,40 +1008,81 @@ def find_max_flow_min_cut(edges):
     return flow_value, min_cut
 
 # Список рёбер сети
-edges = [['S', '1', 50], ['S', '2', 30], ['S', '3', 15],
-         ['1', '4', 25], 
-         ['2', '1', 50], ['2', '4', 45], ['2', '7', 15], 
-         ['3', '2', 15], ['3', '5', 10], ['3', '8', 20],
-         ['4', '6', 90], ['4', '7', 10], 
-         ['5', '2', 10],
-         ['6', 'T', 10], 
-         ['7', '2', 15], ['7', '5', 60], ['7', '6', 10], ['7', '9', 10], ['7', 'T', 80],
-         ['8', '7', 20], ['8', '9', 10], 
-         ['9', 'T', 10]]
-
-# Находим максимальный поток и минимальный разрез
-max_flow, min_cut = find_max_flow_min_cut(edges)
-
-print("Максимальный поток:", max_flow)
-print("Минимальный разрез:", min_cut)
-
-# Визуализируем граф
-visualize_graph(edges)
-
-# построим граф с другими весами
-edges2 = []
-for i in range(len(edges)):
-    cur_edge = edges[i]
-    cur_edge[2] = random.randint(100, 1000)
-    edges2.append(cur_edge)
-
-max_flow2, min_cut2 = find_max_flow_min_cut(edges2)
-
-print("Максимальный поток:", max_flow2)
-print("Минимальный разрез:", min_cut2)
-graph2 = defaultdict(dict)
-for u, v, capacity in edges2:
-    graph2[u][v] = capacity
-    graph2[v][u] = 0  # Обратные рёбра для обратного потока
-
-visualize_graph(edges2)
\ No newline at end of file
+EXAMPLE_EDGES = [['S', '1', 50], ['S', '2', 30], ['S', '3', 15],
+                 ['1', '4', 25], 
+                 ['2', '1', 50], ['2', '4', 45], ['2', '7', 15], 
+                 ['3', '2', 15], ['3', '5', 10], ['3', '8', 20],
+                 ['4', '6', 90], ['4', '7', 10], 
+                 ['5', '2', 10],
+                 ['6', 'T', 10], 
+                 ['7', '2', 15], ['7', '5', 60], ['7', '6', 10], ['7', '9', 10], ['7', 'T', 80],
+                 ['8', '7', 20], ['8', '9', 10], 
+                 ['9', 'T', 10]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Максимальный поток и минимальный разрез сети")
+    parser.add_argument("--draw", action="store_true", help="нарисовать граф (нужны matplotlib и networkx)")
+    args = parser.parse_args()
+
+    # Копия списка рёбер: ниже ёмкости меняются на месте
+    edges = [list(edge) for edge in EXAMPLE_EDGES]
+
+    # Находим максимальный поток и минимальный разрез
+    max_flow, min_cut = find_max_flow_min_cut(edges)
+
+    print("Максимальный поток:", max_flow)
+    print("Минимальный разрез:", min_cut)
+
+    # Визуализируем граф
+    if args.draw:
+        visualize_graph(edges)
+
+    # Решатель на исходных ёмкостях: после смены весов пересчитаем его с тёплого старта
+    incremental = FordFulkerson(build_residual_graph(edges))
+    incremental.ford_fulkerson('S', 'T')
+
+    # построим граф с другими весами
+    edges2 = []
+    for i in range(len(edges)):
+        cur_edge = edges[i]
+        cur_edge[2] = random.randint(100, 1000)
+        edges2.append(cur_edge)
+
+    max_flow2, min_cut2 = find_max_flow_min_cut(edges2)
+
+    print("Максимальный поток:", max_flow2)
+    print("Минимальный разрез:", min_cut2)
+
+    # Сверяем собственные реализации с networkx
+    for algorithm in ALGORITHMS:
+        graph2 = build_residual_graph(edges2)
+        solver = FordFulkerson(graph2, algorithm=algorithm)
+        print(f"FordFulkerson ({algorithm}):", solver.ford_fulkerson('S', 'T'), solver.min_cut('S'),
+              f"фаз: {solver.stats['phases']}, увеличений: {solver.stats['augmentations']}")
+    csr_solver = FordFulkerson(CSRNetwork.from_edges(edges2), algorithm="dinic")
+    print("FordFulkerson (dinic, CSRNetwork):", csr_solver.ford_fulkerson('S', 'T'), csr_solver.min_cut('S'))
+
+    # Тёплый старт: меняем ёмкости в уже решённой сети вместо решения с нуля
+    for u, v, capacity in edges2:
+        incremental.update_capacity(u, v, capacity)
+    print("FordFulkerson после update_capacity + reoptimize:", incremental.reoptimize())
+
+    # Дерево Гомори-Ху: разрезы между любыми парами вершин (сеть считается неориентированной)
+    gomory_hu = GomoryHuTree.build(edges2)
+    print("Минимальный разрез между '1' и '9' (неориентированная сеть):", gomory_hu.min_cut_value('1', '9'))
+
+    # Монте-Карло: много случайных вариантов ёмкостей, решаемых параллельно
+    scenario_stats = run_capacity_scenarios(edges2, 200, seed=1)
+    print(f"Монте-Карло ({scenario_stats['scenarios']} сценариев): средний поток {scenario_stats['mean']:.1f}, "
+          f"σ = {scenario_stats['std']:.1f}, от {scenario_stats['min']} до {scenario_stats['max']}")
+    for (u, v, _), frequency in zip(edges2, scenario_stats["cut_frequency"]):
+        if frequency > 0:
+            print(f"  Ребро ({u}, {v}) в минимальном разрезе: {frequency:.1%} сценариев")
+
+    if args.draw:
+        visualize_graph(edges2)
+
+
+if __name__ == "__main__":
+    main()
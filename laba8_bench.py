@@ -0,0 +1,225 @@
+import argparse
+import json
+import platform
+import random
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from laba8 import ALGORITHMS, CSR_ALGORITHMS, EXAMPLE_EDGES, CSRNetwork, FordFulkerson, build_residual_graph
+
+# Размеры задач: примерное число рёбер в сгенерированной сети
+SIZES = {
+    "example": None,  # Сеть из 11 вершин из laba8.py
+    "1k": 10 ** 3,
+    "10k": 10 ** 4,
+    "100k": 10 ** 5,
+    "1m": 10 ** 6,
+}
+
+
+# Генераторы сетей: принимают примерное число рёбер и генератор случайных чисел,
+# возвращают (список рёбер [u, v, capacity], источник, сток)
+def layered_network(edge_count, rng, degree=4, capacity=100):
+    # Слои одинаковой ширины, каждая вершина соединена с degree случайными вершинами следующего слоя
+    width = max(2, int((edge_count / degree) ** 0.5))
+    layers = max(2, edge_count // (width * degree))
+    edges = [["S", (0, i), rng.randint(1, capacity)] for i in range(width)]
+    for layer in range(layers - 1):
+        for i in range(width):
+            for j in rng.sample(range(width), min(degree, width)):
+                edges.append([(layer, i), (layer + 1, j), rng.randint(1, capacity)])
+    edges += [[(layers - 1, i), "T", rng.randint(1, capacity)] for i in range(width)]
+    return edges, "S", "T"
+
+
+def grid_network(edge_count, rng, capacity=100):
+    # Решётка: рёбра вправо, вниз и вверх; источник слева, сток справа
+    side = max(2, int((edge_count / 3) ** 0.5))
+    edges = []
+    for r in range(side):
+        edges.append(["S", (r, 0), rng.randint(1, capacity)])
+        edges.append([(r, side - 1), "T", rng.randint(1, capacity)])
+        for c in range(side):
+            if c + 1 < side:
+                edges.append([(r, c), (r, c + 1), rng.randint(1, capacity)])
+            if r + 1 < side:
+                edges.append([(r, c), (r + 1, c), rng.randint(1, capacity)])
+                edges.append([(r + 1, c), (r, c), rng.randint(1, capacity)])
+    return edges, "S", "T"
+
+
+def random_sparse_network(edge_count, rng, capacity=100):
+    # Случайный граф со средней степенью около 5
+    n = max(2, edge_count // 5)
+    edges = []
+    while len(edges) < edge_count:
+        u, v = rng.randrange(n), rng.randrange(n)
+        if u != v:
+            edges.append([u, v, rng.randint(1, capacity)])
+    return edges, 0, n - 1
+
+
+def random_dense_network(edge_count, rng, capacity=100):
+    # Случайный граф, в котором есть примерно половина всех возможных рёбер
+    n = max(2, int((2 * edge_count) ** 0.5))
+    edges = [[u, v, rng.randint(1, capacity)]
+             for u in range(n) for v in range(n) if u != v and rng.random() < 0.5]
+    return edges, 0, n - 1
+
+
+def bipartite_network(edge_count, rng, degree=5):
+    # Задача о паросочетании: источник -> левая доля -> правая доля -> сток, все ёмкости 1
+    side = max(1, edge_count // degree)
+    edges = [["S", ("L", i), 1] for i in range(side)]
+    for i in range(side):
+        for j in rng.sample(range(side), min(degree, side)):
+            edges.append([("L", i), ("R", j), 1])
+    edges += [[("R", j), "T", 1] for j in range(side)]
+    return edges, "S", "T"
+
+
+GENERATORS = {
+    "layered": layered_network,
+    "grid": grid_network,
+    "random_sparse": random_sparse_network,
+    "random_dense": random_dense_network,
+    "bipartite": bipartite_network,
+}
+
+# Решатели: все алгоритмы на словарной сети, алгоритмы CSRNetwork и эталон networkx
+SOLVERS = list(ALGORITHMS) + [f"csr_{algorithm}" for algorithm in CSR_ALGORITHMS] + ["networkx"]
+
+
+def solve(solver, edges, source, sink):
+    """
+    Один запуск решателя: строит сеть, ищет поток и разрез.
+    :return: Словарь с величиной потока, временем этапов и статистикой алгоритма.
+    """
+    started = time.perf_counter()
+    if solver == "networkx":
+        import networkx as nx
+
+        G = nx.DiGraph()
+        for u, v, capacity in edges:
+            if G.has_edge(u, v):
+                G[u][v]["capacity"] += capacity
+            else:
+                G.add_edge(u, v, capacity=capacity)
+        built = time.perf_counter()
+        flow_value = nx.maximum_flow_value(G, source, sink)
+        solved = time.perf_counter()
+        nx.minimum_cut(G, source, sink)
+        stats = {}
+    else:
+        if solver.startswith("csr_"):
+            flow = FordFulkerson(CSRNetwork.from_edges(edges, nodes=(source, sink)), solver[len("csr_"):])
+        else:
+            graph = build_residual_graph(edges)
+            graph[source]  # Источник и сток должны быть в сети, даже если у них нет рёбер
+            graph[sink]
+            flow = FordFulkerson(graph, solver)
+        built = time.perf_counter()
+        flow_value = flow.ford_fulkerson(source, sink)
+        solved = time.perf_counter()
+        flow.min_cut(source)
+        stats = flow.stats
+    finished = time.perf_counter()
+    return {
+        "flow": flow_value,
+        "build_seconds": built - started,
+        "max_flow_seconds": solved - built,
+        "min_cut_seconds": finished - solved,
+        "augmentations": stats.get("augmentations"),
+        "phases": stats.get("phases"),
+    }
+
+
+def peak_memory(solver, edges, source, sink):
+    # Отдельный прогон под tracemalloc: он заметно замедляет код, поэтому время меряем без него
+    tracemalloc.start()
+    try:
+        solve(solver, edges, source, sink)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(generator, size, edges, source, sink, solvers, repeat, measure_memory):
+    # Все решатели на одной сети
+    nodes = len({u for u, _, _ in edges} | {v for _, v, _ in edges})
+    records = []
+    for solver in solvers:
+        runs = [solve(solver, edges, source, sink) for _ in range(repeat)]
+        best = min(runs, key=lambda run: run["max_flow_seconds"])
+        record = {
+            "generator": generator,
+            "size": size,
+            "nodes": nodes,
+            "edges": len(edges),
+            "solver": solver,
+            **best,
+            "peak_memory_bytes": peak_memory(solver, edges, source, sink) if measure_memory else None,
+        }
+        records.append(record)
+        print(f"{generator:>13} {size:>7} {solver:>24}: поток {record['flow']}, "
+              f"{record['max_flow_seconds']:.3f} с + разрез {record['min_cut_seconds']:.3f} с, "
+              f"увеличений {record['augmentations']}")
+    return records
+
+
+def run_benchmarks(generators, sizes, solvers, repeat=1, measure_memory=True, seed=0):
+    results = []
+    if "example" in sizes:
+        # Пример из laba8.py один для всех генераторов
+        edges = [list(edge) for edge in EXAMPLE_EDGES]
+        results += run_case("example", "example", edges, "S", "T", solvers, repeat, measure_memory)
+    for generator in generators:
+        for size in sizes:
+            if SIZES[size] is None:
+                continue
+            edges, source, sink = GENERATORS[generator](SIZES[size], random.Random(seed))
+            results += run_case(generator, size, edges, source, sink, solvers, repeat, measure_memory)
+    return results
+
+
+def check_consistency(results):
+    # Все решатели на одной задаче должны дать одинаковый поток
+    flows = {}
+    for record in results:
+        flows.setdefault((record["generator"], record["size"]), set()).add(record["flow"])
+    return [key for key, values in flows.items() if len(values) > 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замеры FordFulkerson и networkx на синтетических сетях")
+    parser.add_argument("--generators", nargs="+", choices=list(GENERATORS), default=list(GENERATORS))
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["example", "1k", "10k"])
+    parser.add_argument("--solvers", nargs="+", choices=SOLVERS,
+                        default=[s for s in SOLVERS if s != "dfs"])  # dfs на больших сетях слишком медленный
+    parser.add_argument("--repeat", type=int, default=1, help="число повторов, в отчёт идёт лучшее время")
+    parser.add_argument("--no-memory", action="store_true", help="не замерять пиковую память")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="laba8_bench.json", help="файл для результатов в формате JSON")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.generators, args.sizes, args.solvers, args.repeat, not args.no_memory, args.seed)
+    mismatches = check_consistency(results)
+    for generator, size in mismatches:
+        print(f"Решатели дали разный поток: {generator}, {size}")
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"Результаты записаны в {args.output}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,9 @@
-import matplotlib.pyplot as plt
+import argparse
+import heapq
+import os
+import random
 from collections import defaultdict, deque
-import networkx as nx
+from concurrent.futures import ProcessPoolExecutor
 
 edges = [(7, 10), (7, 14), (9, 14), (2, 11), (7, 8), (2, 6), (3, 6),
          (9, 10), (7, 12), (5, 6), (3, 9), (2, 7), (5, 9), (6, 10),
@@ -24,19 +27,22 @@ def is_bipartite(edges):
         return False, None, None
 
     colors = {}
-    start_node = next(iter(graph))
-    queue = deque([start_node])
-    colors[start_node] = 0
-
-    while queue:
-        current = queue.popleft()
-        for neighbor in graph[current]:
-            if neighbor not in colors:
-                colors[neighbor] = 1 - colors[current]
-                queue.append(neighbor)
-            elif colors[neighbor] == colors[current]:
-                print("Граф не двудольный.")
-                return False, None, None
+    # BFS запускаем из каждой ещё не раскрашенной вершины, чтобы покрыть все компоненты связности
+    for start_node in graph:
+        if start_node in colors:
+            continue
+        queue = deque([start_node])
+        colors[start_node] = 0
+
+        while queue:
+            current = queue.popleft()
+            for neighbor in graph[current]:
+                if neighbor not in colors:
+                    colors[neighbor] = 1 - colors[current]
+                    queue.append(neighbor)
+                elif colors[neighbor] == colors[current]:
+                    print("Граф не двудольный.")
+                    return False, None, None
 
     # Разделение на доли
     part1 = [node for node, color in colors.items() if color == 0]
@@ -51,33 +57,32 @@ def build_flow_network(graph, part1, part2):
     flow_network = defaultdict(dict)
     source = "source"
     sink = "sink"
+    flow_network[source]  # Источник и сток есть в сети, даже если доли пустые
+    flow_network[sink]
 
-    # Добавляем вершины источника и стока
-    all_nodes = list(graph.keys())  # Все узлы исходного графа
+    def add_arc(u, v):
+        # Прямая дуга ёмкости 1 и обратная дуга ёмкости 0 — только для настоящих рёбер,
+        # поэтому размер сети O(E), а не O(V²)
+        flow_network[u][v] = 1
+        flow_network[v].setdefault(u, 0)
+
+    left, right = set(part1), set(part2)
 
     # Соединяем источник со всеми вершинами первой доли
     for node in part1:
-        flow_network[source][node] = 1
+        add_arc(source, node)
 
     # Соединяем все вершины второй доли со стоком
     for node in part2:
-        flow_network[node][sink] = 1
+        add_arc(node, sink)
 
     # Добавляем ребра исходного графа с пропускной способностью 1
     for u in graph:
         for v in graph[u]:
-            if u in part1 and v in part2:
-                flow_network[u][v] = 1  # Прямое ребро
-            elif v in part1 and u in part2:
-                flow_network[v][u] = 1  # Прямое ребро, словарь смежности
-
-    # Добавляем обратные ребра с пропускной способностью 0
-    for u in all_nodes + [source, sink]:
-      for v in all_nodes + [source, sink]:
-        if u not in flow_network:
-          flow_network[u] = {}
-        if v not in flow_network[u]:
-          flow_network[u][v] = 0 #Инициализация остаточной пропускной способности
+            if u in left and v in right:
+                add_arc(u, v)  # Прямое ребро
+            elif v in left and u in right:
+                add_arc(v, u)  # Прямое ребро, словарь смежности
 
     return flow_network, source, sink
 
@@ -85,20 +90,21 @@ def bfs(graph, source, sink, parent):
     """
     Поиск в ширину для нахождения увеличивающего пути.
     """
-    visited = {node: False for node in graph}
+    visited = {source}  # Только реально посещённые вершины, без словаря на все вершины графа
     queue = deque([source])
-    visited[source] = True
     parent[source] = None  # Важно: инициализация parent[source]
 
     while queue:
         u = queue.popleft()
-        for v in graph[u]:
-            if not visited[v] and graph[u][v] > 0:  # Проверяем остаточную пропускную способность
+        for v, capacity in graph[u].items():  # Только дуги, которые есть в сети
+            if v not in visited and capacity > 0:  # Проверяем остаточную пропускную способность
                 queue.append(v)
-                visited[v] = True
+                visited.add(v)
                 parent[v] = u
+                if v == sink:
+                    return True  # Дальше искать незачем
 
-    return visited[sink]  # True, если есть путь до стока, False иначе
+    return False  # Пути до стока нет
 
 def ford_fulkerson(graph, source, sink):
     """
@@ -127,19 +133,146 @@ def ford_fulkerson(graph, source, sink):
 def extract_matching(flow_network, part1, part2, source, sink):
     """
     Извлекает ребра паросочетания из сети потока.
+    Смотрим только дуги, выходящие из вершин первой доли: насыщенная дуга u -> v
+    (остаток 0, обратная дуга 1) — ребро паросочетания. Итого O(E).
     """
     matching = []
     for u in part1:
-        for v in part2:
-            if flow_network[u][v] == 0 and flow_network[v][u] == 1:
+        for v, capacity in flow_network[u].items():
+            if v != source and capacity == 0 and flow_network[v].get(u) == 1:
                 matching.append((u, v))
     return matching
 
+
+def karp_sipser(graph, seed=None):
+    """
+    Жадное паросочетание Карпа-Сипсера. Пока в оставшемся графе есть вершина степени 1,
+    берём её единственное ребро (такой выбор не уменьшает максимум), иначе — случайное
+    ребро: случайную свободную вершину и случайного свободного соседа. Результат —
+    максимальное по включению паросочетание, обычно почти максимальное по размеру. O(E).
+    :param graph: Словарь смежности неориентированного графа.
+    :return: Список рёбер найденного паросочетания.
+    """
+    rng = random.Random(seed)
+    degree = {u: len(neighbours) for u, neighbours in graph.items()}  # Степени в оставшемся графе
+    ones = deque(u for u, d in degree.items() if d == 1)
+    matched = set()
+    matching = []
+
+    def take(u, v):
+        matching.append((u, v))
+        matched.add(u)
+        matched.add(v)
+        for x in (u, v):
+            for w in graph[x]:
+                if w not in matched:
+                    degree[w] -= 1
+                    if degree[w] == 1:
+                        ones.append(w)
+
+    def take_forced():
+        while ones:
+            u = ones.popleft()
+            if u not in matched and degree[u] == 1:
+                take(u, next(w for w in graph[u] if w not in matched))
+
+    order = list(graph)
+    rng.shuffle(order)
+    for u in order:
+        take_forced()
+        if u not in matched and degree[u] > 0:
+            take(u, rng.choice([w for w in graph[u] if w not in matched]))
+    take_forced()
+    return matching
+
+
+def seed_flow_network(flow_network, matching, part1, source, sink):
+    """
+    Пропускает по сети потока единицу потока вдоль каждого ребра готового паросочетания,
+    чтобы ford_fulkerson искал только недостающие увеличивающие пути.
+    :return: Величина внесённого потока.
+    """
+    left = set(part1)
+    for u, v in matching:
+        if u not in left:
+            u, v = v, u
+        for a, b in ((source, u), (u, v), (v, sink)):
+            flow_network[a][b] -= 1
+            flow_network[b][a] += 1
+    return len(matching)
+
+
+def connected_components(edges):
+    """
+    Разбивает список рёбер на компоненты связности.
+    :return: Список списков рёбер, по одному на компоненту.
+    """
+    graph = defaultdict(list)
+    for u, v in edges:
+        graph[u].append(v)
+        graph[v].append(u)
+
+    component_of = {}
+    count = 0
+    for start in graph:
+        if start in component_of:
+            continue
+        component_of[start] = count
+        stack = [start]
+        while stack:
+            u = stack.pop()
+            for v in graph[u]:
+                if v not in component_of:
+                    component_of[v] = count
+                    stack.append(v)
+        count += 1
+
+    components = [[] for _ in range(count)]
+    for u, v in edges:
+        components[component_of[u]].append((u, v))
+    return components
+
+
+def _match_components(batch):
+    # Выполняется в процессе пула: паросочетание для каждой компоненты из пачки
+    matching_edges = []
+    for component in batch:
+        matching_edges += HopcroftKarp(component).max_matching()[1]
+    return matching_edges
+
+
+def parallel_max_matching(edges, workers=None):
+    """
+    Максимальное паросочетание графа из многих компонент: компоненты независимы,
+    поэтому считаются параллельно в пуле процессов (мелкие компоненты группируются в пачки).
+    :return: Количество рёбер в максимальном паросочетании и список этих рёбер.
+    """
+    components = connected_components(edges)
+    workers = workers or os.cpu_count() or 1
+
+    # Раздаём компоненты по пачкам примерно равного числа рёбер, начиная с самых больших
+    batch_count = max(1, min(len(components), workers * 4))
+    batches = [[] for _ in range(batch_count)]
+    sizes = [(0, i) for i in range(batch_count)]  # Куча (число рёбер, номер пачки): наименьшая — сверху
+    for component in sorted(components, key=len, reverse=True):
+        size, i = sizes[0]
+        batches[i].append(component)
+        heapq.heapreplace(sizes, (size + len(component), i))
+
+    if workers == 1:
+        results = [_match_components(batch) for batch in batches]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_match_components, batches))
+    matching_edges = [edge for result in results for edge in result]
+    return len(matching_edges), matching_edges
+
 class GraphK:
     def __init__(self, edges):
         self.graph = {}
         self.visited = set()
         self.matched = {}  # Словарь для паросочетаний
+        self.stats = {"greedy": 0, "augmented": 0, "greedy_share": 0.0}  # Вклад жадного старта
         self.construct_graph(edges)
 
     def construct_graph(self, edges):
@@ -153,6 +286,23 @@ class GraphK:
             self.matched[u] = None
             self.matched[v] = None
 
+    def greedy_init(self, seed=None):
+        """
+        Заполняет self.matched жадным паросочетанием Карпа-Сипсера, после чего
+        max_matching достраивает его только увеличивающими путями.
+        :return: Количество рёбер, найденных жадно.
+        """
+        for u, v in karp_sipser(self.graph, seed):
+            self.matched[u] = v
+            self.matched[v] = u
+        self.stats["greedy"] = sum(v is not None for v in self.matched.values()) // 2
+        return self.stats["greedy"]
+
+    def _update_stats(self, total):
+        # Какая часть итогового паросочетания найдена жадно, а какая — увеличивающими путями
+        self.stats["augmented"] = total - self.stats["greedy"]
+        self.stats["greedy_share"] = self.stats["greedy"] / total if total else 0.0
+
     def dfs(self, u):
         """
         Рекурсивно ищет увеличивающий путь в графе с помощью поиска в глубину (DFS).
@@ -178,21 +328,571 @@ class GraphK:
         Находит максимальное паросочетание в графе.
         :return: Количество рёбер в максимальном паросочетании и список этих рёбер.
         """
-        matchings = 0  # Инициализируем количество рёбер в паросочетании
+        matchings = sum(v is not None for v in self.matched.values()) // 2  # Рёбра, уже найденные жадно (greedy_init)
         for u in self.graph:  # Перебираем все вершины графа
             if self.matched[u] is None:  # Если вершина не сопоставлена
                 self.visited = set()  # Очищаем множество посещённых вершин перед каждым поиском пути (важно для алгоритма Куна)
                 if self.dfs(u):  # Пытаемся найти увеличивающий путь, начиная с этой вершины
                     matchings += 1  # Если увеличивающий путь найден, увеличиваем количество рёбер в паросочетании
         matching_edges = [(u, v) for u, v in self.matched.items() if v is not None and u < v ]  # Формируем список рёбер паросочетания, убираем дубликаты
+        self._update_stats(matchings)
         return matchings, matching_edges  # Возвращаем количество рёбер и список рёбер паросочетания
 
 
-def visualize_graph(edges, matching_edges_ford_fulkerson=None, matching_edges_kuhn=None):
-    graph = nx.Graph(edges)
-    pos = nx.spring_layout(graph)  # Layout for graph visualization
+class HopcroftKarp(GraphK):
+    """
+    Алгоритм Хопкрофта-Карпа: за одну фазу BFS строит слои от свободных вершин первой доли,
+    затем DFS (итеративный, без рекурсии) находит максимальный набор непересекающихся
+    кратчайших увеличивающих путей. Фаз O(√V), итого O(E√V).
+    """
+
+    def __init__(self, edges):
+        super().__init__(edges)
+        self.left = self._left_part()
+
+    def _left_part(self):
+        # Раскраска в два цвета по всем компонентам связности
+        colors = {}
+        for start in self.graph:
+            if start in colors:
+                continue
+            colors[start] = 0
+            queue = deque([start])
+            while queue:
+                u = queue.popleft()
+                for v in self.graph[u]:
+                    if v not in colors:
+                        colors[v] = 1 - colors[u]
+                        queue.append(v)
+                    elif colors[v] == colors[u]:
+                        raise ValueError("Граф не двудольный.")
+        return [u for u in self.graph if colors[u] == 0]
+
+    def _bfs(self):
+        # Слои: расстояние от свободных вершин первой доли по чередующимся путям
+        dist = {}
+        queue = deque()
+        for u in self.left:
+            if self.matched[u] is None:
+                dist[u] = 0
+                queue.append(u)
+        found = False
+        while queue:
+            u = queue.popleft()
+            for v in self.graph[u]:
+                w = self.matched[v]
+                if w is None:
+                    found = True  # Есть увеличивающий путь
+                elif w not in dist:
+                    dist[w] = dist[u] + 1
+                    queue.append(w)
+        return dist, found
+
+    def _dfs(self, root, dist, current):
+        # Итеративный поиск увеличивающего пути из root по слоям dist
+        stack = [root]
+        via = []  # via[i] — вершина второй доли, через которую идём из stack[i]
+        while stack:
+            u = stack[-1]
+            neighbours = self.graph[u]
+            while current[u] < len(neighbours):
+                v = neighbours[current[u]]
+                current[u] += 1
+                w = self.matched[v]
+                if w is None:
+                    # Нашли свободную вершину — чередуем рёбра вдоль пути
+                    via.append(v)
+                    for left, right in zip(stack, via):
+                        self.matched[left] = right
+                        self.matched[right] = left
+                    return True
+                if dist.get(w) == dist[u] + 1:
+                    via.append(v)
+                    stack.append(w)
+                    break
+            else:
+                # Из u пути нет: убираем её из слоёв до конца фазы
+                dist[u] = None
+                stack.pop()
+                if via:
+                    via.pop()
+        return False
+
+    def max_matching(self):
+        """
+        Находит максимальное паросочетание алгоритмом Хопкрофта-Карпа.
+        :return: Количество рёбер в максимальном паросочетании и список этих рёбер.
+        """
+        while True:
+            dist, found = self._bfs()
+            if not found:
+                break
+            current = dict.fromkeys(self.left, 0)  # Указатель на следующего соседа
+            for u in self.left:
+                if self.matched[u] is None:
+                    self._dfs(u, dist, current)
+        matching_edges = [(u, v) for u, v in self.matched.items() if v is not None and u < v]
+        self._update_stats(len(matching_edges))
+        return len(matching_edges), matching_edges
+
+
+class WeightedMatching(HopcroftKarp):
+    """
+    Паросочетание минимальной стоимости среди паросочетаний максимального размера.
+    Рёбра задаются тройками (u, v, cost). Сначала максимизируется число рёбер
+    (поэтому при единичных весах размер совпадает с GraphK.max_matching), затем
+    минимизируется суммарная стоимость.
+    Методы: "auction" — аукцион Бертсекаса с ε-масштабированием по разреженным рёбрам,
+    "hungarian" — венгерский алгоритм на плотной матрице, векторизованный через NumPy.
+    """
 
-    nx.draw(graph, pos, with_labels=True, node_color='lightblue', node_size=500, font_size=10)
+    METHODS = ("auction", "hungarian")
+
+    def __init__(self, edges, method="auction"):
+        if method not in self.METHODS:
+            raise ValueError(f"Неизвестный метод: {method!r}, допустимые: {', '.join(self.METHODS)}")
+        super().__init__([(u, v) for u, v, _ in edges])
+        self.method = method
+        self.total_cost = 0
+        # Стоимость ребра (вершина первой доли, вершина второй доли); у повторов берём меньшую
+        left = set(self.left)
+        self.cost = {}
+        for u, v, cost in edges:
+            key = (u, v) if u in left else (v, u)
+            self.cost[key] = min(cost, self.cost.get(key, cost))
+
+    def _bonus(self):
+        # Бонус за каждое ребро: больше любого возможного выигрыша по стоимости,
+        # поэтому паросочетание с большим числом рёбер всегда выгоднее
+        costs = list(self.cost.values()) or [0]
+        spread = max(costs) - min(costs)
+        return abs(max(costs)) + (len(self.left) + 1) * spread + 1
+
+    def max_matching(self):
+        """
+        Находит паросочетание выбранным методом.
+        :return: Количество рёбер в паросочетании и список этих рёбер; стоимость — в self.total_cost.
+        """
+        pairs = self._auction() if self.method == "auction" else self._hungarian()
+        for u in self.matched:
+            self.matched[u] = None
+        for u, v in pairs:
+            self.matched[u] = v
+            self.matched[v] = u
+        self.total_cost = sum(self.cost[pair] for pair in pairs)
+        matching_edges = [(u, v) for u, v in self.matched.items() if v is not None and u < v]
+        return len(matching_edges), matching_edges
+
+    def _auction(self):
+        # Квадратная задача о назначениях размера n + m: участники — вершины первой доли и
+        # «тени» вершин второй доли, объекты — вторая доля и «тени» первой доли.
+        # Участник u может взять соседа v (ценность bonus - cost) или свою тень (0);
+        # тень v' — вершину v (0) или тень любого соседа v (0). Тогда паросочетания
+        # соответствуют полным назначениям, а ε-масштабирование цен остаётся корректным.
+        left = list(self.left)
+        right = sorted({v for _, v in self.cost}, key=str)
+        n, m = len(left), len(right)
+        if not n or not m:
+            return []
+        left_index = {u: i for i, u in enumerate(left)}
+        right_index = {v: j for j, v in enumerate(right)}
+        bonus = self._bonus()
+        options = [[(m + i, 0)] for i in range(n)] + [[(j, 0)] for j in range(m)]
+        for (u, v), cost in self.cost.items():
+            i, j = left_index[u], right_index[v]
+            options[i].append((j, bonus - cost))
+            options[n + j].append((m + i, 0))
+        size = n + m
+        price = [0.0] * size
+
+        # ε-масштабирование: грубые фазы быстро выставляют цены, последняя даёт точный ответ
+        # (для целых стоимостей ε < 1/(n + m) гарантирует оптимум)
+        final_eps = 1 / (size + 1)
+        eps = max(final_eps, bonus / 5)
+        while True:
+            owner = [None] * size
+            assigned = [None] * size
+            queue = deque(range(size))
+            while queue:
+                person = queue.popleft()
+                best, best_value, second_value = None, float("-inf"), float("-inf")
+                for obj, value in options[person]:
+                    value -= price[obj]
+                    if value > best_value:
+                        best, best_value, second_value = obj, value, best_value
+                    elif value > second_value:
+                        second_value = value
+                # Единственный вариант никто не оспаривает — достаточно поднять цену на ε
+                price[best] += (best_value - second_value if second_value > float("-inf") else 0) + eps
+                previous = owner[best]
+                owner[best] = person
+                assigned[person] = best
+                if previous is not None:
+                    assigned[previous] = None
+                    queue.append(previous)
+            if eps <= final_eps:
+                break
+            eps = max(final_eps, eps / 5)
+        return [(left[i], right[assigned[i]]) for i in range(n) if assigned[i] < m]
+
+    def _hungarian(self):
+        import numpy as np  # Нужен только для плотного венгерского алгоритма
+
+        rows = list(self.left)
+        cols = sorted({v for _, v in self.cost}, key=str)
+        transpose = len(rows) > len(cols)
+        if transpose:
+            rows, cols = cols, rows
+        if not rows:
+            return []
+        row_index = {u: i for i, u in enumerate(rows)}
+        col_index = {v: j for j, v in enumerate(cols)}
+
+        # Нет ребра — стоимость 0 («без пары»), у рёбер стоимость минус бонус
+        bonus = self._bonus()
+        matrix = np.zeros((len(rows), len(cols)))
+        for (u, v), cost in self.cost.items():
+            if transpose:
+                u, v = v, u
+            matrix[row_index[u], col_index[v]] = cost - bonus
+
+        col_of_row = self._hungarian_assignment(np, matrix)
+        pairs = []
+        for i, j in enumerate(col_of_row):
+            u, v = rows[i], cols[j]
+            if transpose:
+                u, v = v, u
+            if (u, v) in self.cost:
+                pairs.append((u, v))
+        return pairs
+
+    @staticmethod
+    def _hungarian_assignment(np, matrix):
+        """
+        Венгерский алгоритм с потенциалами для матрицы n x m (n <= m), O(n² m).
+        Внутренний цикл по столбцам выполняется векторно.
+        :return: Номер столбца для каждой строки.
+        """
+        n, m = matrix.shape
+        u = np.zeros(n + 1)
+        v = np.zeros(m + 1)
+        p = np.zeros(m + 1, dtype=np.int64)  # p[j] — строка (с 1), назначенная столбцу j; 0 — свободен
+        way = np.zeros(m + 1, dtype=np.int64)
+        for i in range(1, n + 1):
+            p[0] = i
+            j0 = 0
+            minv = np.full(m + 1, np.inf)
+            used = np.zeros(m + 1, dtype=bool)
+            while True:
+                used[j0] = True
+                i0 = p[j0]
+                free = ~used[1:]
+                current = matrix[i0 - 1] - u[i0] - v[1:]
+                better = free & (current < minv[1:])
+                minv[1:][better] = current[better]
+                way[1:][better] = j0
+                candidates = np.where(free, minv[1:], np.inf)
+                j1 = int(np.argmin(candidates)) + 1
+                delta = candidates[j1 - 1]
+                u[p[used]] += delta
+                v[used] -= delta
+                minv[~used] -= delta
+                j0 = j1
+                if p[j0] == 0:
+                    break
+            # Чередуем назначения вдоль найденного пути
+            while j0:
+                j1 = way[j0]
+                p[j0] = p[j1]
+                j0 = j1
+        col_of_row = np.zeros(n, dtype=np.int64)
+        for j in range(1, m + 1):
+            if p[j]:
+                col_of_row[p[j] - 1] = j - 1
+        return col_of_row.tolist()
+
+
+class DynamicMatching(GraphK):
+    """
+    Максимальное паросочетание для меняющегося двудольного графа.
+    После каждого изменения паросочетание восстанавливается поиском увеличивающего пути
+    только из затронутых вершин, без пересчёта с нуля: за одно изменение размер
+    максимального паросочетания меняется не больше чем на 1, а любой новый
+    увеличивающий путь проходит через добавленное ребро или начинается в освободившейся вершине.
+    Граф должен оставаться двудольным — при вставке рёбер это не проверяется.
+
+    Время обновления не постоянное: удачный поиск пути обычно затрагивает немного вершин,
+    но неудачный обходит всю достижимую часть графа, то есть O(E) в худшем случае
+    (на графе из 600 тысяч рёбер — порядка сотни миллисекунд на remove_edge).
+    Ограничить поиск нельзя без потери максимальности паросочетания.
+    """
+
+    def __init__(self, edges=()):
+        edges = list(edges)  # Рёбра нужны дважды: для графа и для начального паросочетания
+        super().__init__(edges)
+        for u in self.graph:
+            self.graph[u] = list(dict.fromkeys(self.graph[u]))  # Повторное ребро — то же самое ребро
+        hopcroft_karp = HopcroftKarp(edges)
+        self.size = hopcroft_karp.max_matching()[0]
+        self.matched.update(hopcroft_karp.matched)
+
+    def _augment(self, start, blocked=(), journal=None):
+        """
+        Итеративный поиск увеличивающего пути из свободной вершины start.
+        :param blocked: Вершины, через которые путь проходить не может.
+        :param journal: Словарь, куда до изменения записываются прежние пары вершин пути (для отката).
+        :return: True, если путь найден и паросочетание увеличено.
+        """
+        if self.matched.get(start) is not None:
+            return False
+        visited = {start}
+        stack = [(start, iter(self.graph[start]))]
+        via = []  # via[i] — вершина другой доли, через которую идём из stack[i]
+        while stack:
+            u, neighbours = stack[-1]
+            for v in neighbours:
+                if v in blocked:
+                    continue
+                w = self.matched[v]
+                if w is None:
+                    via.append(v)
+                    for (left, _), right in zip(stack, via):
+                        if journal is not None:
+                            journal.setdefault(left, self.matched[left])
+                            journal.setdefault(right, self.matched[right])
+                        self.matched[left] = right
+                        self.matched[right] = left
+                    self.size += 1
+                    return True
+                if w not in visited:
+                    visited.add(w)
+                    via.append(v)
+                    stack.append((w, iter(self.graph[w])))
+                    break
+            else:
+                stack.pop()
+                if via:
+                    via.pop()
+        return False
+
+    def _unmatch(self, u):
+        # Разрывает пару вершины u; возвращает бывшего партнёра
+        v = self.matched[u]
+        if v is not None:
+            self.matched[u] = None
+            self.matched[v] = None
+            self.size -= 1
+        return v
+
+    def add_vertex(self, u, neighbours=()):
+        if u not in self.graph:
+            self.graph[u] = []
+            self.matched[u] = None
+        for v in neighbours:
+            self.add_edge(u, v)
+
+    def remove_vertex(self, u):
+        if u not in self.graph:
+            return
+        partner = self._unmatch(u)
+        for v in self.graph.pop(u):
+            self.graph[v].remove(u)
+        del self.matched[u]
+        if partner is not None:
+            self._augment(partner)
+
+    def add_edge(self, u, v):
+        for node in (u, v):
+            if node not in self.graph:
+                self.graph[node] = []
+                self.matched[node] = None
+        if self.matched[u] == v or v in self.graph[u]:
+            return  # Ребро уже есть — паросочетание остаётся максимальным
+        self.graph[u].append(v)
+        self.graph[v].append(u)
+
+        if self.matched[u] is None and self.matched[v] is None:
+            self.matched[u] = v
+            self.matched[v] = u
+            self.size += 1
+        elif self.matched[u] is None:
+            self._augment(u)
+        elif self.matched[v] is None:
+            self._augment(v)
+        else:
+            # Оба конца заняты: увеличивающий путь x..a-u-v-b..y должен пройти через новое ребро.
+            # Ищем переназначение для a и для b в графе без u и v; если не нашлось — откатываем
+            a, b = self._unmatch(u), self._unmatch(v)
+            journal = {}
+            if self._augment(a, blocked={u, v, b}, journal=journal) and self._augment(b, blocked={u, v}):
+                self.matched[u] = v
+                self.matched[v] = u
+                self.size += 1
+                return
+            for node, partner in journal.items():
+                self.matched[node] = partner
+            if journal:
+                self.size -= 1
+            for x, y in ((u, a), (v, b)):
+                self.matched[x] = y
+                self.matched[y] = x
+            self.size += 2
+
+    def remove_edge(self, u, v):
+        self.graph[u].remove(v)
+        self.graph[v].remove(u)
+        if self.matched[u] == v:
+            self._unmatch(u)
+            self._augment(u)
+            self._augment(v)
+
+    def max_matching(self):
+        """
+        Текущее максимальное паросочетание (уже поддерживается, пересчёта нет).
+        :return: Количество рёбер в максимальном паросочетании и список этих рёбер.
+        """
+        matching_edges = [(u, v) for u, v in self.matched.items() if v is not None and u < v]
+        return self.size, matching_edges
+
+
+def read_edges(path):
+    """
+    Построчно читает рёбра из текстового файла: «u v» на строку, строки с # пропускаются.
+    Генератор — файл целиком в память не загружается.
+    """
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            parts = line.split()
+            if len(parts) < 2 or parts[0].startswith("#"):
+                continue
+            yield tuple(int(x) if x.lstrip("-").isdigit() else x for x in parts[:2])
+
+
+class StreamingMatching:
+    """
+    Полупотоковое паросочетание: рёбра читаются проходами по потоку, в памяти только O(V)
+    состояния (пары вершин), сами рёбра не хранятся.
+    Первый проход — жадное максимальное по включению паросочетание, оно не меньше
+    половины максимального. Каждый следующий проход ищет непересекающиеся увеличивающие
+    пути длины 3 (свободная — a, b = c в паросочетании, d — свободная) и только увеличивает
+    паросочетание; проходы прекращаются, когда улучшений нет.
+    :param edges: Путь к файлу рёбер (см. read_edges) или повторно итерируемая коллекция рёбер.
+    Одноразовый итератор годится только для первого прохода.
+    """
+
+    def __init__(self, edges, passes=1):
+        self.edges = edges
+        self.passes = passes  # Общее число проходов, включая первый
+        self.matched = {}  # Только сопоставленные вершины
+        self.passes_done = 0
+
+    def _stream(self):
+        if isinstance(self.edges, (str, os.PathLike)):
+            return read_edges(self.edges)
+        return iter(self.edges)
+
+    def _greedy_pass(self):
+        for u, v in self._stream():
+            if u != v and u not in self.matched and v not in self.matched:
+                self.matched[u] = v
+                self.matched[v] = u
+
+    def _augment_pass(self):
+        # Для каждой сопоставленной вершины запоминаем до двух свободных соседей («крыльев»)
+        wings = {}
+        for u, v in self._stream():
+            if u == v:
+                continue
+            u_free, v_free = u not in self.matched, v not in self.matched
+            if u_free and v_free:
+                # После прошлых проходов таких рёбер нет, но поток мог измениться.
+                # u или v может уже быть в крыльях: перед увеличением крылья проверяются заново
+                self.matched[u] = v
+                self.matched[v] = u
+            elif u_free != v_free:
+                free, other = (u, v) if u_free else (v, u)
+                candidates = wings.setdefault(other, [])
+                if len(candidates) < 2 and free not in candidates:
+                    candidates.append(free)
+        # Собираем непересекающиеся пути a - b = c - d; концы a и d должны быть свободны сейчас,
+        # а не только когда их записали в крылья
+        used = set()
+        augmented = 0
+        for b, a_candidates in wings.items():
+            c = self.matched.get(b)
+            if c is None or b in used or c in used or c not in wings:
+                continue
+            for a in a_candidates:
+                if a in self.matched:
+                    continue
+                d = next((d for d in wings[c] if d != a and d not in self.matched), None)
+                if d is not None:
+                    self.matched.update({a: b, b: a, c: d, d: c})
+                    used.update((b, c))
+                    augmented += 1
+                    break
+        return augmented
+
+    def max_matching(self):
+        """
+        Находит паросочетание за self.passes проходов по рёбрам.
+        :return: Количество рёбер в паросочетании и список этих рёбер.
+        """
+        self.matched = {}
+        self._greedy_pass()
+        self.passes_done = 1
+        while self.passes_done < self.passes:
+            self.passes_done += 1
+            if not self._augment_pass():
+                break
+        # Метки из файла могут быть разных типов, поэтому дубликаты убираем не через u < v
+        seen = set()
+        matching_edges = []
+        for u, v in self.matched.items():
+            if v not in seen:
+                seen.add(u)
+                matching_edges.append((u, v))
+        return len(matching_edges), matching_edges
+
+
+# Рисование: при большем числе вершин spring_layout заменяется дешёвой раскладкой,
+# а граф сверх DRAW_MAX_NODES вершин урезается до связного фрагмента
+SPRING_LAYOUT_MAX_NODES = 100
+DRAW_MAX_NODES = 300
+
+
+def _drawable_subgraph(graph, max_nodes):
+    # BFS от первой вершины до max_nodes вершин — фрагмент остаётся связным
+    if graph.number_of_nodes() <= max_nodes:
+        return graph
+    start = next(iter(graph))
+    nodes = {start}
+    queue = deque([start])
+    while queue and len(nodes) < max_nodes:
+        u = queue.popleft()
+        for v in graph.neighbors(u):
+            if v not in nodes and len(nodes) < max_nodes:
+                nodes.add(v)
+                queue.append(v)
+    return graph.subgraph(nodes)
+
+
+def visualize_graph(edges, matching_edges_ford_fulkerson=None, matching_edges_kuhn=None, max_nodes=DRAW_MAX_NODES):
+    # matplotlib и networkx нужны только для рисования, поэтому импортируются здесь
+    import matplotlib.pyplot as plt
+    import networkx as nx
+
+    graph = _drawable_subgraph(nx.Graph(edges), max_nodes)
+    small = graph.number_of_nodes() <= SPRING_LAYOUT_MAX_NODES
+    pos = nx.spring_layout(graph) if small else nx.random_layout(graph, seed=0)  # Layout for graph visualization
+
+    nx.draw(graph, pos, with_labels=small, node_color='lightblue', node_size=500 if small else 20, font_size=10)
+
+    # Рисуем только рёбра паросочетаний, попавшие в показанный фрагмент
+    if matching_edges_ford_fulkerson:
+        matching_edges_ford_fulkerson = [(u, v) for u, v in matching_edges_ford_fulkerson if graph.has_edge(u, v)]
+    if matching_edges_kuhn:
+        matching_edges_kuhn = [(u, v) for u, v in matching_edges_kuhn if graph.has_edge(u, v)]
 
     if matching_edges_ford_fulkerson:
         nx.draw_networkx_edges(graph, pos, edgelist=matching_edges_ford_fulkerson, edge_color='red', width=2)
@@ -201,60 +901,118 @@ def visualize_graph(edges, matching_edges_ford_fulkerson=None, matching_edges_ku
 
     plt.show()
 
-# 1. Проверка двудольности
-is_bipartite_result, part1, part2 = is_bipartite(edges)
-
-if is_bipartite_result:
-    print("Граф двудольный.")
-    print("Первая доля:", part1)
-    print("Вторая доля:", part2)
-
-    # Создание представления графа в виде словаря смежности
-    graph_dict = defaultdict(list)
-    for u, v in edges:
-        graph_dict[u].append(v)
-        graph_dict[v].append(u)
-
-    # 2.2-2.3. Создание сети потока и модернизация
-    flow_network, source, sink = build_flow_network(graph_dict, part1, part2)
-
-    # 2.4. Поиск максимального потока
-    max_flow = ford_fulkerson(flow_network, source, sink)
-    print("\nАлгоритм Форда-Фалкерсона:")
-    print("Максимальный поток:", max_flow)
-
-    # 2.5. Извлечение ребер паросочетания
-    matching_edges_ford_fulkerson = extract_matching(flow_network, part1, part2, source, sink)
-    print("Ребра паросочетания:", matching_edges_ford_fulkerson)
-
-    # 2.6. Подсчет количества ребер
-    num_matches_ford_fulkerson = len(matching_edges_ford_fulkerson)
-    print("Количество ребер в паросочетании:", num_matches_ford_fulkerson)
-
-    # Алгоритм Куна
-    print("\nАлгоритм Куна:")
-    graph_kuhn = GraphK(edges)
-    num_matches_kuhn, matching_edges_kuhn = graph_kuhn.max_matching()
-
-    print("Число максимального паросочетания:", num_matches_kuhn)
-    print("Рёбра, входящие в максимальное паросочетание:", matching_edges_kuhn)
-
-    # Визуализация графа с обоими паросочетаниями
-    visualize_graph(edges, matching_edges_ford_fulkerson, matching_edges_kuhn)
-
-
-else:
-    print("Граф не двудольный. Алгоритм не может быть применен.")
-
-print("\nДвудольный граф или биграф – это граф, множество вершин которого можно разбить на две части таким образом, что каждое ребро графа соединяет какую-то вершину из одной части с какой-то вершиной другой части, то есть не существует ребра, соединяющего две вершины из одной и той же части.\n",
-      "\nПаросочетание в графе — это множество рёбер, попарно не имеющих общих вершин.\n",
-      "\nСвойства алгоритмов:\n", "1. Эвристический алгоритм:\n",
-      "•  Простота реализации: Его можно легко реализовать, используя циклы и структуры данных для отслеживания вершин и ребер.\n",
-      "•  Скорость: Быстрее, чем алгоритмы Куна и Форда-Фалкерсона на больших графах, но с риском получения неоптимального решения.\n",
-      "•  Негарантированный максимум: Например, если алгоритм сначала выберет ребро, соединяющее вершину с малой степенью, но это заблокирует выбор других ребер, которые могли бы привести к большему паросочетанию.\n",
-      "\n2. Алгоритм Куна:\n", "•  Гарантированный максимум: Всегда находит максимальное паросочетание.\n",
-      "•  Использование DFS: В коде это реализовано рекурсивной функцией dfs.\n",
-      "•  Сложность: Может быть медленнее эвристического алгоритма на больших графах, но все еще достаточно эффективен.\n",
-      "\n3. Алгоритм Форда-Фалкерсона:\n", "•  Гарантированный максимум: Всегда находит максимальное паросочетание.\n",
-      "•  Сеть потоков: Требует построения сети потока на основе двудольного графа.\n",
-      "•  BFS для поиска путей: Использует BFS (bfs функция) для поиска увеличивающих…")
\ No newline at end of file
+def main():
+    parser = argparse.ArgumentParser(description="Максимальное паросочетание в двудольном графе")
+    parser.add_argument("--draw", action="store_true", help="нарисовать граф (нужны matplotlib и networkx)")
+    parser.add_argument("--edges-file", help="файл рёбер «u v» для потокового паросочетания без загрузки в память")
+    parser.add_argument("--passes", type=int, default=3, help="число проходов потокового паросочетания")
+    args = parser.parse_args()
+
+    if args.edges_file:
+        streaming = StreamingMatching(args.edges_file, passes=args.passes)
+        num_matches_stream, _ = streaming.max_matching()
+        print(f"Потоковое паросочетание (проходов: {streaming.passes_done}):", num_matches_stream)
+        return
+
+    # 1. Проверка двудольности
+    is_bipartite_result, part1, part2 = is_bipartite(edges)
+
+    if is_bipartite_result:
+        print("Граф двудольный.")
+        print("Первая доля:", part1)
+        print("Вторая доля:", part2)
+
+        # Создание представления графа в виде словаря смежности
+        graph_dict = defaultdict(list)
+        for u, v in edges:
+            graph_dict[u].append(v)
+            graph_dict[v].append(u)
+
+        # 2.2-2.3. Создание сети потока и модернизация
+        flow_network, source, sink = build_flow_network(graph_dict, part1, part2)
+
+        # 2.4. Поиск максимального потока
+        max_flow = ford_fulkerson(flow_network, source, sink)
+        print("\nАлгоритм Форда-Фалкерсона:")
+        print("Максимальный поток:", max_flow)
+
+        # 2.5. Извлечение ребер паросочетания
+        matching_edges_ford_fulkerson = extract_matching(flow_network, part1, part2, source, sink)
+        print("Ребра паросочетания:", matching_edges_ford_fulkerson)
+
+        # 2.6. Подсчет количества ребер
+        num_matches_ford_fulkerson = len(matching_edges_ford_fulkerson)
+        print("Количество ребер в паросочетании:", num_matches_ford_fulkerson)
+
+        # Алгоритм Куна
+        print("\nАлгоритм Куна:")
+        graph_kuhn = GraphK(edges)
+        num_matches_kuhn, matching_edges_kuhn = graph_kuhn.max_matching()
+
+        print("Число максимального паросочетания:", num_matches_kuhn)
+        print("Рёбра, входящие в максимальное паросочетание:", matching_edges_kuhn)
+
+        # Алгоритм Хопкрофта-Карпа
+        print("\nАлгоритм Хопкрофта-Карпа:")
+        num_matches_hk, matching_edges_hk = HopcroftKarp(edges).max_matching()
+        print("Число максимального паросочетания:", num_matches_hk)
+        print("Рёбра, входящие в максимальное паросочетание:", matching_edges_hk)
+
+        # Жадный старт Карпа-Сипсера: точные алгоритмы только достраивают паросочетание
+        for matcher in (GraphK(edges), HopcroftKarp(edges)):
+            greedy = matcher.greedy_init(seed=0)
+            num_matches_warm, _ = matcher.max_matching()
+            print(f"{type(matcher).__name__} с жадным стартом: {num_matches_warm} рёбер, жадно найдено {greedy} "
+                  f"({matcher.stats['greedy_share']:.0%}), достроено {matcher.stats['augmented']}")
+        flow_network_warm, source, sink = build_flow_network(graph_dict, part1, part2)
+        seeded = seed_flow_network(flow_network_warm, karp_sipser(graph_dict, seed=0), part1, source, sink)
+        max_flow_warm = seeded + ford_fulkerson(flow_network_warm, source, sink)
+        print(f"Форд-Фалкерсон с жадным стартом: поток {max_flow_warm}, из них жадно {seeded}")
+
+        # Компоненты связности независимы — считаем их параллельно
+        num_matches_parallel, _ = parallel_max_matching(edges)
+        print("Паросочетание по компонентам в пуле процессов:", num_matches_parallel)
+
+        # Потоковое паросочетание: рёбра только читаются, хранятся лишь пары вершин
+        num_matches_stream, matching_edges_stream = StreamingMatching(edges, passes=3).max_matching()
+        print("Потоковое паросочетание (3 прохода):", num_matches_stream, matching_edges_stream)
+
+        # Взвешенное паросочетание: стоимость ребра для примера — (u * v) % 7 + 1
+        weighted_edges = [(u, v, (u * v) % 7 + 1) for u, v in edges]
+        for method in WeightedMatching.METHODS:
+            weighted = WeightedMatching(weighted_edges, method=method)
+            num_matches_weighted, matching_edges_weighted = weighted.max_matching()
+            print(f"Паросочетание минимальной стоимости ({method}):", num_matches_weighted,
+                  "рёбер, стоимость", weighted.total_cost, matching_edges_weighted)
+
+        # Динамическое паросочетание: граф меняется, паросочетание поддерживается
+        dynamic = DynamicMatching(edges)
+        dynamic.remove_edge(*matching_edges_hk[0])
+        print("После удаления ребра", matching_edges_hk[0], "паросочетание:", dynamic.max_matching()[0])
+        dynamic.add_edge(*matching_edges_hk[0])
+        print("После возврата ребра паросочетание:", dynamic.max_matching()[0])
+
+        # Визуализация графа с обоими паросочетаниями
+        if args.draw:
+            visualize_graph(edges, matching_edges_ford_fulkerson, matching_edges_kuhn)
+
+
+    else:
+        print("Граф не двудольный. Алгоритм не может быть применен.")
+
+    print("\nДвудольный граф или биграф – это граф, множество вершин которого можно разбить на две части таким образом, что каждое ребро графа соединяет какую-то вершину из одной части с какой-то вершиной другой части, то есть не существует ребра, соединяющего две вершины из одной и той же части.\n",
+          "\nПаросочетание в графе — это множество рёбер, попарно не имеющих общих вершин.\n",
+          "\nСвойства алгоритмов:\n", "1. Эвристический алгоритм:\n",
+          "•  Простота реализации: Его можно легко реализовать, используя циклы и структуры данных для отслеживания вершин и ребер.\n",
+          "•  Скорость: Быстрее, чем алгоритмы Куна и Форда-Фалкерсона на больших графах, но с риском получения неоптимального решения.\n",
+          "•  Негарантированный максимум: Например, если алгоритм сначала выберет ребро, соединяющее вершину с малой степенью, но это заблокирует выбор других ребер, которые могли бы привести к большему паросочетанию.\n",
+          "\n2. Алгоритм Куна:\n", "•  Гарантированный максимум: Всегда находит максимальное паросочетание.\n",
+          "•  Использование DFS: В коде это реализовано рекурсивной функцией dfs.\n",
+          "•  Сложность: Может быть медленнее эвристического алгоритма на больших графах, но все еще достаточно эффективен.\n",
+          "\n3. Алгоритм Форда-Фалкерсона:\n", "•  Гарантированный максимум: Всегда находит максимальное паросочетание.\n",
+          "•  Сеть потоков: Требует построения сети потока на основе двудольного графа.\n",
+          "•  BFS для поиска путей: Использует BFS (bfs функция) для поиска увеличивающих…")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Лабораторные — отдельные скрипты, а не пакет: модули импортируются из корня и из lab4
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, "lab4")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
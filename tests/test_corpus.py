@@ -0,0 +1,32 @@
+import random
+
+import pytest
+
+from corpus import chunks_equal, reopenable, text_slice
+from normalize import limit_alphabet
+
+
+def split(rng, text, parts=5):
+    cuts = sorted(rng.randint(0, len(text)) for _ in range(parts))
+    return [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+
+
+def test_chunks_equal_and_text_slice():
+    rng = random.Random(16)
+    for _ in range(500):
+        text = ''.join(rng.choice("ab") for _ in range(rng.randint(0, 30)))
+        other = text if rng.random() < 0.5 else ''.join(rng.choice("ab") for _ in range(rng.randint(0, 30)))
+        assert chunks_equal(split(rng, text), split(rng, other)) == (text == other)
+        assert chunks_equal(split(rng, text.encode()), text.encode())
+        start, stop = sorted(rng.randint(0, 35) for _ in range(2))
+        assert text_slice(split(rng, text), start, stop) == text[start:stop]
+
+
+def test_limit_alphabet_accepts_text_and_reopens():
+    text = "aaaa bbb cc d"
+    for source in (text, [text[:5], text[5:]], lambda: iter([text[:3], text[3:]])):
+        chars, open_filtered = limit_alphabet(source, 3)
+        assert chars == ["a", " ", "b"]  # При равных частотах — по первому появлению
+        assert ''.join(open_filtered()) == ''.join(open_filtered()) == "aaaa bbb  "
+    with pytest.raises(TypeError):
+        reopenable(iter([text]))
@@ -0,0 +1,123 @@
+import heapq
+import itertools
+import random
+from collections import Counter
+
+import pytest
+
+import huffman
+from huffman import (CanonicalHuffmanCodec, HuffmanCodec, canonical_codes, huffman_code_lengths,
+                     length_limited_code_lengths, pack_code_lengths, unpack_code_lengths)
+
+
+def cost(frequencies, lengths):
+    return sum(frequencies[symbol] * lengths[symbol] for symbol in frequencies)
+
+
+def brute_force_cost(frequencies, max_length):
+    # Оптимальный префиксный код с длинами до max_length: перебор всех длин с неравенством Крафта
+    symbols = list(frequencies)
+    best = None
+    for lengths in itertools.product(range(1, max_length + 1), repeat=len(symbols)):
+        if sum(2 ** -length for length in lengths) <= 1:
+            total = sum(frequencies[s] * length for s, length in zip(symbols, lengths))
+            best = total if best is None else min(best, total)
+    return best
+
+
+def heap_huffman_cost(frequencies):
+    heap = list(frequencies.values())
+    heapq.heapify(heap)
+    total = 0
+    while len(heap) > 1:
+        merged = heapq.heappop(heap) + heapq.heappop(heap)
+        total += merged
+        heapq.heappush(heap, merged)
+    return total
+
+
+def is_prefix_free(codes):
+    values = sorted(codes.values())
+    return all(not b.startswith(a) for a, b in zip(values, values[1:]))
+
+
+def random_frequencies(rng, n):
+    return {chr(ord("a") + i): rng.choice([1, 1, 2, 3, 5, 40, 1000]) for i in range(n)}
+
+
+def test_two_queue_lengths_are_optimal():
+    rng = random.Random(21)
+    for _ in range(300):
+        frequencies = random_frequencies(rng, rng.randint(2, 20))
+        assert cost(frequencies, huffman_code_lengths(frequencies)) == heap_huffman_cost(frequencies)
+
+
+def test_package_merge_matches_brute_force():
+    rng = random.Random(22)
+    for _ in range(150):
+        n = rng.randint(2, 6)
+        frequencies = random_frequencies(rng, n)
+        max_length = rng.randint((n - 1).bit_length(), 5)
+        lengths = length_limited_code_lengths(frequencies, max_length)
+        assert max(lengths.values()) <= max_length
+        assert sum(2 ** -length for length in lengths.values()) <= 1
+        assert cost(frequencies, lengths) == brute_force_cost(frequencies, max_length)
+
+
+def test_package_merge_rejects_impossible_limit():
+    with pytest.raises(ValueError):
+        length_limited_code_lengths({"a": 1, "b": 1, "c": 1}, 1)
+
+
+def test_codecs_round_trip_and_agree():
+    rng = random.Random(23)
+    for _ in range(100):
+        alphabet = "abcdefgh é€😀"[:rng.randint(1, 12)]
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 3000)))
+        lengths = huffman_code_lengths(Counter(text) or {"a": 1})
+        codes = canonical_codes(lengths)
+        assert is_prefix_free(codes)
+        assert unpack_code_lengths(pack_code_lengths(lengths, alphabet), alphabet) == lengths
+        table = HuffmanCodec(codes)
+        canonical = CanonicalHuffmanCodec(lengths)
+        data, bits = table.encode(text)
+        assert canonical.encode(text) == (data, bits)
+        assert table.decode(data, len(text)) == text
+        assert ''.join(canonical.decode(data, len(text))) == text
+
+
+def test_canonical_codec_large_alphabet():
+    rng = random.Random(24)
+    words = [f"w{i}" for i in range(20000)]
+    sequence = rng.choices(words, weights=[1 / (i + 1) for i in range(len(words))], k=50000)
+    lengths = length_limited_code_lengths(Counter(sequence), 24)
+    codec = CanonicalHuffmanCodec(lengths)
+    data, bits = codec.encode(sequence)
+    assert bits == cost(Counter(sequence), lengths)
+    assert codec.decode(data, len(sequence)) == sequence
+    with pytest.raises(ValueError):
+        codec.decode(data[:len(data) // 2], len(sequence))
+    with pytest.raises(ValueError):
+        HuffmanCodec(canonical_codes(lengths))
+
+
+@pytest.mark.parametrize("table_bits", [1, 3, 8, 12])
+def test_canonical_decode_table_and_long_codes(monkeypatch, table_bits):
+    # Коды длиннее таблицы декодируются поиском по границам длин; результат совпадает с HuffmanCodec
+    monkeypatch.setattr(huffman, "DECODE_TABLE_BITS", table_bits)
+    rng = random.Random(table_bits)
+    for _ in range(200):
+        frequencies = {chr(ord("a") + i): rng.randint(1, 1000) ** 2 for i in range(rng.randint(1, 20))}
+        lengths = length_limited_code_lengths(frequencies, rng.randint(5, 16))
+        codec = CanonicalHuffmanCodec(lengths)
+        text = ''.join(rng.choices(list(frequencies), k=rng.randint(1, 2000)))
+        data, bits = codec.encode(text)
+        assert ''.join(codec.decode(data, len(text))) == text
+        with pytest.raises(ValueError):
+            codec.decode(data[:-1], len(text))
+        junk = bytes(rng.randrange(256) for _ in range(8))
+        try:
+            expected = HuffmanCodec(canonical_codes(lengths)).decode(junk, 10)
+        except ValueError:  # Табличный декодер проверяет и биты после нужных символов
+            continue
+        assert ''.join(codec.decode(junk, 10)) == expected
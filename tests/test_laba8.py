@@ -0,0 +1,126 @@
+import random
+
+import networkx as nx
+import pytest
+
+from laba8 import ALGORITHMS, CSR_ALGORITHMS, CSRNetwork, FordFulkerson, build_residual_graph
+
+
+def networkx_flow(capacities, source, sink):
+    G = nx.DiGraph()
+    G.add_nodes_from((source, sink))
+    for (u, v), capacity in capacities.items():
+        G.add_edge(u, v, capacity=capacity)
+    return nx.maximum_flow_value(G, source, sink)
+
+
+def solver(edges, algorithm, source, sink):
+    graph = build_residual_graph(edges)
+    graph[source]
+    graph[sink]
+    flow = FordFulkerson(graph, algorithm)
+    return flow, flow.ford_fulkerson(source, sink)
+
+
+def test_reoptimize_after_push_relabel_circulation_through_source():
+    edges = [[1, 0, 17], [1, 3, 18], [0, 2, 15], [0, 2, 0], [3, 1, 3], [0, 1, 10], [2, 1, 19], [3, 0, 0]]
+    for algorithm in ("push_relabel_fifo", "push_relabel_highest"):
+        flow, _ = solver(edges, algorithm, 0, 4)
+        flow.update_capacity(2, 1, 0)
+        assert flow.reoptimize() == 0
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_reoptimize_matches_networkx_on_random_edits(algorithm):
+    rng = random.Random(algorithm)
+    for _ in range(60):
+        n = rng.randint(2, 7)
+        source, sink = 0, n - 1
+        edges = [[rng.randrange(n), rng.randrange(n), rng.randint(0, 20)] for _ in range(rng.randint(1, 16))]
+        edges = [edge for edge in edges if edge[0] != edge[1]]
+        capacities = {}
+        for u, v, capacity in edges:
+            capacities[u, v] = capacities.get((u, v), 0) + capacity
+        flow, value = solver(edges, algorithm, source, sink)
+        assert value == networkx_flow(capacities, source, sink)
+        for _ in range(5):
+            u, v = rng.sample(range(n), 2)
+            capacities[u, v] = rng.randint(0, 20)
+            flow.update_capacity(u, v, capacities[u, v])
+            assert flow.reoptimize() == networkx_flow(capacities, source, sink)
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_min_cut_with_fractional_capacities(algorithm):
+    rng = random.Random(f"{algorithm}-fractional")
+    for _ in range(100):
+        n = rng.randint(3, 8)
+        source, sink = 0, n - 1
+        edges = [[rng.randrange(n), rng.randrange(n), round(rng.uniform(0, 1), 1)] for _ in range(rng.randint(2, 20))]
+        edges = [edge for edge in edges if edge[0] != edge[1]]
+        capacities = {}
+        for u, v, capacity in edges:
+            capacities[u, v] = capacities.get((u, v), 0) + capacity
+        flow, value = solver(edges, algorithm, source, sink)
+        assert value == pytest.approx(networkx_flow(capacities, source, sink))
+        cut = flow.min_cut(source)
+        side = flow.reachable(source)
+        assert sink not in side
+        assert all(u in side and v not in side for u, v in cut)
+        assert sorted(cut) == sorted((u, v) for u, v in capacities if u in side and v not in side and capacities[u, v] > 0)
+        assert sum(capacities[edge] for edge in cut) == pytest.approx(value)
+
+
+@pytest.mark.parametrize("algorithm", CSR_ALGORITHMS)
+@pytest.mark.parametrize("kind", ["int", "str", "mixed", "float"])
+def test_csr_network_matches_dict_graph(algorithm, kind):
+    rng = random.Random(f"{algorithm}-{kind}-csr")
+    names = {
+        "int": lambda i: i,
+        "str": lambda i: f"v{i}",
+        "mixed": lambda i: "S" if i == 0 else ("x", i),  # Метки разных типов не сортируются
+        "float": lambda i: i,
+    }[kind]
+    for _ in range(60):
+        n = rng.randint(2, 9)
+        source, sink = names(0), names(n - 1)
+        edges = []
+        for _ in range(rng.randint(0, 20)):
+            u, v = rng.sample(range(n), 2)
+            capacity = round(rng.uniform(0, 5), 1) if kind == "float" else rng.randint(0, 9)
+            edges.append([names(u), names(v), capacity])
+        network = CSRNetwork.from_edges(edges, nodes=(source, sink))
+        assert len(network) == len({label for edge in edges for label in edge[:2]} | {source, sink})
+        flow = FordFulkerson(network, algorithm)
+        value = flow.ford_fulkerson(source, sink)
+        reference, expected = solver(edges, algorithm, source, sink)
+        assert value == pytest.approx(expected)
+        assert flow.reachable(source) == reference.reachable(source)
+        assert set(flow.min_cut(source)) == set(reference.min_cut(source))
+
+
+def test_csr_network_rejects_bad_input():
+    with pytest.raises(ValueError):
+        CSRNetwork.from_edges([[0, 1, 3], [1, 2, -1]])
+    network = CSRNetwork.from_edges([], nodes=("S", "T"))
+    assert FordFulkerson(network, "dinic").ford_fulkerson("S", "T") == 0
+    with pytest.raises(KeyError):
+        network.node_id("X")
+
+
+@pytest.mark.parametrize("algorithm", ["push_relabel_fifo", "push_relabel_highest"])
+def test_push_relabel_reoptimize_starts_from_current_flow(algorithm):
+    # Небольшая правка ёмкости: пересчёт должен делать заметно меньше проталкиваний, чем решение с нуля
+    rng = random.Random(3)
+    width, layers = 30, 8
+    edges = [["S", (0, i), rng.randint(1, 100)] for i in range(width)]
+    edges += [[(layer, i), (layer + 1, j), rng.randint(1, 100)]
+              for layer in range(layers - 1) for i in range(width) for j in rng.sample(range(width), 4)]
+    edges += [[(layers - 1, i), "T", rng.randint(1, 100)] for i in range(width)]
+    flow, _ = solver(edges, algorithm, "S", "T")
+    cold_pushes = flow.stats["augmentations"]
+    u, v, capacity = edges[width + 5]
+    flow.update_capacity(u, v, capacity + 50)
+    expected = networkx_flow({(u, v): c for u, v, c in edges} | {(u, v): capacity + 50}, "S", "T")
+    assert flow.reoptimize() == expected
+    assert flow.stats["augmentations"] * 5 < cold_pushes
@@ -0,0 +1,125 @@
+import random
+
+import networkx as nx
+
+from laba9 import DynamicMatching, GraphK, HopcroftKarp, StreamingMatching, parallel_max_matching
+
+
+def networkx_matching_size(edges, left):
+    G = nx.Graph()
+    G.add_nodes_from(left)
+    G.add_edges_from(edges)
+    return len(nx.bipartite.hopcroft_karp_matching(G, top_nodes=[u for u in left if u in G])) // 2
+
+
+def check_matching(size, matching, edges):
+    assert len(matching) == size
+    assert all((u, v) in edges or (v, u) in edges for u, v in matching)
+    ends = [node for edge in matching for node in edge]
+    assert len(ends) == len(set(ends))
+
+
+def test_dynamic_matching_duplicate_edge():
+    matching = DynamicMatching([(1, 10)])
+    matching.add_edge(1, 10)
+    matching.add_edge(10, 1)
+    assert matching.max_matching() == (1, [(1, 10)])
+    matching.remove_edge(1, 10)
+    assert matching.max_matching() == (0, [])
+
+
+def test_dynamic_matching_accepts_generator():
+    matching = DynamicMatching(edge for edge in [(1, 10), (2, 10), (2, 11)])
+    assert matching.max_matching()[0] == 2
+
+
+def test_dynamic_matching_random_updates():
+    rng = random.Random(12)
+    for _ in range(40):
+        left = list(range(rng.randint(1, 8)))
+        right = list(range(100, 100 + rng.randint(1, 8)))
+        edges = {(rng.choice(left), rng.choice(right)) for _ in range(rng.randint(0, 15))}
+        matching = DynamicMatching(list(edges))
+        for _ in range(40):
+            operation = rng.random()
+            if operation < 0.5:
+                edge = (rng.choice(left), rng.choice(right))
+                matching.add_edge(*edge)
+                edges.add(edge)
+            elif operation < 0.9 and edges:
+                edge = rng.choice(sorted(edges))
+                matching.remove_edge(*edge)
+                edges.discard(edge)
+            elif edges:
+                u = rng.choice(left)
+                matching.remove_vertex(u)
+                edges = {(a, b) for a, b in edges if a != u}
+            size, matching_edges = matching.max_matching()
+            assert size == networkx_matching_size(edges, left)
+            check_matching(size, matching_edges, edges)
+
+
+def random_bipartite(rng):
+    left = list(range(rng.randint(1, 12)))
+    right = list(range(100, 100 + rng.randint(1, 12)))
+    edges = {(rng.choice(left), rng.choice(right)) for _ in range(rng.randint(1, 30))}
+    return left, sorted(edges)
+
+
+def test_hopcroft_karp_matches_networkx():
+    rng = random.Random(9)
+    for _ in range(200):
+        left, edges = random_bipartite(rng)
+        size, matching_edges = HopcroftKarp(edges).max_matching()
+        assert size == networkx_matching_size(edges, left)
+        check_matching(size, matching_edges, set(edges))
+
+
+def test_hopcroft_karp_with_greedy_start_matches_kuhn():
+    rng = random.Random(14)
+    for _ in range(100):
+        left, edges = random_bipartite(rng)
+        hopcroft_karp = HopcroftKarp(edges)
+        hopcroft_karp.greedy_init(seed=rng.random())
+        assert hopcroft_karp.max_matching()[0] == GraphK(edges).max_matching()[0] == networkx_matching_size(edges, left)
+
+
+class ChangingStream:
+    # Рёбра, которые меняются от прохода к проходу: каждый __iter__ отдаёт следующий список
+    def __init__(self, *passes):
+        self.passes = list(passes)
+
+    def __iter__(self):
+        return iter(self.passes.pop(0) if len(self.passes) > 1 else self.passes[0])
+
+
+def test_streaming_matching_stays_symmetric():
+    # Во втором проходе a - x идёт после крыла a вершины b: a нельзя занимать посреди прохода
+    streaming = StreamingMatching(ChangingStream([("b", "c")], [("a", "b"), ("c", "d"), ("a", "x")]), passes=3)
+    size, matching = streaming.max_matching()
+    assert all(streaming.matched[v] == u for u, v in streaming.matched.items())
+    check_matching(size, matching, {("a", "b"), ("b", "c"), ("c", "d"), ("a", "x")})
+    assert size == 2
+
+    rng = random.Random(15)
+    for _ in range(100):
+        left, edges = random_bipartite(rng)
+        # Первый проход видит только часть рёбер: в следующих есть рёбра между свободными вершинами
+        first = rng.sample(edges, len(edges) // 3)
+        streaming = StreamingMatching(ChangingStream(first, *(rng.sample(edges, len(edges)) for _ in range(3))),
+                                      passes=4)
+        size, matching = streaming.max_matching()
+        assert all(streaming.matched[v] == u for u, v in streaming.matched.items())
+        check_matching(size, matching, set(edges))
+        assert 2 * size >= networkx_matching_size(edges, left)
+
+
+def test_parallel_max_matching_many_components():
+    rng = random.Random(11)
+    edges = []
+    for k in range(300):
+        _, component = random_bipartite(rng)
+        edges += [(1000 * k + u, 1000 * k + v) for u, v in component]
+    size, matching = parallel_max_matching(edges, workers=1)
+    check_matching(size, matching, set(edges))
+    assert size == len(HopcroftKarp(edges).max_matching()[1])
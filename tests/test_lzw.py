@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from lzw import FIRST_CODE, LZWDecoder, LZWEncoder, lzw_compress_bytes, lzw_decompress_bytes
+
+# Размеры словаря у границ: сразу после первой записи, на смене ширины кода (512, 1024) и без предела
+MAX_SIZES = [FIRST_CODE + 1, FIRST_CODE + 2, FIRST_CODE + 3, 511, 512, 513, 1024, None]
+
+
+def samples(rng):
+    yield b""
+    yield b"a"
+    yield b"ab" * 700  # Случай «строка + её первый байт»
+    yield bytes(rng.choice(b"ab") for _ in range(5000))
+    yield bytes(rng.randrange(256) for _ in range(3000))
+    yield "съешь же ещё этих мягких французских булок ".encode("utf-8") * 40
+
+
+def split(rng, data, parts=6):
+    cuts = sorted(rng.randint(0, len(data)) for _ in range(parts))
+    return [data[a:b] for a, b in zip([0] + cuts, cuts + [len(data)])]
+
+
+@pytest.mark.parametrize("policy", ["reset", "lru"])
+@pytest.mark.parametrize("max_size", MAX_SIZES)
+def test_roundtrip_at_dictionary_boundaries(policy, max_size):
+    rng = random.Random(22)
+    for data in samples(rng):
+        packed = lzw_compress_bytes(data, max_size, policy)
+        assert lzw_decompress_bytes(packed, max_size, policy) == data
+
+
+@pytest.mark.parametrize("policy", ["reset", "lru"])
+def test_streaming_matches_whole(policy):
+    rng = random.Random(23)
+    for data in samples(rng):
+        whole = lzw_compress_bytes(data, 300, policy)
+        encoder = LZWEncoder(300, policy)
+        packed = b"".join(encoder.feed(part) for part in split(rng, data)) + encoder.flush()
+        assert packed == whole
+        decoder = LZWDecoder(300, policy)
+        restored = b"".join(decoder.feed(part) for part in split(rng, packed)) + decoder.flush()
+        assert restored == data
+
+
+@pytest.mark.parametrize("policy", ["reset", "lru"])
+def test_truncated_stream_raises(policy):
+    data = bytes(random.Random(24).choice(b"abc") for _ in range(2000))
+    packed = lzw_compress_bytes(data, 300, policy)
+    with pytest.raises(ValueError):
+        lzw_decompress_bytes(packed[:len(packed) // 2], 300, policy)
+    decoder = LZWDecoder(300, policy)
+    decoder.feed(packed)
+    with pytest.raises(ValueError):
+        decoder.feed(b"\0")  # Данные после кода END
+
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        LZWEncoder(FIRST_CODE)
+    with pytest.raises(ValueError):
+        LZWDecoder(1 << 12, "fifo")
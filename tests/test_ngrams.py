@@ -0,0 +1,46 @@
+import pathlib
+import random
+from collections import Counter
+
+import pytest
+
+from ngrams import NgramModel, parallel_ngram_counts
+
+
+def counter(text, n):
+    return Counter(text[i:i + n] for i in range(len(text) - n + 1))
+
+
+def random_text(rng, alphabet="ab c", size=2000):
+    return ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, size)))
+
+
+def test_model_matches_counter_over_chunks():
+    rng = random.Random(18)
+    for _ in range(50):
+        text = random_text(rng)
+        cuts = sorted(rng.sample(range(len(text) + 1), min(5, len(text) + 1)))
+        chunks = [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+        model = NgramModel(3, max_symbols=8).fit(chunks)
+        for n in (1, 2, 3):
+            assert list(model.distribution(n).items()) == list(counter(text, n).items())
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parallel_counts_match_counter(workers):
+    rng = random.Random(19)
+    for _ in range(10):
+        text = random_text(rng, "abcé€ ", 5000)
+        result = parallel_ngram_counts(text, (1, 2, 3), workers=workers, chunk_size=rng.randint(1, 300))
+        for n in (1, 2, 3):
+            assert list(result[n].items()) == list(counter(text, n).items())
+
+
+def test_parallel_counts_from_file(tmp_path):
+    rng = random.Random(20)
+    text = random_text(rng, "abcé€😀 ", 5000)
+    path = pathlib.Path(tmp_path, "text.txt")
+    path.write_text(text, encoding="utf-8")
+    result = parallel_ngram_counts(path, (1, 2), workers=2, chunk_size=333)
+    for n in (1, 2):
+        assert list(result[n].items()) == list(counter(text, n).items())
@@ -0,0 +1,87 @@
+import io
+import random
+from collections import Counter
+
+import pytest
+
+from stream import FrameReader, HuffmanFrames, LZWFrames, StreamDecoder, StreamEncoder, encode_stream
+
+
+def split(rng, data, parts=8):
+    cuts = sorted(rng.randint(0, len(data)) for _ in range(parts))
+    return [data[a:b] for a, b in zip([0] + cuts, cuts + [len(data)])]
+
+
+def random_text(rng, size):
+    return ''.join(rng.choice("abcd éжё€\n") for _ in range(size))
+
+
+def make_frames(codec, text):
+    if codec == "huffman":
+        return HuffmanFrames.from_frequencies(Counter(text))
+    return LZWFrames(300, codec)
+
+
+def compress(rng, frames, text, frame_chars):
+    return b"".join(encode_stream(split(rng, text), frames, frame_chars))
+
+
+@pytest.mark.parametrize("codec", ["huffman", "reset", "lru"])
+def test_frame_reader_random_slices(codec):
+    rng = random.Random(23)
+    text = random_text(rng, 5000)
+    for frame_chars in (1, 37, 512, 5000, 10000):
+        if frame_chars == 1 and codec != "huffman":
+            continue  # Кадр LZW в один символ — это словарь на каждый символ, слишком долго
+        reader = FrameReader(io.BytesIO(compress(rng, make_frames(codec, text), text, frame_chars)))
+        assert len(reader) == len(text)
+        assert ''.join(reader) == text
+        for _ in range(30):
+            start, stop = rng.randint(-6000, 6000), rng.randint(-6000, 6000)
+            assert reader.read(start, stop) == text[start:stop]
+        assert reader.read() == text
+
+
+@pytest.mark.parametrize("codec", ["huffman", "reset"])
+def test_decoder_accepts_any_split(codec):
+    rng = random.Random(24)
+    text = random_text(rng, 3000)
+    data = compress(rng, make_frames(codec, text), text, 256)
+    for _ in range(10):
+        decoder = StreamDecoder()
+        restored = ''.join(decoder.feed(block) for block in split(rng, data, 20))
+        decoder.flush()
+        assert restored == text
+
+
+def test_frames_do_not_depend_on_chunking():
+    rng = random.Random(25)
+    text = random_text(rng, 4000)
+    frames = make_frames("huffman", text)
+    whole = StreamEncoder(frames, 333)
+    expected = whole.feed(text) + whole.flush()
+    for _ in range(10):
+        encoder = StreamEncoder(frames, 333)
+        data = b"".join(encoder.feed(chunk) for chunk in split(rng, text, 30)) + encoder.flush()
+        assert data == expected
+
+
+def test_large_alphabet_frames():
+    rng = random.Random(26)
+    alphabet = [chr(0x4E00 + i) for i in range(6000)]
+    text = ''.join(rng.choice(alphabet) for _ in range(20000))
+    reader = FrameReader(io.BytesIO(compress(rng, make_frames("huffman", text), text, 4096)))
+    assert reader.read() == text
+    assert reader.read(5000, 9000) == text[5000:9000]
+
+
+def test_truncated_container_raises():
+    rng = random.Random(27)
+    text = random_text(rng, 1000)
+    data = compress(rng, make_frames("huffman", text), text, 100)
+    decoder = StreamDecoder()
+    decoder.feed(data[:len(data) // 2])
+    with pytest.raises(ValueError):
+        decoder.flush()
+    with pytest.raises(ValueError):
+        FrameReader(io.BytesIO(data[:-1]))